@@ -0,0 +1,426 @@
+"""
+AI Resume Generator - Async Provider Client
+Non-blocking versions of the provider entry points built on one shared
+httpx.AsyncClient, plus a pipeline coroutine that runs independent stages
+concurrently. A single worker process can keep many generations in flight
+instead of parking one thread per LLM round trip.
+"""
+
+import asyncio
+import os
+import time
+import weakref
+from typing import List, Optional
+
+import httpx
+
+import ats_scorer
+import circuit_breaker
+import hedging
+import jd_dedup
+import main
+import model_router
+import patch_tailor
+import profile_model
+import provider_failover
+import provider_transport
+import rate_limiter
+import relevance_ranker
+import sharded_tailor
+import single_flight
+
+# One client per event loop (httpx clients must not cross loops)
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the shared AsyncClient for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        config = provider_transport.get_transport_config()
+        limits = httpx.Limits(
+            max_connections=None,
+            max_keepalive_connections=config["pool_size"] if config["keep_alive"] else 0
+        )
+        client = httpx.AsyncClient(limits=limits, headers={"Content-Type": "application/json"})
+        _clients[loop] = client
+    return client
+
+
+async def aclose_async_client():
+    """Close the AsyncClient bound to the running event loop."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _timeout(timeout=None) -> httpx.Timeout:
+    connect, read = provider_transport.resolve_timeout(timeout)
+    return httpx.Timeout(read, connect=connect)
+
+
+async def _post(url: str, json: dict, headers: dict = None, timeout=None) -> httpx.Response:
+    return await get_async_client().post(url, json=json, headers=headers, timeout=_timeout(timeout))
+
+
+async def async_call_gemini_api(prompt: str, api_key: str, model: str = "gemini-2.5-flash", task: str = None) -> str:
+    """Async counterpart of main.call_gemini_api."""
+    if not api_key:
+        print("⚠️ Gemini API Key missing.")
+        return ""
+
+    url = provider_transport.gemini_url(model, api_key)
+    payload = main.build_gemini_payload(prompt, task)
+
+    try:
+        breaker = circuit_breaker.get_breaker("gemini", model)
+        if not breaker.allow():
+            raise circuit_breaker.CircuitOpenError(f"Circuit open for gemini/{model}")
+
+        async def send():
+            return await rate_limiter.send_async(
+                "gemini", model,
+                circuit_breaker.track_async("gemini", model, lambda: _post(url, json=payload, timeout=None)),
+                prompt=prompt
+            )
+
+        try:
+            action, content = main.handle_gemini_response(model, payload, await send())
+            if action == "retry":
+                action, content = main.handle_gemini_response(model, payload, await send())
+        except rate_limiter.RateLimitWaitTooLong:
+            breaker.release_probe()
+            raise
+        return content
+    except Exception as e:
+        raise Exception(f"Gemini Request Failed: {e}")
+
+
+async def async_query_groq(
+    prompt: str,
+    expect_json: bool = False,
+    api_key: str = None,
+    models: List[str] = None,
+    task: str = None
+) -> str:
+    """Async counterpart of main.query_groq (same fallback chain unless `models` is given)."""
+    if not api_key:
+        api_key = os.getenv("GROQ_API_KEY")
+
+    if not api_key:
+        print("⚠️ GROQ_API_KEY not found.")
+        return ""
+
+    headers = {"Authorization": f"Bearer {api_key}"}
+
+    for model_id in models or main.GROQ_MODELS_CHAIN:
+        if not main.claim_groq_model(model_id):
+            continue
+
+        try:
+            print(f"   ⚡ Groq: Attempting with {model_id}...")
+            payload = main.build_groq_payload(prompt, model_id, expect_json, task)
+
+            async def send():
+                return await rate_limiter.send_async(
+                    "groq", model_id,
+                    circuit_breaker.track_async(
+                        "groq", model_id,
+                        lambda: _post(provider_transport.groq_url(), json=payload, headers=headers, timeout=None)
+                    ),
+                    prompt=prompt
+                )
+
+            action, content = main.handle_groq_response(model_id, payload, await send())
+            if action == "retry":
+                action, content = main.handle_groq_response(model_id, payload, await send())
+            if action == "text":
+                return content
+        except Exception as e:
+            main.handle_groq_error(model_id, e)
+
+    raise Exception("All Groq models failed. Check logs for details.")
+
+
+async def async_query_provider(
+    prompt: str,
+    provider: str = "gemini",
+    expect_json: bool = False,
+    api_key: str = None,
+    task: str = None,
+    bypass_cache: bool = False,
+    deadline: float = None
+) -> str:
+    """
+    Async counterpart of main.query_provider (shares its response cache,
+    single-flight registry and provider failover policy).
+    """
+    cache_key, cached = main.lookup_cached_response(prompt, provider, expect_json, bypass_cache, task)
+    if cached is not None:
+        provider_failover.record_served({"requested": provider, "provider": provider, "attempts": [], "cached": True})
+        hedging.record_hedge_report(None)
+        return cached
+
+    async def attempt(current: str) -> str:
+        route = model_router.route(task, current, prompt)
+        key = api_key if current == provider else None
+        if current == "groq":
+            return await async_query_groq(prompt, expect_json=expect_json, api_key=key, models=route["models"], task=task)
+        return await async_call_gemini_api(prompt, main.resolve_api_key(current, key), model=route["model"], task=task)
+
+    async def fetch():
+        response_text = await provider_failover.run_with_failover_async(
+            main.failover_providers(provider, api_key), attempt, deadline=deadline
+        )
+        served = provider_failover.get_last_served()
+        main.store_cached_response(prompt, served, expect_json, response_text, task=task)
+        return response_text, served
+
+    flight_key = single_flight.request_fingerprint(
+        cache_key or main.provider_cache_key(prompt, provider, expect_json, task), api_key
+    )
+    response_text, served = await single_flight.do_async(flight_key, fetch)
+    provider_failover.record_served(served)
+    # Async requests are not hedged; clear any report left by an earlier sync call
+    hedging.record_hedge_report(None)
+    return response_text
+
+
+async def async_parse_job_description(jd_text: str, provider: str = "gemini", api_key: str = None, mode: str = None) -> dict:
+    """Async counterpart of main.parse_job_description."""
+    mode = mode or main.JD_PARSE_MODE
+    if mode == "local":
+        jd_dedup.record_match(None)
+        return main.local_jd_analysis(jd_text)
+
+    reused = main.lookup_jd_analysis(jd_text)
+    if reused is not None:
+        return reused
+
+    if mode == "hybrid":
+        analysis = main.local_jd_analysis(jd_text)
+        try:
+            response_text = await async_query_provider(main.build_jd_header_prompt(jd_text), provider, api_key=api_key, task="jd_header")
+            analysis = main.merge_jd_header(analysis, main.parse_jd_header_response(response_text))
+            jd_dedup.get_index().add(jd_text, analysis)
+            return analysis
+        except Exception as e:
+            print(f"⚠️ API Error (Job Parsing): {e}")
+            print("   Using locally extracted job details.")
+            return analysis
+
+    prompt = main.build_jd_parse_prompt(jd_text)
+
+    try:
+        response_text = await async_query_provider(prompt, provider, api_key=api_key, task="jd_parse")
+        parsed = main.parse_jd_response(response_text)
+        if parsed is not None:
+            jd_dedup.get_index().add(jd_text, parsed)
+            return parsed
+    except Exception as e:
+        print(f"⚠️ API Error (Job Parsing): {e}")
+
+    print("   Using locally extracted job description values.")
+    return main.local_jd_analysis(jd_text)
+
+
+async def async_analyze_resume_with_jd(
+    resume_data: dict,
+    jd_text: str,
+    provider: str = "gemini",
+    api_key: str = None,
+    mode: str = None
+) -> dict:
+    """Async counterpart of main.analyze_resume_with_jd."""
+    if (mode or main.ATS_MODE) == "fast":
+        return ats_scorer.score_resume(resume_data, jd_text)
+
+    prompt = main.build_ats_analysis_prompt(resume_data, jd_text)
+
+    try:
+        response_text = await async_query_provider(prompt, provider=provider, api_key=api_key, task="ats_analysis")
+    except Exception as e:
+        return {"error": f"AI Provider Error: {str(e)}"}
+
+    return main.parse_ats_analysis_response(response_text)
+
+
+async def async_tailor_resume(
+    base_resume: dict,
+    jd_analysis: dict,
+    provider: str = "gemini",
+    api_key: str = None,
+    tailoring_strategy: str = "balanced",
+    bullet_counts: dict = None
+) -> dict:
+    """Async counterpart of main.tailor_resume."""
+    base_resume = profile_model.load_profile(base_resume)
+    reuse_key, reused = main.lookup_tailored_resume(base_resume, jd_analysis, tailoring_strategy, bullet_counts)
+    if reused is not None:
+        return reused
+
+    prompt = main.build_tailor_prompt(base_resume, jd_analysis, tailoring_strategy, bullet_counts)
+
+    try:
+        response_text = await async_query_provider(prompt, provider, api_key=api_key, task="tailor")
+    except Exception as e:
+        return main.finalize_tailored_resume("", base_resume, jd_analysis, provider, bullet_counts, error=e)
+
+    tailored = main.finalize_tailored_resume(response_text, base_resume, jd_analysis, provider, bullet_counts)
+    main.remember_tailored_resume(reuse_key, tailored)
+    return tailored
+
+
+async def async_tailor_resume_sharded(
+    base_resume: dict,
+    jd_analysis: dict,
+    provider: str = "gemini",
+    api_key: str = None,
+    tailoring_strategy: str = "balanced",
+    bullet_counts: dict = None
+) -> dict:
+    """Async counterpart of sharded_tailor.tailor_resume_sharded (shards run as concurrent coroutines)."""
+    base_resume = profile_model.load_profile(base_resume)
+    reuse_key, reused = main.lookup_tailored_resume(base_resume, jd_analysis, tailoring_strategy, bullet_counts)
+    if reused is not None:
+        return reused
+
+    profile, _ = relevance_ranker.prerank_profile(base_resume.with_targets(bullet_counts), jd_analysis)
+
+    start = time.monotonic()
+    plan = None
+    try:
+        response_text = await async_query_provider(
+            sharded_tailor.build_plan_prompt(profile, jd_analysis), provider, api_key=api_key, task="tailor_plan"
+        )
+        plan = sharded_tailor.parse_plan(response_text, profile)
+    except Exception as e:
+        print(f"   ⚠️ Tailoring plan failed ({e}); keeping items in place.")
+    plan_seconds = time.monotonic() - start
+    placed = sharded_tailor.apply_plan(plan or sharded_tailor.default_plan(profile), profile)
+
+    prompts = sharded_tailor.build_shard_prompts(
+        profile, placed, jd_analysis, main.tailoring_strategy_note(tailoring_strategy)
+    )
+
+    async def run_shard(section: str, prompt: str):
+        shard_start = time.monotonic()
+        for attempt in range(1 + sharded_tailor.SHARD_RETRIES):
+            try:
+                response_text = await async_query_provider(
+                    prompt, provider, api_key=api_key, task="tailor_section", bypass_cache=attempt > 0
+                )
+                return sharded_tailor.parse_shard(section, response_text), time.monotonic() - shard_start
+            except Exception as e:
+                if attempt == sharded_tailor.SHARD_RETRIES:
+                    raise
+                print(f"   🔁 Shard '{section}' failed ({e}); retrying it alone...")
+
+    start = time.monotonic()
+    outcomes = await asyncio.gather(*(run_shard(s, p) for s, p in prompts.items()), return_exceptions=True)
+    results, seconds, errors = {}, {}, {}
+    for section, outcome in zip(prompts, outcomes):
+        if isinstance(outcome, Exception):
+            errors[section] = outcome
+        else:
+            results[section], seconds[section] = outcome
+    sharded_tailor.report_timings(plan_seconds, seconds, time.monotonic() - start)
+
+    return sharded_tailor.finish_sharded(
+        base_resume, jd_analysis, provider, bullet_counts, profile, placed, results, errors, reuse_key
+    )
+
+
+async def async_tailor_resume_patch(
+    base_resume: dict,
+    jd_analysis: dict,
+    provider: str = "gemini",
+    api_key: str = None,
+    tailoring_strategy: str = "balanced",
+    bullet_counts: dict = None
+) -> dict:
+    """Async counterpart of patch_tailor.tailor_resume_patch."""
+    base_resume = profile_model.load_profile(base_resume)
+    reuse_key, reused = main.lookup_tailored_resume(base_resume, jd_analysis, tailoring_strategy, bullet_counts)
+    if reused is not None:
+        return reused
+
+    profile, omitted = patch_tailor.prepare_profile(base_resume, jd_analysis, bullet_counts)
+    prompt = patch_tailor.build_patch_prompt(profile, jd_analysis, main.tailoring_strategy_note(tailoring_strategy), omitted)
+    try:
+        response_text = await async_query_provider(prompt, provider, api_key=api_key, task="tailor_patch")
+    except Exception as e:
+        return main.finalize_tailored_resume("", base_resume, jd_analysis, provider, bullet_counts, error=e)
+
+    return patch_tailor.finish_patch(response_text, profile, base_resume, jd_analysis, provider, bullet_counts, reuse_key)
+
+
+async def async_answer_question_with_context(question: str, resume_data: dict, jd_text: str, provider: str = "gemini", api_key: str = None) -> dict:
+    """Async counterpart of main.answer_question_with_context."""
+    prompt = main.build_question_prompt(question, resume_data, jd_text)
+
+    try:
+        response_text = await async_query_provider(prompt, provider=provider, api_key=api_key, task="qa")
+        return {"answer": response_text.strip()}
+    except Exception as e:
+        return {"error": f"Failed to answer question: {str(e)}"}
+
+
+async def run_generation_pipeline(
+    jd_text: str,
+    base_resume: dict = None,
+    provider: str = "gemini",
+    api_key: str = None,
+    tailoring_strategy: str = "balanced",
+    bullet_counts: dict = None,
+    analyze_base: bool = True,
+    analyze_tailored: bool = False,
+    output_path_or_buffer=None,
+    tailor_mode: str = "single"
+) -> dict:
+    """
+    Run the full generation pipeline with independent stages in parallel.
+
+    Stage 1 (concurrent): JD parsing + ATS analysis of the untailored resume.
+    Stage 2: tailoring against the parsed JD (tailor_mode "sharded" rewrites sections
+    concurrently, "patch" applies a model-written edit script).
+    Stage 3 (concurrent, optional): ATS analysis of the tailored resume + PDF render.
+
+    Returns:
+        dict with: jd_analysis, base_analysis, tailored_resume, tailored_analysis, output
+    """
+    if base_resume is None:
+        base_resume = main.get_base_resume()
+
+    stage_one = [async_parse_job_description(jd_text, provider, api_key=api_key)]
+    if analyze_base:
+        stage_one.append(async_analyze_resume_with_jd(base_resume, jd_text, provider, api_key=api_key))
+    results = await asyncio.gather(*stage_one)
+    jd_analysis = results[0]
+    base_analysis: Optional[dict] = results[1] if analyze_base else None
+
+    tailor = {
+        "sharded": async_tailor_resume_sharded,
+        "patch": async_tailor_resume_patch,
+    }.get(tailor_mode, async_tailor_resume)
+    tailored = await tailor(
+        base_resume, jd_analysis, provider, api_key=api_key,
+        tailoring_strategy=tailoring_strategy, bullet_counts=bullet_counts
+    )
+
+    stage_three = {}
+    if analyze_tailored:
+        stage_three["tailored_analysis"] = async_analyze_resume_with_jd(tailored, jd_text, provider, api_key=api_key)
+    if output_path_or_buffer is not None:
+        # ReportLab is CPU-bound; keep it off the event loop
+        stage_three["output"] = asyncio.to_thread(main.create_resume_pdf, tailored, output_path_or_buffer)
+    finished = dict(zip(stage_three.keys(), await asyncio.gather(*stage_three.values())))
+
+    return {
+        "jd_analysis": jd_analysis,
+        "base_analysis": base_analysis,
+        "tailored_resume": tailored,
+        "tailored_analysis": finished.get("tailored_analysis"),
+        "output": finished.get("output"),
+    }
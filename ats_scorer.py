@@ -0,0 +1,271 @@
+"""
+AI Resume Generator - Local ATS Scorer
+Scores a resume against a job description in milliseconds, without a
+provider call. Two signals are combined:
+keyword coverage (the JD's mandatory/preferred keywords, alias-normalized
+through the skill taxonomy, found anywhere in the resume) and lexical
+similarity (sublinear TF-IDF cosine between resume and JD, with BM25 over
+resume sections to pick the strongest matching areas). Returns the same
+dict shape as the LLM analysis; many resumes x many JDs are scored as one
+NumPy matrix product.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import skill_extractor
+
+# Score weights (sum to 1): required coverage, preferred coverage, lexical similarity
+WEIGHTS = {"mandatory": 0.55, "preferred": 0.15, "similarity": 0.30}
+# TF-IDF cosine at which the similarity component saturates (resume and JD never share all wording)
+SIMILARITY_CEILING = 0.5
+# BM25 parameters for section ranking
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+MAX_MISSING = 5
+MAX_MATCHING = 3
+
+STOPWORDS = frozenset("""
+a about above across after all also am an and any are as at be been being both but by can could did do does
+doing during each etc for from had has have having he her here hers him his how i if in into is it its itself
+just like may me more most must my no nor not of off on once only or other our ours out over own per same she
+should so some such than that the their them then there these they this those through to too under until up
+us very via was we were what when where which while who whom why will with within without would you your
+years year experience work working team role job company strong ability skills including using plus
+""".split())
+
+_TAG = re.compile(r'<[^>]+>')
+_TOKEN = re.compile(r'[a-z0-9][a-z0-9+#]*')
+
+# Resume list sections and the fields that name an entry ("Role at Company")
+_ENTRY_SECTIONS = {
+    "experience": ("role", "company"),
+    "projects": ("name", None),
+    "leadership": ("role", "organization"),
+    "research": ("title", "conference"),
+    "volunteering": ("role", "organization"),
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(_TAG.sub(" ", text or "").lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+def resume_sections(resume: dict) -> List[Tuple[str, str]]:
+    """(label, text) for every scorable part of a resume dict."""
+    sections = []
+    if resume.get("summary"):
+        sections.append(("Summary", resume["summary"]))
+
+    skills = resume.get("skills")
+    if isinstance(skills, dict) and skills:
+        sections.append(("Skills", " ".join(f"{k} {v}" for k, v in skills.items())))
+    elif isinstance(skills, (list, str)) and skills:
+        sections.append(("Skills", " ".join(str(s) for s in skills if s) if isinstance(skills, list) else skills))
+
+    for section, (title_key, org_key) in _ENTRY_SECTIONS.items():
+        for entry in resume.get(section) or []:
+            if not isinstance(entry, dict):
+                continue
+            title = str(entry.get(title_key) or "")
+            org = str(entry.get(org_key) or "") if org_key else ""
+            label = f"{title} at {org}" if title and org else (title or org or section.title())
+            text = " ".join([title, org] + [str(b) for b in entry.get("bullets") or []])
+            sections.append((label, text))
+
+    education = " ".join(
+        f"{e.get('degree') or ''} {e.get('institution') or ''}" for e in resume.get("education") or [] if isinstance(e, dict)
+    )
+    if education.strip():
+        sections.append(("Education", education))
+    for section in ("certifications", "awards"):
+        names = " ".join(str(e.get("name") or "") for e in resume.get(section) or [] if isinstance(e, dict))
+        if names.strip():
+            sections.append((section.title(), names))
+    return sections
+
+
+def _normalize_phrase(text: str) -> str:
+    return " " + " ".join(_TOKEN.findall(_TAG.sub(" ", text or "").lower())) + " "
+
+
+def keyword_presence(resume_text: str, keywords: List[str]) -> np.ndarray:
+    """
+    Boolean vector: keyword i appears in the resume. Taxonomy terms match
+    through any alias ("k8s" covers Kubernetes); other keywords match as a
+    whole-word phrase.
+    """
+    found = {canonical.lower() for _, _, canonical, _ in skill_extractor.get_extractor().find(resume_text)}
+    normalized = _normalize_phrase(resume_text)
+    return np.array(
+        [k.lower() in found or _normalize_phrase(k) in normalized for k in keywords],
+        dtype=bool
+    )
+
+
+def _tfidf(docs: List[List[str]]) -> np.ndarray:
+    """L2-normalized sublinear TF-IDF rows for tokenized documents."""
+    vocab: Dict[str, int] = {}
+    for doc in docs:
+        for token in doc:
+            vocab.setdefault(token, len(vocab))
+    counts = np.zeros((len(docs), max(len(vocab), 1)), dtype=np.float64)
+    for row, doc in enumerate(docs):
+        for token in doc:
+            counts[row, vocab[token]] += 1
+
+    df = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(docs)) / (1 + df)) + 1
+    weights = np.where(counts > 0, 1 + np.log(np.maximum(counts, 1)), 0) * idf
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    return weights / np.where(norms == 0, 1, norms)
+
+
+def bm25(section_tokens: List[List[str]], query: List[str]) -> np.ndarray:
+    """BM25 score of every section for the query terms (sections form the corpus)."""
+    terms = sorted(set(query))
+    if not section_tokens or not terms:
+        return np.zeros(len(section_tokens))
+    index = {t: i for i, t in enumerate(terms)}
+    tf = np.zeros((len(section_tokens), len(terms)))
+    for row, tokens in enumerate(section_tokens):
+        for token in tokens:
+            col = index.get(token)
+            if col is not None:
+                tf[row, col] += 1
+
+    lengths = np.array([len(t) for t in section_tokens], dtype=np.float64)
+    avg = lengths.mean() or 1.0
+    df = np.count_nonzero(tf, axis=0)
+    n = len(section_tokens)
+    idf = np.log(1 + (n - df + 0.5) / (df + 0.5))
+    denom = tf + BM25_K1 * (1 - BM25_B + BM25_B * lengths[:, None] / avg)
+    return ((tf * (BM25_K1 + 1)) / denom * idf).sum(axis=1)
+
+
+def _coverage(presence: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Share of each JD's masked keywords present in each resume (NaN when a JD lists none)."""
+    hits = presence.astype(np.float64) @ mask.T.astype(np.float64)
+    totals = mask.sum(axis=1)
+    return np.where(totals > 0, hits / np.maximum(totals, 1), np.nan)
+
+
+def _score(mandatory: np.ndarray, preferred: np.ndarray, cosine: np.ndarray) -> np.ndarray:
+    """Weighted 0-100 score; a coverage with no keywords to cover (NaN) defers to similarity."""
+    similarity = np.minimum(cosine / SIMILARITY_CEILING, 1.0)
+    combined = (
+        WEIGHTS["mandatory"] * np.where(np.isnan(mandatory), similarity, mandatory)
+        + WEIGHTS["preferred"] * np.where(np.isnan(preferred), similarity, preferred)
+        + WEIGHTS["similarity"] * similarity
+    )
+    return np.rint(np.clip(combined, 0, 1) * 100).astype(int)
+
+
+def _resume_text(resume: dict) -> str:
+    return "\n".join(text for _, text in resume_sections(resume))
+
+
+def score_matrix(
+    resumes: List[dict],
+    jd_texts: List[str],
+    jd_analyses: Optional[List[dict]] = None
+) -> np.ndarray:
+    """
+    Scores (0-100) for every resume x JD pair as a (len(resumes), len(jd_texts))
+    int array. IDF is estimated over the resumes and JDs in the call, so scores
+    are comparable within one matrix.
+    """
+    if jd_analyses is None:
+        jd_analyses = [skill_extractor.extract_keywords(text) for text in jd_texts]
+    resume_texts = [_resume_text(r) for r in resumes]
+
+    keywords: Dict[str, int] = {}
+    for analysis in jd_analyses:
+        for k in analysis.get("mandatory_keywords", []) + analysis.get("preferred_keywords", []):
+            keywords.setdefault(k, len(keywords))
+    keyword_list = list(keywords)
+
+    mandatory_mask = np.zeros((len(jd_texts), len(keyword_list)), dtype=bool)
+    preferred_mask = np.zeros_like(mandatory_mask)
+    for row, analysis in enumerate(jd_analyses):
+        for k in analysis.get("mandatory_keywords", []):
+            mandatory_mask[row, keywords[k]] = True
+        for k in analysis.get("preferred_keywords", []):
+            preferred_mask[row, keywords[k]] = not mandatory_mask[row, keywords[k]]
+    presence = np.array([keyword_presence(text, keyword_list) for text in resume_texts]).reshape(
+        len(resumes), len(keyword_list)
+    )
+
+    vectors = _tfidf([tokenize(t) for t in resume_texts] + [tokenize(t) for t in jd_texts])
+    cosine = vectors[:len(resumes)] @ vectors[len(resumes):].T
+
+    return _score(_coverage(presence, mandatory_mask), _coverage(presence, preferred_mask), cosine)
+
+
+def score_resume(resume: dict, jd_text: str, jd_analysis: Optional[dict] = None) -> dict:
+    """
+    Local ATS analysis of one resume (same shape as main.analyze_resume_with_jd):
+    score, missing_keywords, matching_areas, recommendations, summary_feedback.
+    """
+    if jd_analysis is None:
+        jd_analysis = skill_extractor.extract_keywords(jd_text)
+    mandatory = list(dict.fromkeys(jd_analysis.get("mandatory_keywords", [])))
+    preferred = [k for k in dict.fromkeys(jd_analysis.get("preferred_keywords", [])) if k not in mandatory]
+
+    sections = resume_sections(resume)
+    resume_text = "\n".join(text for _, text in sections)
+    mandatory_hits = keyword_presence(resume_text, mandatory)
+    preferred_hits = keyword_presence(resume_text, preferred)
+    missing = [k for k, hit in zip(mandatory, mandatory_hits) if not hit]
+    missing_preferred = [k for k, hit in zip(preferred, preferred_hits) if not hit]
+
+    jd_tokens = tokenize(jd_text)
+    vectors = _tfidf([tokenize(resume_text), jd_tokens])
+    cosine = float(vectors[0] @ vectors[1])
+    score = int(_score(
+        np.array(mandatory_hits.mean() if mandatory else np.nan),
+        np.array(preferred_hits.mean() if preferred else np.nan),
+        np.array(cosine)
+    ))
+
+    # Matching areas: sections ranked by BM25 against the JD, labelled with the keywords they cover
+    section_scores = bm25([tokenize(text) for _, text in sections], jd_tokens)
+    matching_areas = []
+    for i in np.argsort(-section_scores)[:MAX_MATCHING]:
+        if section_scores[i] <= 0:
+            break
+        label, text = sections[i]
+        covered = [k for k, hit in zip(mandatory + preferred, keyword_presence(text, mandatory + preferred)) if hit]
+        matching_areas.append(f"{label} ({', '.join(covered[:4])})" if covered else label)
+
+    recommendations = []
+    if missing:
+        recommendations.append(f"Add required keywords where you have real experience: {', '.join(missing[:3])}.")
+    if missing_preferred:
+        recommendations.append(f"Mention preferred skills if applicable: {', '.join(missing_preferred[:3])}.")
+    if cosine < SIMILARITY_CEILING / 2:
+        recommendations.append("Mirror the job description's wording in your summary and most relevant bullets.")
+    if len(recommendations) < 3 and sections:
+        weakest = sections[int(np.argmin(section_scores))][0]
+        recommendations.append(f"Tighten or reframe '{weakest}' toward the role, or shorten it.")
+
+    if mandatory or preferred:
+        summary = f"Covers {len(mandatory) - len(missing)}/{len(mandatory)} required"
+        if preferred:
+            summary += f" and {len(preferred) - len(missing_preferred)}/{len(preferred)} preferred"
+        summary += " keywords"
+    else:
+        summary = "No known skill keywords found in the JD; scored on wording overlap"
+    if matching_areas:
+        summary += f"; strongest match: {matching_areas[0]}"
+
+    return {
+        "score": score,
+        "missing_keywords": (missing + missing_preferred)[:MAX_MISSING],
+        "matching_areas": matching_areas,
+        "recommendations": recommendations[:3],
+        "summary_feedback": summary + ".",
+    }
@@ -0,0 +1,348 @@
+"""
+AI Resume Generator - Batch Tailoring
+Tailors one profile against many job descriptions (a list, a directory of
+.txt files or a JSONL file) with a bounded worker pool and per-provider
+concurrency limits. Results stream back as they finish, completed jobs are
+checkpointed so an interrupted batch resumes where it stopped, and a
+throughput / per-stage latency report is produced at the end.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Union
+
+import jd_dedup
+import main
+import patch_tailor
+import provider_failover
+import sharded_tailor
+
+STAGES = ("parse", "tailor", "render")
+
+# Concurrent LLM calls allowed per provider (free tiers throttle hard)
+DEFAULT_PROVIDER_CONCURRENCY = {
+    "gemini": int(os.getenv("BATCH_GEMINI_CONCURRENCY", "4")),
+    "groq": int(os.getenv("BATCH_GROQ_CONCURRENCY", "2")),
+}
+
+# Tailoring entry points by mode (all share main.tailor_resume's signature)
+TAILOR_MODES = {
+    "single": main.tailor_resume,
+    "sharded": sharded_tailor.tailor_resume_sharded,
+    "patch": patch_tailor.tailor_resume_patch,
+}
+
+
+def job_id(jd_text: str) -> str:
+    """Stable id for a JD: identical postings share a checkpoint entry."""
+    return hashlib.sha256(jd_text.strip().encode("utf-8")).hexdigest()[:16]
+
+
+def load_jobs(source: Union[str, List]) -> List[dict]:
+    """
+    Normalize batch input into [{"id", "jd_text", "name"}].
+
+    Accepts a list of JD strings (or dicts with "jd_text"/"text"), a directory
+    of .txt/.md files, or a JSONL file with one {"jd_text": ...} (or "text",
+    optional "id"/"name") object per line.
+    """
+    entries = []
+    if isinstance(source, (list, tuple)):
+        for i, item in enumerate(source):
+            if isinstance(item, str):
+                entries.append({"jd_text": item, "name": f"job_{i + 1}"})
+            else:
+                entries.append({
+                    "jd_text": item.get("jd_text") or item.get("text", ""),
+                    "name": item.get("name") or f"job_{i + 1}",
+                    "id": item.get("id"),
+                })
+    elif os.path.isdir(source):
+        for filename in sorted(os.listdir(source)):
+            if filename.endswith((".txt", ".md")):
+                with open(os.path.join(source, filename), 'r', encoding='utf-8') as f:
+                    entries.append({"jd_text": f.read(), "name": os.path.splitext(filename)[0]})
+    elif source.endswith(".jsonl"):
+        with open(source, 'r', encoding='utf-8') as f:
+            for i, line in enumerate(f):
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                entries.append({
+                    "jd_text": item.get("jd_text") or item.get("text", ""),
+                    "name": item.get("name") or f"job_{i + 1}",
+                    "id": item.get("id"),
+                })
+    else:
+        raise Exception(f"Unsupported batch source: {source}")
+
+    jobs = []
+    for entry in entries:
+        if not entry["jd_text"].strip():
+            continue
+        jobs.append({
+            "id": entry.get("id") or job_id(entry["jd_text"]),
+            "jd_text": entry["jd_text"],
+            "name": entry["name"],
+        })
+    return jobs
+
+
+class Checkpoint:
+    """Append-only JSONL log of finished jobs. Thread-safe."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.completed: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn last line from an interrupted run
+                    if record.get("status") == "ok":
+                        self.completed[record["id"]] = record
+
+    def is_done(self, jid: str) -> bool:
+        return jid in self.completed
+
+    def record(self, result: dict):
+        if not self.path:
+            return
+        entry = {k: v for k, v in result.items() if k != "tailored_resume"}
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+            if result["status"] == "ok":
+                self.completed[result["id"]] = entry
+
+
+def _safe_filename(text: str) -> str:
+    return re.sub(r'[^A-Za-z0-9]+', '_', text).strip('_')[:60] or "resume"
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))
+    return round(ordered[index], 3)
+
+
+class BatchReport:
+    """Collects per-stage timings and throughput for one batch run."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.stage_times = {stage: [] for stage in STAGES}
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def add(self, result: dict):
+        with self._lock:
+            if result["status"] == "ok":
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            for stage, seconds in result.get("timings", {}).items():
+                self.stage_times[stage].append(seconds)
+
+    def summary(self) -> dict:
+        elapsed = time.monotonic() - self.started
+        with self._lock:
+            return {
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "skipped": self.skipped,
+                "elapsed": round(elapsed, 2),
+                "resumes_per_min": round(self.succeeded / elapsed * 60, 2) if elapsed > 0 else 0.0,
+                "stages": {
+                    stage: {
+                        "count": len(times),
+                        "mean": round(sum(times) / len(times), 3) if times else None,
+                        "p50": _percentile(times, 0.5),
+                        "p95": _percentile(times, 0.95),
+                    }
+                    for stage, times in self.stage_times.items()
+                },
+            }
+
+
+def _run_job(
+    job: dict,
+    base_resume: dict,
+    provider: str,
+    api_key: Optional[str],
+    tailoring_strategy: str,
+    bullet_counts: Optional[dict],
+    output_dir: Optional[str],
+    provider_slots: Dict[str, threading.Semaphore],
+    tailor_mode: str = "single"
+) -> dict:
+    """parse -> tailor -> render for one JD. Never raises; failures are reported in the result."""
+    timings = {}
+    result = {"id": job["id"], "name": job["name"], "status": "ok", "timings": timings}
+    try:
+        # Every LLM call holds a slot of the provider that serves it (failover
+        # included); rendering is local and does not
+        with provider_failover.provider_limits(provider_slots):
+            start = time.monotonic()
+            jd_analysis = main.parse_job_description(job["jd_text"], provider, api_key=api_key)
+            timings["parse"] = round(time.monotonic() - start, 3)
+            reused = jd_dedup.get_last_match()
+
+            start = time.monotonic()
+            tailor = TAILOR_MODES.get(tailor_mode, main.tailor_resume)
+            tailored = tailor(
+                base_resume, jd_analysis, provider, api_key=api_key,
+                tailoring_strategy=tailoring_strategy, bullet_counts=bullet_counts
+            )
+            timings["tailor"] = round(time.monotonic() - start, 3)
+            served = provider_failover.get_last_served() or {}
+
+        result["company_name"] = jd_analysis.get("company_name")
+        result["job_title"] = jd_analysis.get("job_title")
+        result["provider"] = served.get("provider") or provider
+        if reused:
+            result["reused_similarity"] = reused["similarity"]
+        result["tailored_resume"] = tailored
+        if "warning" in tailored:
+            # Every provider failed and this is the base resume: not done, so a resumed batch retries it
+            result["status"] = "fallback"
+            result["error"] = tailored["warning"]
+            return result
+
+        if output_dir:
+            start = time.monotonic()
+            label = "_".join(filter(None, [jd_analysis.get("company_name"), jd_analysis.get("job_title")])) or job["name"]
+            filename = os.path.join(output_dir, f"{_safe_filename(label)}_{job['id'][:8]}.pdf")
+            result["output"] = main.create_resume_pdf(tailored, filename)
+            timings["render"] = round(time.monotonic() - start, 3)
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = str(e)
+    return result
+
+
+def run_batch(
+    jobs: Union[str, List],
+    base_resume: dict = None,
+    provider: str = "gemini",
+    api_key: str = None,
+    tailoring_strategy: str = "balanced",
+    bullet_counts: dict = None,
+    output_dir: Optional[str] = "batch_output",
+    checkpoint_path: Optional[str] = None,
+    max_workers: int = 4,
+    provider_concurrency: dict = None,
+    report: BatchReport = None,
+    tailor_mode: str = "single"
+) -> Iterator[dict]:
+    """
+    Tailor `base_resume` against every job in `jobs`, yielding each result as it finishes.
+
+    Each result: {"id", "name", "status": "ok"|"fallback"|"error", "timings", "output",
+    "company_name", "job_title", "tailored_resume" | "error"}. "fallback" means
+    tailoring failed and the base resume came back (with "error"; no PDF).
+    Jobs already recorded as ok in `checkpoint_path` are skipped, so rerunning
+    an interrupted batch only does the remaining work. Pass a BatchReport to
+    read throughput and per-stage latency after the generator is exhausted.
+    tailor_mode "sharded" tailors each job with concurrent per-section calls
+    (each takes its own provider slot); "patch" asks for an edit script.
+    """
+    jobs = load_jobs(jobs)
+    if base_resume is None:
+        base_resume = main.get_base_resume()
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    report = report or BatchReport()
+    checkpoint = Checkpoint(checkpoint_path)
+    limits = dict(DEFAULT_PROVIDER_CONCURRENCY, **(provider_concurrency or {}))
+    provider_slots = {p: threading.BoundedSemaphore(max(1, limits.get(p, max_workers))) for p in main.PROVIDERS}
+
+    pending = []
+    seen = set()
+    for job in jobs:
+        if checkpoint.is_done(job["id"]) or job["id"] in seen:
+            report.skipped += 1
+            continue
+        seen.add(job["id"])
+        pending.append(job)
+
+    print(f"📦 Batch: {len(pending)} to run, {report.skipped} already done "
+          f"({max_workers} workers, concurrency "
+          f"{', '.join(f'{p} {limits.get(p, max_workers)}' for p in main.PROVIDERS)})")
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="batch") as pool:
+        futures = [
+            pool.submit(
+                _run_job, job, base_resume, provider, api_key,
+                tailoring_strategy, bullet_counts, output_dir, provider_slots, tailor_mode
+            )
+            for job in pending
+        ]
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                report.add(result)
+                checkpoint.record(result)
+                if result["status"] == "ok":
+                    print(f"   ✅ [{done}/{len(pending)}] {result['name']} ({sum(result['timings'].values()):.1f}s)")
+                else:
+                    print(f"   ❌ [{done}/{len(pending)}] {result['name']}: {result['error']}")
+                yield result
+        finally:
+            # Consumer stopped early: drop queued jobs, let running ones finish
+            for future in futures:
+                future.cancel()
+
+    summary = report.summary()
+    print(f"📊 Batch done: {summary['succeeded']} ok, {summary['failed']} failed, {summary['skipped']} skipped "
+          f"in {summary['elapsed']}s ({summary['resumes_per_min']} resumes/min)")
+    for stage, stats in summary["stages"].items():
+        if stats["count"]:
+            print(f"   ⏱️ {stage}: mean {stats['mean']}s, p50 {stats['p50']}s, p95 {stats['p95']}s")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Tailor one resume against many job descriptions")
+    parser.add_argument("source", help="Directory of .txt JDs or a .jsonl file")
+    parser.add_argument("--provider", choices=main.PROVIDERS, default="gemini")
+    parser.add_argument("--strategy", default="balanced")
+    parser.add_argument("--output-dir", default="batch_output")
+    parser.add_argument("--checkpoint", default=None, help="JSONL checkpoint (default: <output-dir>/checkpoint.jsonl)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=None, help="Max concurrent calls to the provider")
+    parser.add_argument("--tailor-mode", choices=list(TAILOR_MODES), default="single")
+    args = parser.parse_args()
+
+    report = BatchReport()
+    overrides = {args.provider: args.concurrency} if args.concurrency else None
+    for _ in run_batch(
+        args.source,
+        provider=args.provider,
+        tailoring_strategy=args.strategy,
+        output_dir=args.output_dir,
+        checkpoint_path=args.checkpoint or os.path.join(args.output_dir, "checkpoint.jsonl"),
+        max_workers=args.workers,
+        provider_concurrency=overrides,
+        report=report,
+        tailor_mode=args.tailor_mode
+    ):
+        pass
+
+
+if __name__ == "__main__":
+    main_cli()
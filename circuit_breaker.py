@@ -0,0 +1,230 @@
+"""
+AI Resume Generator - Circuit Breakers
+Health tracking per (provider, model). A breaker opens after repeated
+failures so calls skip a dead model immediately, half-opens after a cooldown
+to let one probe through, and closes again once the probe succeeds.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Breaker settings (see configure_breakers)
+_config = {
+    "window_seconds": 120.0,     # Rolling window for error rate / latency
+    "min_calls": 4,              # Calls in window before the error rate is trusted
+    "error_rate_threshold": 0.5,
+    "consecutive_failures": 3,   # Open immediately after this many failures in a row
+    "cooldown": 30.0,            # Seconds open before a half-open probe
+    "max_cooldown": 300.0,       # Cooldown doubles on failed probes up to this cap
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is skipped because its breaker is open."""
+
+
+class CircuitBreaker:
+    """Rolling-window breaker for one (provider, model). Thread-safe."""
+
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model
+        self.state = CLOSED
+        self._calls = deque()  # (timestamp, ok, latency)
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._cooldown = _config["cooldown"]
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float):
+        cutoff = now - _config["window_seconds"]
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (claims the probe slot when half-open)."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN and now - self._opened_at >= self._cooldown:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record(self, ok: bool, latency: float = None):
+        """Record the outcome of a call that allow() let through."""
+        with self._lock:
+            now = time.monotonic()
+            self._calls.append((now, ok, latency))
+            self._trim(now)
+
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if ok:
+                    print(f"   ✅ Circuit closed: {self.provider}/{self.model} recovered")
+                    self.state = CLOSED
+                    self._cooldown = _config["cooldown"]
+                    self._consecutive_failures = 0
+                    # Start the error rate afresh so old failures cannot re-trip it
+                    self._calls.clear()
+                    self._calls.append((now, ok, latency))
+                else:
+                    self._cooldown = min(_config["max_cooldown"], self._cooldown * 2)
+                    self._open(now)
+                return
+
+            if ok:
+                self._consecutive_failures = 0
+                return
+
+            self._consecutive_failures += 1
+            failures = sum(1 for _, call_ok, _ in self._calls if not call_ok)
+            error_rate = failures / len(self._calls)
+            if (self._consecutive_failures >= _config["consecutive_failures"]
+                    or (len(self._calls) >= _config["min_calls"] and error_rate >= _config["error_rate_threshold"])):
+                self._open(now)
+
+    def release_probe(self):
+        """Free a half-open probe slot after a neutral outcome (e.g. a 429)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _open(self, now: float):
+        if self.state != OPEN:
+            print(f"   🔌 Circuit open: skipping {self.provider}/{self.model} for {self._cooldown:.0f}s")
+        self.state = OPEN
+        self._opened_at = now
+
+    def snapshot(self) -> dict:
+        """State, error rate and latency percentiles for monitoring."""
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            calls = list(self._calls)
+            state = self.state
+            if state == OPEN and now - self._opened_at >= self._cooldown:
+                state = HALF_OPEN
+            retry_in = max(0.0, self._cooldown - (now - self._opened_at)) if state == OPEN else 0.0
+
+        latencies = sorted(lat for _, ok, lat in calls if ok and lat is not None)
+        failures = sum(1 for _, ok, _ in calls if not ok)
+
+        def pct(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(round(p * (len(latencies) - 1))))], 3)
+
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "state": state,
+            "calls": len(calls),
+            "error_rate": round(failures / len(calls), 4) if calls else 0.0,
+            "p50_latency": pct(0.5),
+            "p95_latency": pct(0.95),
+            "retry_in": round(retry_in, 1),
+        }
+
+
+_breakers: Dict[tuple, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(provider: str, model: str) -> CircuitBreaker:
+    """Return the shared breaker for (provider, model)."""
+    key = (provider, model)
+    breaker = _breakers.get(key)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(key, CircuitBreaker(provider, model))
+    return breaker
+
+
+def is_failure_status(status_code: int) -> bool:
+    """Statuses that count against a model's health (rate limits and bad requests do not)."""
+    return status_code >= 500 or status_code in (401, 403, 404, 408)
+
+
+def record_response(provider: str, model: str, status_code: int, latency: float):
+    """Feed an HTTP outcome into the breaker; neutral statuses are ignored."""
+    if status_code == 200:
+        get_breaker(provider, model).record(True, latency)
+    elif is_failure_status(status_code):
+        get_breaker(provider, model).record(False, latency)
+    else:
+        get_breaker(provider, model).release_probe()
+
+
+def record_exception(provider: str, model: str, latency: float = None):
+    """Feed a transport failure (timeout, connection error) into the breaker."""
+    get_breaker(provider, model).record(False, latency)
+
+
+def track(provider: str, model: str, request: Callable[[], object]) -> Callable[[], object]:
+    """Wrap a provider request so every HTTP outcome feeds the model's breaker."""
+    def run():
+        start = time.monotonic()
+        try:
+            response = request()
+        except Exception:
+            record_exception(provider, model, time.monotonic() - start)
+            raise
+        except BaseException:
+            # Interrupted, not failed: free a half-open probe so the next call can retry
+            get_breaker(provider, model).release_probe()
+            raise
+        record_response(provider, model, response.status_code, time.monotonic() - start)
+        return response
+    return run
+
+
+def track_async(provider: str, model: str, request: Callable[[], Awaitable]) -> Callable[[], Awaitable]:
+    """Async counterpart of track()."""
+    async def run():
+        start = time.monotonic()
+        try:
+            response = await request()
+        except Exception:
+            record_exception(provider, model, time.monotonic() - start)
+            raise
+        except BaseException:
+            # Cancelled (wait_for deadline, hedge or gather): the probe slot must not stay claimed
+            get_breaker(provider, model).release_probe()
+            raise
+        record_response(provider, model, response.status_code, time.monotonic() - start)
+        return response
+    return run
+
+
+def breaker_states(provider: Optional[str] = None) -> list:
+    """Snapshots of every known breaker (optionally filtered by provider)."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [b.snapshot() for b in breakers if provider is None or b.provider == provider]
+
+
+def configure_breakers(**settings) -> dict:
+    """Update breaker settings (window_seconds, min_calls, error_rate_threshold, ...)."""
+    for key, value in settings.items():
+        if key not in _config:
+            raise ValueError(f"Unknown circuit breaker setting: {key}")
+        if value is not None:
+            _config[key] = value
+    return dict(_config)
+
+
+def reset_breakers():
+    """Forget all health history."""
+    with _breakers_lock:
+        _breakers.clear()
@@ -0,0 +1,198 @@
+"""
+AI Resume Generator - Hedged Requests
+Races a model fallback chain instead of walking it serially: if the primary
+has not answered within a latency percentile of its recent history, the next
+model is fired as well, and the first valid response wins.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Optional
+
+# Hedging settings (see configure_hedging)
+_config = {
+    "enabled": os.getenv("LLM_HEDGE", "0") == "1",
+    "percentile": 0.95,     # Hedge once the primary is slower than this share of its history
+    "default_delay": 8.0,   # Seconds to wait before hedging when history is too short
+    "min_delay": 1.0,
+    "max_delay": 30.0,
+    "min_samples": 5,
+}
+
+# Shared pool so losers keep running in the background instead of blocking the caller
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+# Per thread / per asyncio task: report of the last hedged race (see get_last_hedge_report)
+_last_report = contextvars.ContextVar("last_hedge_report", default=None)
+
+
+class LatencyTracker:
+    """Rolling window of successful-call latencies per model. Thread-safe."""
+
+    def __init__(self, window: int = 100):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, model: str, pct: float) -> Optional[float]:
+        """Latency at percentile `pct` (0-1), or None with no history."""
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct * (len(samples) - 1))))
+        return samples[index]
+
+    def count(self, model: str) -> int:
+        with self._lock:
+            return len(self._samples.get(model, ()))
+
+
+latency_tracker = LatencyTracker()
+
+
+def configure_hedging(
+    enabled: bool = None,
+    percentile: float = None,
+    default_delay: float = None,
+    min_delay: float = None,
+    max_delay: float = None,
+    min_samples: int = None
+) -> dict:
+    """Update hedging settings. Returns the effective configuration."""
+    updates = {
+        "enabled": enabled,
+        "percentile": percentile,
+        "default_delay": default_delay,
+        "min_delay": min_delay,
+        "max_delay": max_delay,
+        "min_samples": min_samples,
+    }
+    for key, value in updates.items():
+        if value is not None:
+            _config[key] = value
+    return dict(_config)
+
+
+def is_enabled(override: bool = None) -> bool:
+    """Per-call override wins over the global setting."""
+    return _config["enabled"] if override is None else override
+
+
+def hedge_delay(model: str) -> float:
+    """Seconds to give `model` before firing the next one in the chain."""
+    delay = None
+    if latency_tracker.count(model) >= _config["min_samples"]:
+        delay = latency_tracker.percentile(model, _config["percentile"])
+    if delay is None:
+        delay = _config["default_delay"]
+    return max(_config["min_delay"], min(_config["max_delay"], delay))
+
+
+def get_last_hedge_report() -> Optional[dict]:
+    """
+    Report of the most recent hedged race in this thread / task (None when
+    the last request was not hedged). main.query_provider passes it along
+    with the served-by report, so it is also set for merged requests.
+    """
+    return _last_report.get()
+
+
+def record_hedge_report(report: Optional[dict]):
+    """Set the hedge report for this thread / task (e.g. for merged or cached requests)."""
+    _last_report.set(report)
+
+
+def race_chain(
+    models: List[str],
+    attempt: Callable[[str, threading.Event], Optional[str]],
+    is_valid: Callable[[Optional[str]], bool] = bool
+) -> dict:
+    """
+    Run `attempt(model, cancelled)` across `models` with hedging.
+
+    The first model starts immediately; each subsequent model is launched when
+    the previous one exceeds its hedge delay or fails. The first result passing
+    `is_valid` wins and `cancelled` is set so losers stop before any follow-up
+    request (in-flight HTTP calls are abandoned, not interrupted).
+
+    Returns:
+        dict with: text, model, hedge_delays, models_fired, elapsed
+    Raises:
+        Exception if every model fails.
+    """
+    start = time.monotonic()
+    cancelled = threading.Event()
+    pending = {}
+    hedge_delays = []
+    next_index = 0
+    last_launch = start
+
+    def launch():
+        nonlocal next_index, last_launch
+        model = models[next_index]
+        next_index += 1
+        launched_at = last_launch = time.monotonic()
+
+        def run():
+            result = attempt(model, cancelled)
+            if is_valid(result):
+                latency_tracker.record(model, time.monotonic() - launched_at)
+            return result
+
+        # Run in this request's context so the leg keeps its transport deadline
+        pending[_executor.submit(contextvars.copy_context().run, run)] = model
+
+    launch()
+    try:
+        while pending:
+            delay = timeout = None
+            if next_index < len(models):
+                delay = hedge_delay(models[next_index - 1])
+                timeout = max(0.0, delay - (time.monotonic() - last_launch))
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # Primary is slow: hedge with the next model
+                hedge_delays.append(round(delay, 3))
+                print(f"   ⏱️ Hedging: {models[next_index - 1]} exceeded {delay:.1f}s, firing {models[next_index]}...")
+                launch()
+                continue
+
+            for future in done:
+                model = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"   ⚠️ Hedged attempt failed ({model}): {e}")
+                    result = None
+                if is_valid(result):
+                    report = {
+                        "text": result,
+                        "model": model,
+                        "hedge_delays": hedge_delays,
+                        "models_fired": models[:next_index],
+                        "elapsed": round(time.monotonic() - start, 3),
+                    }
+                    _last_report.set({k: v for k, v in report.items() if k != "text"})
+                    print(f"   🏁 Hedged race won by {model} in {report['elapsed']}s")
+                    return report
+
+            # A finished attempt failed: fire the next model without waiting
+            if next_index < len(models):
+                launch()
+    finally:
+        cancelled.set()
+        for future in pending:
+            future.cancel()
+
+    _last_report.set({"model": None, "hedge_delays": hedge_delays, "models_fired": models[:next_index],
+                      "elapsed": round(time.monotonic() - start, 3)})
+    raise Exception("All hedged attempts failed.")
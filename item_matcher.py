@@ -0,0 +1,198 @@
+"""
+AI Resume Generator - Item Matching
+Maps tailored items back to the profile items they came from so immutable
+fields (role, company, dates) can be restored. The index is built once per
+base profile: exact-key hash maps over the normalized company, role and name
+of every item, plus a token inverted index that finds the few items sharing
+words with a generated one. Only those candidates are scored (KEY_POINTS per
+exact or partial key match) and the assignment is one-to-one, so two
+generated items can never claim the same original. Each match reports a
+confidence.
+"""
+
+import re
+import threading
+import weakref
+from collections import Counter, OrderedDict, defaultdict
+from typing import Dict, List, NamedTuple, Optional
+
+import jd_dedup
+import profile_model
+
+# Profile sections whose items can be matched (pool order breaks ties)
+SECTIONS = ["experience", "leadership", "projects", "research", "certifications", "awards", "volunteering"]
+
+# Points per key: (exact match, one contains the other)
+KEY_POINTS = {"company": (3, 1), "role": (2, 1), "name": (5, 2)}
+# Fewer points than this is no match
+MIN_POINTS = 2
+# Matches below this confidence are counted (and logged) as low-confidence
+LOW_CONFIDENCE = 0.5
+# Candidates scored per generated item, most shared words first
+MAX_CANDIDATES = 32
+# Indexes kept for recent base profiles
+INDEX_CACHE_SIZE = 16
+
+_WORD = re.compile(r'[a-z0-9+#]+')
+
+
+class Match(NamedTuple):
+    item: profile_model.Item
+    section: str
+    index: int
+    points: int
+    confidence: float
+
+
+def normalize(text) -> str:
+    return " ".join(_WORD.findall(str(text or "").lower()))
+
+
+def item_keys(item: dict, original: bool = False) -> Dict[str, str]:
+    """Normalized company/role/name of an item (originals also match on conference)."""
+    company = item.get("company") or item.get("organization") or (item.get("conference") if original else "")
+    return {
+        "company": normalize(company),
+        "role": normalize(item.get("role") or item.get("title")),
+        "name": normalize(item.get("name") or item.get("title")),
+    }
+
+
+def key_points(generated: Dict[str, str], original: Dict[str, str]) -> int:
+    points = 0
+    for key, (exact, partial) in KEY_POINTS.items():
+        a, b = generated[key], original[key]
+        if not a or not b:
+            continue
+        if a == b:
+            points += exact
+        elif a in b or b in a:
+            points += partial
+    return points
+
+
+def max_points(generated: Dict[str, str]) -> int:
+    """Points of a perfect match for the keys the generated item has."""
+    return sum(exact for key, (exact, _) in KEY_POINTS.items() if generated[key])
+
+
+class MatchIndex:
+    """Match index over the items of one loaded profile (the immutable Items are kept, not copied)."""
+
+    def __init__(self, profile: profile_model.Profile):
+        self.entries = []  # (section, index, item, keys)
+        self._exact = {key: defaultdict(list) for key in KEY_POINTS}
+        self._tokens = defaultdict(list)
+        for section in SECTIONS:
+            for i, item in enumerate(profile.items_of(section)):
+                if not isinstance(item, profile_model.Item):
+                    continue
+                position = len(self.entries)
+                keys = item_keys(item, original=True)
+                self.entries.append((section, i, item, keys))
+                for key, value in keys.items():
+                    if value:
+                        self._exact[key][value].append(position)
+                for token in set(" ".join(keys.values()).split()):
+                    self._tokens[token].append(position)
+
+    def candidates(self, keys: Dict[str, str]) -> List[int]:
+        """Positions of originals worth scoring: exact key hits first, then by shared words."""
+        shared = Counter()
+        tokens = sorted(set(" ".join(keys.values()).split()), key=lambda t: len(self._tokens.get(t, ())))
+        for n, token in enumerate(tokens):
+            postings = self._tokens.get(token, ())
+            if n and len(postings) > MAX_CANDIDATES:
+                break  # Rarer words were counted; common ones ("engineer") would only add noise
+            shared.update(postings)
+        for key, value in keys.items():
+            for position in self._exact[key].get(value, ()) if value else ():
+                shared[position] += 100
+        return [position for position, _ in shared.most_common(MAX_CANDIDATES)]
+
+    def assign(self, generated: List[dict]) -> List[Optional[Match]]:
+        """
+        One-to-one matches for generated items (None where nothing scores
+        MIN_POINTS under KEY_POINTS). Stronger pairs are assigned first; ties
+        go to the earlier original.
+        """
+        pairs = []
+        perfect = []
+        for g, item in enumerate(generated):
+            keys = item_keys(item) if isinstance(item, dict) else dict.fromkeys(KEY_POINTS, "")
+            perfect.append(max_points(keys))
+            for position in self.candidates(keys):
+                points = key_points(keys, self.entries[position][3])
+                if points >= MIN_POINTS:
+                    pairs.append((-points, position, g))
+
+        matches: List[Optional[Match]] = [None] * len(generated)
+        claimed = set()
+        for negative_points, position, g in sorted(pairs):
+            if matches[g] is not None or position in claimed:
+                continue
+            claimed.add(position)
+            section, i, item, _ = self.entries[position]
+            points = -negative_points
+            matches[g] = Match(item, section, i, points, min(points / perfect[g], 1.0))
+        return matches
+
+
+_cache_lock = threading.Lock()
+_cache = OrderedDict()  # profile content key -> MatchIndex
+_by_profile: Dict[int, MatchIndex] = {}  # id(Profile) -> MatchIndex, dropped when the Profile is collected
+_stats = {"indexes_built": 0, "matched": 0, "unmatched": 0, "low_confidence": 0}
+
+
+def get_index(profile) -> MatchIndex:
+    """
+    Match index for a base profile (dict or Profile), built once and reused
+    while it is unchanged. Matches carry the profile's Items, ids included.
+    A loaded Profile is immutable, so its index is remembered per instance and
+    repeat calls (one per streamed item) skip hashing the profile.
+    """
+    profile = profile_model.load_profile(profile)
+    with _cache_lock:
+        index = _by_profile.get(id(profile))
+    if index is not None:
+        return index
+
+    key = jd_dedup.content_key([profile.get(section) for section in SECTIONS])
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+    if index is None:
+        index = MatchIndex(profile)
+        with _cache_lock:
+            _cache[key] = index
+            _stats["indexes_built"] += 1
+            while len(_cache) > INDEX_CACHE_SIZE:
+                _cache.popitem(last=False)
+
+    with _cache_lock:
+        if id(profile) not in _by_profile:
+            _by_profile[id(profile)] = index
+            weakref.finalize(profile, _forget_profile, id(profile))
+    return index
+
+
+def _forget_profile(profile_id: int):
+    with _cache_lock:
+        _by_profile.pop(profile_id, None)
+
+
+def record(matches: List[Optional[Match]]):
+    with _cache_lock:
+        for match in matches:
+            if match is None:
+                _stats["unmatched"] += 1
+            else:
+                _stats["matched"] += 1
+                _stats["low_confidence"] += match.confidence < LOW_CONFIDENCE
+
+
+def matcher_stats() -> dict:
+    """Matching counters and the number of cached indexes."""
+    with _cache_lock:
+        return dict(_stats, cached_indexes=len(_cache))
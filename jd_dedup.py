@@ -0,0 +1,269 @@
+"""
+AI Resume Generator - Near-Duplicate JD Index
+The same posting shows up on LinkedIn, Greenhouse and the company site with
+different formatting. JD text is normalized, shingled and MinHash-signed;
+LSH banding finds candidate postings in near-constant time and the estimated
+Jaccard similarity decides whether a previously analyzed JD (and the resumes
+tailored against it) can be reused instead of calling the provider again.
+Backed by SQLite so the index survives restarts.
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+from typing import List, Optional
+
+NUM_PERM = 64
+BANDS = 16  # 16 bands x 4 rows: pairs above ~0.5 Jaccard become candidates
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.85
+
+_MERSENNE = (1 << 61) - 1
+_rng = random.Random(1729)  # Fixed seed: signatures must be stable across processes
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE)) for _ in range(NUM_PERM)]
+
+_URL = re.compile(r'https?://\S+|www\.\S+')
+_NON_WORD = re.compile(r'[^a-z0-9+#]+')
+
+# Match served for the current request (see get_last_match)
+_last_match = contextvars.ContextVar("jd_dedup_last_match", default=None)
+
+
+def normalize_jd(text: str) -> List[str]:
+    """Lowercased word tokens with URLs, punctuation and formatting removed."""
+    text = _URL.sub(" ", (text or "").lower())
+    return [token for token in _NON_WORD.split(text) if token]
+
+
+def shingles(tokens: List[str], size: int = SHINGLE_SIZE) -> set:
+    if len(tokens) < size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash(text: str) -> List[int]:
+    """MinHash signature of a JD's normalized shingle set."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+        for s in shingles(normalize_jd(text))
+    ]
+    if not hashes:
+        return [_MERSENNE] * NUM_PERM
+    return [min((a * h + b) % _MERSENNE for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def band_keys(signature: List[int]) -> List[str]:
+    rows = NUM_PERM // BANDS
+    return [
+        f"{band}:" + hashlib.blake2b(
+            json.dumps(signature[band * rows:(band + 1) * rows]).encode(), digest_size=8
+        ).hexdigest()
+        for band in range(BANDS)
+    ]
+
+
+def _json_default(value):
+    return dict(value) if isinstance(value, Mapping) else str(value)
+
+
+def content_key(value) -> str:
+    """Stable hash of any JSON-serializable value (mappings such as a Profile hash as their data)."""
+    raw = json.dumps(value, sort_keys=True, ensure_ascii=False, default=_json_default)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class JDIndex:
+    """
+    Persistent near-duplicate index of analyzed JDs. Thread-safe.
+
+    Args:
+        db_path: SQLite file (None keeps the index in memory for this process)
+        threshold: Minimum estimated Jaccard similarity for a reuse hit
+        max_age: Seconds an indexed JD stays reusable (None = forever)
+        enabled: When False, lookups always miss and stores are no-ops
+    """
+
+    def __init__(
+        self,
+        db_path: str = None,
+        threshold: float = DEFAULT_THRESHOLD,
+        max_age: float = None,
+        enabled: bool = True
+    ):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.max_age = max_age
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "hits": 0, "exact_hits": 0, "tailored_hits": 0, "stored": 0}
+
+        self._db = sqlite3.connect(db_path or ":memory:", check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS jd_index ("
+            "id TEXT PRIMARY KEY, signature TEXT NOT NULL, analysis TEXT NOT NULL, created_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS jd_bands (band TEXT NOT NULL, id TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_jd_bands ON jd_bands(band);"
+            "CREATE TABLE IF NOT EXISTS jd_tailored ("
+            "key TEXT PRIMARY KEY, resume TEXT NOT NULL, created_at REAL NOT NULL);"
+        )
+        self._db.commit()
+
+    def _fresh(self, created_at: float) -> bool:
+        return self.max_age is None or time.time() - created_at < self.max_age
+
+    def lookup(self, jd_text: str) -> Optional[dict]:
+        """
+        Best previously analyzed JD at or above the threshold.
+        Returns {"id", "similarity", "analysis"} or None.
+        """
+        if not self.enabled:
+            return None
+        text_id = content_key(normalize_jd(jd_text))
+        signature = minhash(jd_text)
+
+        with self._lock:
+            self._stats["lookups"] += 1
+            row = self._db.execute("SELECT analysis, created_at FROM jd_index WHERE id = ?", (text_id,)).fetchone()
+            if row is not None and self._fresh(row[1]):
+                self._stats["hits"] += 1
+                self._stats["exact_hits"] += 1
+                return {"id": text_id, "similarity": 1.0, "analysis": json.loads(row[0])}
+
+            keys = band_keys(signature)
+            placeholders = ",".join("?" * len(keys))
+            candidates = self._db.execute(
+                f"SELECT DISTINCT i.id, i.signature, i.analysis, i.created_at FROM jd_bands b "
+                f"JOIN jd_index i ON i.id = b.id WHERE b.band IN ({placeholders})", keys
+            ).fetchall()
+
+            best = None
+            for candidate_id, candidate_sig, analysis, created_at in candidates:
+                if not self._fresh(created_at):
+                    continue
+                score = similarity(signature, json.loads(candidate_sig))
+                if score >= self.threshold and (best is None or score > best["similarity"]):
+                    best = {"id": candidate_id, "similarity": round(score, 4), "analysis": analysis}
+            if best is None:
+                return None
+            self._stats["hits"] += 1
+        best["analysis"] = json.loads(best["analysis"])
+        return best
+
+    def add(self, jd_text: str, analysis: dict) -> Optional[str]:
+        """Index a JD with its analysis. Returns the entry id."""
+        if not self.enabled or not isinstance(analysis, dict):
+            return None
+        text_id = content_key(normalize_jd(jd_text))
+        signature = minhash(jd_text)
+
+        with self._lock:
+            self._db.execute("DELETE FROM jd_bands WHERE id = ?", (text_id,))
+            self._db.execute(
+                "INSERT OR REPLACE INTO jd_index (id, signature, analysis, created_at) VALUES (?, ?, ?, ?)",
+                (text_id, json.dumps(signature), json.dumps(analysis, ensure_ascii=False), time.time())
+            )
+            self._db.executemany(
+                "INSERT INTO jd_bands (band, id) VALUES (?, ?)", [(key, text_id) for key in band_keys(signature)]
+            )
+            self._db.commit()
+            self._stats["stored"] += 1
+        return text_id
+
+    def get_tailored(self, key: str) -> Optional[dict]:
+        """Tailored resume previously stored under `key` (see tailoring_key)."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            row = self._db.execute("SELECT resume, created_at FROM jd_tailored WHERE key = ?", (key,)).fetchone()
+            if row is None or not self._fresh(row[1]):
+                return None
+            self._stats["tailored_hits"] += 1
+        return json.loads(row[0])
+
+    def put_tailored(self, key: str, resume: dict):
+        if not self.enabled or not isinstance(resume, dict):
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO jd_tailored (key, resume, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(resume, ensure_ascii=False), time.time())
+            )
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.executescript("DELETE FROM jd_index; DELETE FROM jd_bands; DELETE FROM jd_tailored;")
+            self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = self._db.execute("SELECT COUNT(*) FROM jd_index").fetchone()[0]
+            stats["tailored_entries"] = self._db.execute("SELECT COUNT(*) FROM jd_tailored").fetchone()[0]
+        stats["hit_rate"] = round(stats["hits"] / stats["lookups"], 4) if stats["lookups"] else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def tailoring_key(jd_analysis: dict, base_resume: dict, tailoring_strategy: str, bullet_counts: Optional[dict]) -> str:
+    """Identity of one tailoring request (near-duplicate JDs share their reused analysis)."""
+    return content_key([jd_analysis, base_resume, tailoring_strategy, bullet_counts])
+
+
+def record_match(match: Optional[dict]):
+    _last_match.set(match)
+
+
+def get_last_match() -> Optional[dict]:
+    """
+    Near-duplicate match behind the last parse_job_description call in this
+    context: {"id", "similarity"} or None when the JD was analyzed fresh.
+    """
+    return _last_match.get()
+
+
+_index: Optional[JDIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> JDIndex:
+    """
+    Return the process-wide index. Disabled unless JD_DEDUP=1 is set or
+    configure_index(enabled=True) has been called; JD_DEDUP_PATH persists it
+    and JD_DEDUP_THRESHOLD sets the similarity threshold.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = JDIndex(
+                    db_path=os.getenv("JD_DEDUP_PATH") or None,
+                    threshold=float(os.getenv("JD_DEDUP_THRESHOLD", DEFAULT_THRESHOLD)),
+                    enabled=os.getenv("JD_DEDUP", "0") == "1"
+                )
+    return _index
+
+
+def configure_index(**kwargs) -> JDIndex:
+    """Replace the process-wide index (accepts JDIndex arguments)."""
+    global _index
+    with _index_lock:
+        if _index is not None:
+            _index.close()
+        _index = JDIndex(**kwargs)
+    return _index
@@ -0,0 +1,184 @@
+"""
+AI Resume Generator - JSON Extraction
+Pulls the first top-level JSON object out of model output in one linear scan
+(strings and escapes honored), skipping prose and ```json fences around it.
+Common model defects are repaired instead of failing the whole call:
+trailing commas are dropped and a truncated tail is cut back to the last
+complete element (a complete trailing number or literal is kept) and
+closed. A top-level span that does not parse is rejected as a whole. Works on a full string or incrementally over
+streamed chunks.
+"""
+
+import json
+from typing import Optional
+
+_CLOSERS = {'{': '}', '[': ']'}
+
+
+def strip_trailing_commas(text: str) -> str:
+    """Remove commas that directly precede a closing bracket (outside strings)."""
+    out = []
+    in_string = False
+    escape = False
+    pending_comma = None  # Index in `out` of a comma that may need dropping
+
+    for ch in text:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch in '}]' and pending_comma is not None:
+            del out[pending_comma]
+            pending_comma = None
+        elif not ch.isspace():
+            pending_comma = None
+
+        if ch == '"':
+            in_string = True
+        elif ch == ',':
+            pending_comma = len(out)
+        out.append(ch)
+    return "".join(out)
+
+
+def _loads(text: str):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    try:
+        return json.loads(strip_trailing_commas(text))
+    except json.JSONDecodeError:
+        return None
+
+
+class JSONExtractor:
+    """
+    Incremental scanner for the first parseable top-level JSON object.
+
+    feed() consumes a chunk and returns the object once it has closed and
+    parsed (None until then). finish() is called at end of input and
+    returns the object, repairing a truncated tail if the stream stopped
+    before the object closed.
+    """
+
+    def __init__(self, repair: bool = True):
+        self.repair = repair
+        self.text = ""
+        self.value = None
+        self.done = False
+
+        self._pos = 0
+        self._reset_object()
+
+    def _reset_object(self):
+        self._start = None
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._after_colon = False
+        self._cut = None          # Last position where the object can be cut and closed
+        self._cut_stack = ()
+
+    def feed(self, chunk: str):
+        if self.done or not chunk:
+            return self.value
+        self.text += chunk
+        text = self.text
+        i = self._pos
+        n = len(text)
+
+        while i < n:
+            ch = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    # A closed string inside an array, or after a ':' is a complete value
+                    if self._stack and (self._stack[-1] == '[' or self._after_colon):
+                        self._cut, self._cut_stack = i + 1, tuple(self._stack)
+                    self._after_colon = False
+                i += 1
+                continue
+
+            if self._start is None:
+                if ch == '{':
+                    self._start = i
+                    self._stack = ['{']
+                    self._cut, self._cut_stack = i + 1, ('{',)
+                i += 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                # Not a cut point: an element cut right after its opener would survive as {} / []
+                self._stack.append(ch)
+            elif ch in '}]':
+                self._stack.pop()
+                if not self._stack:
+                    value = _loads(text[self._start:i + 1])
+                    if isinstance(value, dict):
+                        self.value = value
+                        self.done = True
+                        self._pos = i + 1
+                        return value
+                    # Balanced but not JSON (e.g. "{name}" in prose): the whole span is
+                    # rejected, objects nested in it included, and never rescanned
+                    self._reset_object()
+                    i += 1
+                    continue
+                self._cut, self._cut_stack = i + 1, tuple(self._stack)
+            elif ch == ',':
+                self._cut, self._cut_stack = i, tuple(self._stack)
+            elif ch == ':':
+                self._after_colon = True
+            if ch != ':' and not ch.isspace() and ch != '"':
+                self._after_colon = False
+            i += 1
+
+        self._pos = i
+        return None
+
+    def finish(self) -> Optional[dict]:
+        """End of input: the closed object, a repaired truncated one, or None."""
+        if self.done or self._start is None or not self.repair:
+            return self.value
+
+        tail = self.text[self._start:].rstrip()
+        value = None
+        if not self._in_string and tail[-1] not in '{[':
+            # Ends on a complete value ("score": 8): close it as is
+            value = _loads(tail + "".join(_CLOSERS[b] for b in reversed(self._stack)))
+        if not isinstance(value, dict):
+            # Drop the partially written element and close everything still open
+            body = self.text[self._start:self._cut].rstrip().rstrip(',')
+            value = _loads(body + "".join(_CLOSERS[b] for b in reversed(self._cut_stack)))
+        if isinstance(value, dict) and value:
+            self.value = value
+            print(f"   🩹 Repaired truncated JSON ({len(self.text) - self._start} chars)")
+        return self.value
+
+
+def extract_json(text: str, repair: bool = True) -> Optional[dict]:
+    """
+    First JSON object in `text` (prose and code fences around it are ignored).
+    Returns None when nothing parseable is found.
+    """
+    if not text:
+        return None
+    extractor = JSONExtractor(repair=repair)
+    value = extractor.feed(text)
+    if value is not None:
+        return value
+    return extractor.finish()
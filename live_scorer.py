@@ -0,0 +1,225 @@
+"""
+AI Resume Generator - Incremental ATS Scoring
+Live re-scoring while a resume is edited one field at a time. Every summary
+sentence, skill category and bullet is indexed once against the JD keyword
+set; an edit re-tokenizes only the changed field and applies the difference
+to keyword coverage counts and to the TF-IDF cosine terms, so the score and
+missing keywords update in well under a millisecond. Scores match
+ats_scorer.score_resume (phrases are matched within a field). The state is
+plain JSON (to_dict / from_dict) so it can be kept between requests.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import ats_scorer
+import skill_extractor
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+# In the two-document corpus (resume, JD) a term's IDF only depends on whether both contain it
+_IDF_SHARED = math.log(3 / 3) + 1
+_IDF_SINGLE = math.log(3 / 2) + 1
+
+
+def _tf(count: int) -> float:
+    return 1 + math.log(count) if count > 0 else 0.0
+
+
+def resume_fields(resume: dict) -> Dict[str, str]:
+    """
+    Editable fields of a resume keyed by path: "summary.0" (sentence),
+    "skills.Languages", "experience.0.bullets.2", "experience.0.title"
+    (role and company) and one field per remaining section.
+    """
+    fields = {}
+    summary = ats_scorer._TAG.sub(" ", resume.get("summary") or "")
+    for i, sentence in enumerate(s for s in _SENTENCE_END.split(summary) if s.strip()):
+        fields[f"summary.{i}"] = sentence
+
+    skills = resume.get("skills")
+    if isinstance(skills, dict):
+        for category, value in skills.items():
+            fields[f"skills.{category}"] = f"{category} {value}"
+    elif skills:
+        fields["skills"] = " ".join(str(s) for s in skills if s) if isinstance(skills, list) else str(skills)
+
+    for section, (title_key, org_key) in ats_scorer._ENTRY_SECTIONS.items():
+        for i, entry in enumerate(resume.get(section) or []):
+            if not isinstance(entry, dict):
+                continue
+            fields[f"{section}.{i}.title"] = " ".join(
+                filter(None, [str(entry.get(title_key) or ""), str(entry.get(org_key) or "") if org_key else ""])
+            )
+            for j, bullet in enumerate(entry.get("bullets") or []):
+                fields[f"{section}.{i}.bullets.{j}"] = str(bullet)
+
+    for label, text in ats_scorer.resume_sections(resume):
+        if label in ("Education", "Certifications", "Awards"):
+            fields[label.lower()] = text
+    return fields
+
+
+class LiveScorer:
+    """
+    Incremental ATS score for one resume/JD pair.
+
+    Args:
+        resume: Resume dict (indexed into fields by resume_fields)
+        jd_text: Job description text
+        jd_analysis: Keyword analysis to score against (default: local skill extractor)
+    """
+
+    def __init__(self, resume: dict = None, jd_text: str = "", jd_analysis: Optional[dict] = None):
+        if jd_analysis is None:
+            jd_analysis = skill_extractor.extract_keywords(jd_text)
+        mandatory = list(dict.fromkeys(jd_analysis.get("mandatory_keywords", [])))
+        preferred = [k for k in dict.fromkeys(jd_analysis.get("preferred_keywords", [])) if k not in mandatory]
+        self._setup(mandatory, preferred, Counter(ats_scorer.tokenize(jd_text)))
+        for field, text in resume_fields(resume or {}).items():
+            self._apply(field, self._index(text))
+
+    def _setup(self, mandatory: List[str], preferred: List[str], jd_counts: Counter):
+        self.mandatory = mandatory
+        self.preferred = preferred
+        self.keywords = mandatory + preferred
+        self._phrases = [ats_scorer._normalize_phrase(k) for k in self.keywords]
+        self.jd_counts = jd_counts
+
+        self.fields: Dict[str, dict] = {}
+        self.keyword_counts = [0] * len(self.keywords)   # Fields covering each keyword
+        self.term_counts: Counter = Counter()            # Resume token counts
+        # Cosine pieces, kept as per-term sums: dot, |resume|^2, |jd|^2
+        self._dot = 0.0
+        self._resume_sq = 0.0
+        self._jd_sq = sum((_tf(c) * _IDF_SINGLE) ** 2 for c in jd_counts.values())
+
+    def _index(self, text: str) -> dict:
+        found = {c.lower() for _, _, c, _ in skill_extractor.get_extractor().find(text)}
+        normalized = ats_scorer._normalize_phrase(text)
+        keywords = [i for i, k in enumerate(self.keywords) if k.lower() in found or self._phrases[i] in normalized]
+        return {"text": text, "keywords": keywords, "terms": dict(Counter(ats_scorer.tokenize(text)))}
+
+    def _term_parts(self, term: str, count: int):
+        """(dot, resume_sq, jd_sq) contributions of one term at a given resume count."""
+        jd_count = self.jd_counts.get(term, 0)
+        idf = _IDF_SHARED if count > 0 and jd_count > 0 else _IDF_SINGLE
+        resume_w = _tf(count) * idf
+        jd_w = _tf(jd_count) * idf
+        return resume_w * jd_w, resume_w * resume_w, jd_w * jd_w
+
+    def _shift_term(self, term: str, delta: int):
+        old = self.term_counts.get(term, 0)
+        new = old + delta
+        old_dot, old_rsq, old_jsq = self._term_parts(term, old)
+        new_dot, new_rsq, new_jsq = self._term_parts(term, new)
+        self._dot += new_dot - old_dot
+        self._resume_sq += new_rsq - old_rsq
+        self._jd_sq += new_jsq - old_jsq
+        if new:
+            self.term_counts[term] = new
+        else:
+            self.term_counts.pop(term, None)
+
+    def _apply(self, field: str, entry: Optional[dict]):
+        """Swap a field's indexed entry (None removes it), updating every aggregate by difference."""
+        old = self.fields.pop(field, None)
+        if old is not None:
+            for i in old["keywords"]:
+                self.keyword_counts[i] -= 1
+            for term, count in old["terms"].items():
+                self._shift_term(term, -count)
+        if entry is not None:
+            self.fields[field] = entry
+            for i in entry["keywords"]:
+                self.keyword_counts[i] += 1
+            for term, count in entry["terms"].items():
+                self._shift_term(term, count)
+
+    def cosine(self) -> float:
+        if self._resume_sq <= 1e-12 or self._jd_sq <= 1e-12:
+            return 0.0
+        return self._dot / math.sqrt(self._resume_sq * self._jd_sq)
+
+    def _coverage(self, start: int, end: int) -> float:
+        if end == start:
+            return float("nan")
+        return sum(1 for c in self.keyword_counts[start:end] if c > 0) / (end - start)
+
+    def score(self) -> int:
+        split = len(self.mandatory)
+        return int(ats_scorer._score(
+            np.array(self._coverage(0, split)),
+            np.array(self._coverage(split, len(self.keywords))),
+            np.array(self.cosine())
+        ))
+
+    def missing_keywords(self) -> List[str]:
+        return [k for k, c in zip(self.keywords, self.keyword_counts) if c == 0]
+
+    def contribution(self, field: str) -> dict:
+        """
+        What a field adds: the keywords it covers, those only it covers, and
+        the score points lost if it were removed.
+        """
+        entry = self.fields.get(field)
+        if entry is None:
+            return {"field": field, "keywords": [], "unique_keywords": [], "points": 0}
+        score = self.score()
+        self._apply(field, None)
+        without = self.score()
+        self._apply(field, entry)
+        return {
+            "field": field,
+            "keywords": [self.keywords[i] for i in entry["keywords"]],
+            "unique_keywords": [self.keywords[i] for i in entry["keywords"] if self.keyword_counts[i] == 1],
+            "points": score - without,
+        }
+
+    def update(self, field: str, text: Optional[str]) -> dict:
+        """
+        Set (or with None / "" remove) one field and return the new score,
+        the change from before, the missing keywords and the field's contribution.
+        """
+        before = self.score()
+        self._apply(field, self._index(text) if text else None)
+        after = self.score()
+        return {
+            "score": after,
+            "delta": after - before,
+            "missing_keywords": self.missing_keywords(),
+            "field": self.contribution(field),
+        }
+
+    def contributions(self) -> List[dict]:
+        """Per-field contributions, highest first (for highlighting)."""
+        return sorted((self.contribution(f) for f in list(self.fields)), key=lambda c: -c["points"])
+
+    def result(self) -> dict:
+        missing = self.missing_keywords()
+        return {
+            "score": self.score(),
+            "missing_keywords": missing[:ats_scorer.MAX_MISSING],
+            "covered_keywords": [k for k in self.keywords if k not in missing],
+        }
+
+    def to_dict(self) -> dict:
+        """JSON-serializable state (restored by from_dict without re-indexing)."""
+        return {
+            "mandatory": self.mandatory,
+            "preferred": self.preferred,
+            "jd_counts": dict(self.jd_counts),
+            "fields": self.fields,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "LiveScorer":
+        scorer = cls.__new__(cls)
+        scorer._setup(state["mandatory"], state["preferred"], Counter(state["jd_counts"]))
+        for field, entry in state["fields"].items():
+            scorer._apply(field, entry)
+        return scorer
@@ -0,0 +1,216 @@
+"""
+AI Resume Generator - LLM Response Cache
+Content-addressed cache for provider responses, keyed on a hash of
+(provider, model, prompt, expect_json). Two tiers: an in-memory LRU and an
+optional on-disk SQLite store, both with per-task TTLs and size-bounded eviction.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Seconds a cached response stays valid, per task type
+DEFAULT_TASK_TTLS = {
+    "jd_parse": 7 * 24 * 3600,
+    "jd_header": 7 * 24 * 3600,
+    "extract_profile": 30 * 24 * 3600,
+    "ats_analysis": 24 * 3600,
+    "tailor": 24 * 3600,
+    "tailor_plan": 24 * 3600,
+    "tailor_section": 24 * 3600,
+    "tailor_patch": 24 * 3600,
+    "tailor_bullets": 24 * 3600,
+    "qa": 3600,
+}
+DEFAULT_TTL = 3600
+
+
+def make_key(provider: str, model: str, prompt: str, expect_json: bool = False, task: str = None) -> str:
+    """Content hash identifying one provider request (tasks sharing models get separate keys)."""
+    raw = json.dumps([provider, model, task, prompt, bool(expect_json)], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Two-tier response cache. Thread-safe.
+
+    Args:
+        max_entries: Size bound of the in-memory LRU tier
+        db_path: SQLite file for the disk tier (None disables it)
+        max_disk_entries: Size bound of the disk tier (oldest written evicted first)
+        task_ttls: Overrides for DEFAULT_TASK_TTLS
+        enabled: When False, get() always misses and set() is a no-op
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        db_path: str = None,
+        max_disk_entries: int = 5000,
+        task_ttls: dict = None,
+        default_ttl: float = DEFAULT_TTL,
+        enabled: bool = True
+    ):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.task_ttls = dict(DEFAULT_TASK_TTLS)
+        if task_ttls:
+            self.task_ttls.update(task_ttls)
+        self.default_ttl = default_ttl
+
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0, "bypassed": 0}
+
+        self._db = None
+        self.db_path = db_path
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, task TEXT, "
+                "created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache(created_at)")
+            self._db.commit()
+
+    def ttl_for(self, task: str = None) -> float:
+        """TTL in seconds for a task type."""
+        return self.task_ttls.get(task, self.default_ttl)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value or None on miss/expiry."""
+        if not self.enabled:
+            return None
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, expires_at = row
+                    if expires_at > now:
+                        self._remember(key, expires_at, value)
+                        self._stats["disk_hits"] += 1
+                        return value
+                    self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str, task: str = None, ttl: float = None):
+        """Store a value in both tiers."""
+        if not self.enabled or value is None:
+            return
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.ttl_for(task))
+
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self._stats["sets"] += 1
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, task, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, task, now, expires_at)
+                )
+                self._evict_disk(now)
+                self._db.commit()
+
+    def record_bypass(self):
+        """Count a request that deliberately skipped the cache."""
+        with self._lock:
+            self._stats["bypassed"] += 1
+
+    def _remember(self, key: str, expires_at: float, value: str):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _evict_disk(self, now: float):
+        self._db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+        count = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY created_at ASC LIMIT ?)",
+                (overflow,)
+            )
+            self._stats["evictions"] += overflow
+
+    def clear(self):
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters plus current tier sizes."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            if self._db is not None:
+                stats["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def close(self):
+        """Close the disk tier."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> LLMCache:
+    """
+    Return the process-wide cache. Disabled unless LLM_CACHE=1 is set or
+    configure_cache(enabled=True) has been called; LLM_CACHE_PATH enables the disk tier.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache(
+                    db_path=os.getenv("LLM_CACHE_PATH") or None,
+                    enabled=os.getenv("LLM_CACHE", "0") == "1"
+                )
+    return _cache
+
+
+def configure_cache(**kwargs) -> LLMCache:
+    """Replace the process-wide cache (accepts LLMCache arguments)."""
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = LLMCache(**kwargs)
+    return _cache
@@ -8,154 +8,426 @@ import json
 import re
 import io
 import pypdf
-import requests
+import ats_scorer
+import circuit_breaker
+import hedging
+import item_matcher
+import jd_dedup
+import json_extract
+import llm_cache
+import model_router
+import profile_model
+import prompt_compiler
+import provider_failover
+import provider_transport
+import rate_limiter
+import relevance_ranker
+import schemas
+import single_flight
+import skill_extractor
 from resume_builder import create_resume_pdf
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 # Model provider options
 PROVIDERS = ["gemini", "groq"]
 
-def call_gemini_api(prompt: str, api_key: str, model: str = "gemini-2.5-flash") -> str:
+# Default Groq fallback order (per-task order comes from model_router)
+GROQ_MODELS_CHAIN = model_router.GROQ_CHAIN
+
+# JD parsing: "llm" (local extractor only as fallback), "hybrid" (local keywords,
+# LLM for company/title/location only) or "local" (no LLM call)
+JD_PARSE_MODES = ["llm", "hybrid", "local"]
+JD_PARSE_MODE = os.getenv("JD_PARSE_MODE", "llm")
+
+# ATS analysis: "fast" (local ats_scorer, milliseconds) or "deep" (LLM analysis)
+ATS_MODES = ["fast", "deep"]
+ATS_MODE = os.getenv("ATS_MODE", "fast")
+
+# Fields the hybrid JD parse asks the provider for
+JD_HEADER_FIELDS = ["company_name", "job_identifier", "location", "job_title"]
+
+
+def build_gemini_payload(prompt: str, task: str = None) -> dict:
+    """Build the Gemini generateContent request body (JSON tasks get a response schema)."""
+    payload = {
+        "contents": [{
+            "parts": [{"text": prompt}]
+        }]
+    }
+    generation_config = schemas.gemini_generation_config(task)
+    if generation_config:
+        payload["generationConfig"] = generation_config
+    return payload
+
+
+def drop_response_schema(payload: dict) -> bool:
+    """Fall back from responseSchema to plain JSON mode. Returns False if there was no schema."""
+    return payload.get("generationConfig", {}).pop("responseSchema", None) is not None
+
+
+def extract_gemini_text(data: dict) -> str:
+    """Pull the generated text out of a Gemini generateContent response."""
+    try:
+        content = data['candidates'][0]['content']['parts'][0]['text']
+        if not content:
+            raise Exception(f"Empty content in Gemini response: {data}")
+        return content
+    except (KeyError, IndexError) as e:
+        raise Exception(f"Invalid Gemini response format: {data} - Error: {e}")
+
+
+def build_groq_payload(prompt: str, model_id: str, expect_json: bool = False, task: str = None) -> dict:
+    """Build the Groq chat-completions request body."""
+    payload = {
+        "model": model_id,
+        "messages": [
+            {"role": "user", "content": prompt}
+        ]
+    }
+    
+    # JSON tasks get their schema (or JSON mode); otherwise enforce JSON mode if requested
+    response_format = schemas.groq_response_format(task, model_id)
+    if response_format:
+        payload["response_format"] = response_format
+    elif expect_json:
+        payload["response_format"] = {"type": "json_object"}
+    return payload
+
+
+def extract_groq_text(data: dict) -> str:
+    """Pull the generated text out of a Groq chat-completions response."""
+    return data.get('choices', [{}])[0].get('message', {}).get('content', '')
+
+
+def handle_gemini_response(model: str, payload: dict, response) -> Tuple[str, Optional[str]]:
+    """
+    Decide on one Gemini response (shared by the sync and async clients):
+    ("text", content) on success, or ("retry", None) after dropping the
+    payload's response schema on a 400 (send `payload` again once).
+    Any other status raises.
+    """
+    if response.status_code == 200:
+        return "text", extract_gemini_text(response.json())
+    if response.status_code == 400 and drop_response_schema(payload):
+        print(f"   ⚠️ Gemini Schema Error ({model}): Retrying with JSON mode only...")
+        return "retry", None
+    raise Exception(f"Gemini API Error {response.status_code}: {response.text}")
+
+
+def call_gemini_api(prompt: str, api_key: str, model: str = "gemini-2.5-flash", task: str = None) -> str:
     """
     Call Gemini API via REST to avoid heavy SDK dependencies (grpcio).
+    JSON tasks are sent with their response schema (see schemas.py).
     """
     if not api_key:
         print("⚠️ Gemini API Key missing.")
         return ""
         
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
-    headers = {"Content-Type": "application/json"}
-    payload = {
-        "contents": [{
-            "parts": [{"text": prompt}]
-        }]
-    }
+    url = provider_transport.gemini_url(model, api_key)
+    payload = build_gemini_payload(prompt, task)
     
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=60)
-        if response.status_code == 200:
-            data = response.json()
-            try:
-                content = data['candidates'][0]['content']['parts'][0]['text']
-                if not content:
-                    raise Exception(f"Empty content in Gemini response: {data}")
-                return content
-            except (KeyError, IndexError) as e:
-                raise Exception(f"Invalid Gemini response format: {data} - Error: {e}")
-        else:
-            raise Exception(f"Gemini API Error {response.status_code}: {response.text}")
+        breaker = circuit_breaker.get_breaker("gemini", model)
+        if not breaker.allow():
+            raise circuit_breaker.CircuitOpenError(f"Circuit open for gemini/{model}")
+        
+        def send():
+            return rate_limiter.send(
+                "gemini", model,
+                circuit_breaker.track("gemini", model, lambda: provider_transport.post(url, json=payload, timeout=None)),
+                prompt=prompt
+            )
+
+        try:
+            action, content = handle_gemini_response(model, payload, send())
+            if action == "retry":
+                action, content = handle_gemini_response(model, payload, send())
+        except rate_limiter.RateLimitWaitTooLong:
+            breaker.release_probe()
+            raise
+        return content
     except Exception as e:
         raise Exception(f"Gemini Request Failed: {e}")
 
 
+def claim_groq_model(model_id: str) -> bool:
+    """Whether a Groq model may be tried now (False while its circuit is open)."""
+    if not circuit_breaker.get_breaker("groq", model_id).allow():
+        # Model is known to be down: skip it instead of paying its timeout
+        print(f"   ⏭️ Groq: Skipping {model_id} (circuit open)")
+        return False
+    return True
 
 
-def query_groq(prompt: str, expect_json: bool = False, api_key: str = None) -> str:
+def handle_groq_response(model_id: str, payload: dict, response) -> Tuple[str, Optional[str]]:
+    """
+    Decide on one Groq response (shared by the sync and async model chains):
+    ("text", content) on success, ("retry", None) after dropping the payload's
+    response_format on a 400 in JSON mode (send `payload` again once), or
+    ("skip", None) to fall back to the next model.
+    """
+    if response.status_code == 200:
+        return "text", extract_groq_text(response.json())
+    if response.status_code == 429:
+        print(f"   ⚠️ Groq Rate Limit ({model_id}): Switching to fallback...")
+        return "skip", None
+    if response.status_code == 400 and "response_format" in payload:
+        # Some models might not support json_object type or require "json" in prompt (which we usually have)
+        print(f"   ⚠️ Groq JSON Mode Error ({model_id}): Retrying without force-json...")
+        payload.pop("response_format", None)
+        return "retry", None
+    print(f"   ⚠️ Groq Error ({model_id}): {response.status_code} - {response.text}")
+    return "skip", None
+
+
+def handle_groq_error(model_id: str, error: Exception):
+    """Log a failed Groq attempt; a long rate-limit wait frees the model's half-open probe."""
+    if isinstance(error, rate_limiter.RateLimitWaitTooLong):
+        circuit_breaker.get_breaker("groq", model_id).release_probe()
+        print(f"   ⚠️ Groq Rate Limit ({model_id}): {error}. Switching to fallback...")
+    else:
+        print(f"   ⚠️ Groq Connection Error ({model_id}): {error}")
+
+
+def query_groq_model(
+    prompt: str,
+    model_id: str,
+    expect_json: bool = False,
+    api_key: str = None,
+    cancelled=None,
+    task: str = None
+) -> Optional[str]:
+    """
+    Make one Groq attempt against a single model.
+    Returns the content, or None when the caller should fall back to the next model.
+    `cancelled` (a threading.Event) stops the attempt before any follow-up request.
+    """
+    if not claim_groq_model(model_id):
+        return None
+    
+    try:
+        print(f"   ⚡ Groq: Attempting with {model_id}...")
+        
+        payload = build_groq_payload(prompt, model_id, expect_json, task)
+        
+        # Short rate-limit waits are retried on the same model; long ones fall back
+        def send():
+            return rate_limiter.send(
+                "groq", model_id,
+                circuit_breaker.track("groq", model_id, lambda: provider_transport.post(
+                    provider_transport.groq_url(),
+                    headers={"Authorization": f"Bearer {api_key}"},
+                    json=payload,
+                    timeout=None  # Configured (connect, read) timeouts
+                )),
+                prompt=prompt,
+                cancelled=cancelled
+            )
+        
+        action, content = handle_groq_response(model_id, payload, send())
+        if action == "retry":
+            if cancelled is not None and cancelled.is_set():
+                return None
+            action, content = handle_groq_response(model_id, payload, send())
+        return content if action == "text" else None
+            
+    except Exception as e:
+        handle_groq_error(model_id, e)
+        return None
+
+
+def query_groq(
+    prompt: str,
+    expect_json: bool = False,
+    api_key: str = None,
+    hedge: bool = None,
+    models: List[str] = None,
+    task: str = None
+) -> str:
     """
     Query Groq API with robust fallback chain.
     Chain: Llama 3.3 70B (Quality) -> Llama 3.1 8B (Speed/Volume) -> Qwen 32B (Backup)
+    
+    With hedging enabled (hedging.configure_hedging or hedge=True) the chain is raced:
+    a slow model triggers the next one after its latency-percentile delay and the
+    first valid answer wins. See hedging.get_last_hedge_report() for the winner.
+    `models` overrides the chain order (e.g. from model_router.route).
     """
+    chain = models or GROQ_MODELS_CHAIN
     if not api_key:
         api_key = os.getenv("GROQ_API_KEY")
     
     if not api_key:
         print("⚠️ GROQ_API_KEY not found.")
         return ""
-        
-    models_chain = [
-         "llama-3.3-70b-versatile",
-         "llama-3.1-8b-instant",
-         "qwen/qwen3-32b" 
-    ]
 
-    for model_id in models_chain:
+    if hedging.is_enabled(hedge):
         try:
-            print(f"   ⚡ Groq: Attempting with {model_id}...")
-            
-            payload = {
-                "model": model_id,
-                "messages": [
-                    {"role": "user", "content": prompt}
-                ]
-            }
-            
-            # Enforce JSON mode if requested
-            if expect_json:
-                payload["response_format"] = {"type": "json_object"}
-            
-            response = requests.post(
-                url="https://api.groq.com/openai/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
-                },
-                json=payload,
-                timeout=60 # Fast inference
+            result = hedging.race_chain(
+                chain,
+                lambda model_id, cancelled: query_groq_model(prompt, model_id, expect_json, api_key, cancelled, task)
             )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get('choices', [{}])[0].get('message', {}).get('content', '')
-            
-            elif response.status_code == 429:
-                print(f"   ⚠️ Groq Rate Limit ({model_id}): Switching to fallback...")
-                continue # Try next model
-            elif response.status_code == 400 and expect_json:
-                 # Some models might not support json_object type or require "json" in prompt (which we usually have)
-                 print(f"   ⚠️ Groq JSON Mode Error ({model_id}): Retrying without force-json...")
-                 payload.pop("response_format", None)
-                 # Retry without forced json mode
-                 retry_resp = requests.post(
-                    url="https://api.groq.com/openai/v1/chat/completions",
-                    headers={"Authorization": f"Bearer {api_key}","Content-Type": "application/json"},
-                    json=payload, timeout=60
-                 )
-                 if retry_resp.status_code == 200:
-                     return retry_resp.json().get('choices', [{}])[0].get('message', {}).get('content', '')
-                 else:
-                     continue
-            else:
-                print(f"   ⚠️ Groq Error ({model_id}): {response.status_code} - {response.text}")
-                continue # Try next model
-                
-        except Exception as e:
-            print(f"   ⚠️ Groq Connection Error ({model_id}): {e}")
-            continue
+            return result["text"]
+        except Exception:
+            raise Exception("All Groq models failed. Check logs for details.")
+        
+    for model_id in chain:
+        content = query_groq_model(prompt, model_id, expect_json, api_key, task=task)
+        if content is not None:
+            return content
             
     raise Exception("All Groq models failed. Check logs for details.")
 
-def query_provider(prompt: str, provider: str = "gemini", expect_json: bool = False, api_key: str = None) -> str:
-    """Query the specified AI provider."""
-    
+def provider_cache_key(prompt: str, provider: str = "gemini", expect_json: bool = False, task: str = None) -> str:
+    """
+    Cache key for a provider request, keyed on the task's candidate models
+    (not the live routing choice, which shifts with observed latency).
+    """
+    model_name = ",".join(model_router.candidate_models(task, provider))
+    return llm_cache.make_key(provider, model_name, prompt, expect_json, task)
+
+
+def lookup_cached_response(prompt: str, provider: str, expect_json: bool, bypass_cache: bool, task: str = None):
+    """
+    Check the response cache for a request.
+    Returns (cache_key, cached_text); cache_key is None when caching is disabled.
+    """
+    cache = llm_cache.get_cache()
+    if not cache.enabled:
+        return None, None
+
+    cache_key = provider_cache_key(prompt, provider, expect_json, task)
+    if bypass_cache:
+        cache.record_bypass()
+        return cache_key, None
+    return cache_key, cache.get(cache_key)
+
+
+def cacheable_response(response_text: str, task: str = None) -> bool:
+    """
+    Whether a fresh response may be cached: it must be non-empty and, for
+    tasks with a schema, parse (without truncation repair) and validate.
+    """
+    if not response_text:
+        return False
+    if schemas.schema_for_task(task) is None:
+        return True
+    return schemas.conforms(task, json_extract.extract_json(response_text, repair=False))
+
+
+def store_cached_response(
+    prompt: str,
+    served: Optional[dict],
+    expect_json: bool,
+    response_text: str,
+    task: str = None
+):
+    """
+    Store a fresh response under the key of the provider that actually served
+    it (`served` as reported by provider_failover), so a failover answer is
+    never returned for the originally requested provider. Responses that fail
+    cacheable_response are not stored.
+    """
+    cache = llm_cache.get_cache()
+    if not cache.enabled or not served or not cacheable_response(response_text, task):
+        return
+    cache_key = provider_cache_key(prompt, served["provider"], expect_json, task)
+    cache.set(cache_key, response_text, task=task)
+
+
+def fetch_provider_response(
+    prompt: str,
+    provider: str = "gemini",
+    expect_json: bool = False,
+    api_key: str = None,
+    task: str = None
+) -> str:
+    """Send one request to the model model_router picks for `task` (no caching or deduplication)."""
+    route = model_router.route(task, provider, prompt)
     if provider == "groq":
-        return query_groq(prompt, expect_json=expect_json, api_key=api_key)
-    else:  # Default to gemini
-        model_name = "gemini-2.5-flash"
-        
-        # Use Pro for complex tasks if analyzing
-        if "analyze" in prompt.lower() or "ATS scoring" in prompt:
-             model_name = "gemini-2.5-pro"
+        return query_groq(prompt, expect_json=expect_json, api_key=api_key, models=route["models"], task=task)
 
-        if not api_key and os.getenv("GEMINI_API_KEY"):
-            api_key = os.getenv("GEMINI_API_KEY")
+    # Default to gemini
+    if not api_key and os.getenv("GEMINI_API_KEY"):
+        api_key = os.getenv("GEMINI_API_KEY")
+    return call_gemini_api(prompt, api_key, model=route["model"], task=task)
 
-        return call_gemini_api(prompt, api_key, model=model_name)
 
+def resolve_api_key(provider: str, api_key: str = None) -> Optional[str]:
+    """Explicit key if given, else the provider's key from the environment."""
+    return api_key or os.getenv("GROQ_API_KEY" if provider == "groq" else "GEMINI_API_KEY")
 
-def analyze_resume_with_jd(resume_data: dict, jd_text: str, provider: str = "gemini", api_key: str = None) -> dict:
+
+def failover_providers(provider: str, api_key: str = None) -> List[str]:
     """
-    Analyze the resume against the JD using AI.
-    Returns a dict with score and feedback.
+    Failover order for a request. The requested provider always comes first;
+    other providers are only tried when an environment key is configured for them
+    (a caller's explicit key belongs to the provider they asked for).
     """
-    prompt = f"""
+    return [
+        p for p in provider_failover.failover_order(provider)
+        if p == provider or resolve_api_key(p)
+    ]
+
+
+def query_provider(
+    prompt: str,
+    provider: str = "gemini",
+    expect_json: bool = False,
+    api_key: str = None,
+    task: str = None,
+    bypass_cache: bool = False,
+    deadline: float = None
+) -> str:
+    """
+    Query the specified AI provider.
+    When the response cache is enabled, identical requests are served from it
+    (only responses that validate for `task` are stored); `task` selects the model (see model_router) and the cache TTL;
+    `bypass_cache` forces a fresh call.
+    Identical requests already in flight are merged into one upstream call.
+    If the provider errors or misses its share of `deadline`, the request fails
+    over to the next provider; provider_failover.get_last_served() reports
+    which provider answered and hedging.get_last_hedge_report() the hedged
+    race behind it (None when there was none).
+    """
+    cache_key, cached = lookup_cached_response(prompt, provider, expect_json, bypass_cache, task)
+    if cached is not None:
+        provider_failover.record_served({"requested": provider, "provider": provider, "attempts": [], "cached": True})
+        hedging.record_hedge_report(None)
+        return cached
+
+    def fetch():
+        hedging.record_hedge_report(None)
+        response_text = provider_failover.run_with_failover(
+            failover_providers(provider, api_key),
+            lambda p: fetch_provider_response(prompt, p, expect_json, api_key if p == provider else None, task),
+            deadline=deadline
+        )
+        served = provider_failover.get_last_served()
+        store_cached_response(prompt, served, expect_json, response_text, task=task)
+        return response_text, served, hedging.get_last_hedge_report()
+
+    flight_key = single_flight.request_fingerprint(
+        cache_key or provider_cache_key(prompt, provider, expect_json, task), api_key
+    )
+    # Reports travel with the result so merged callers see the leader's
+    response_text, served, hedge_report = single_flight.do(flight_key, fetch)
+    provider_failover.record_served(served)
+    hedging.record_hedge_report(hedge_report)
+    return response_text
+
+
+def build_ats_analysis_prompt(resume_data: dict, jd_text: str) -> str:
+    """Build the ATS analysis prompt for a resume/JD pair."""
+    def render(profile, jd_text):
+        return f"""
     Analyze this resume against the job description and provide a strict ATS analysis.
     
     JOB DESCRIPTION:
     {jd_text}
     
     RESUME:
-    {json.dumps(resume_data, indent=2)}
+    {profile}
     
     TASK:
     1. Calculate a match score (0-100).
@@ -178,6 +450,33 @@ def analyze_resume_with_jd(resume_data: dict, jd_text: str, provider: str = "gem
       "summary_feedback": "Brief summary of the fit."
     }}
     """
+    return prompt_compiler.compile_prompt("ats_analysis", render, profile=resume_data, jd_text=jd_text)
+
+
+def parse_ats_analysis_response(response_text: str) -> dict:
+    """Turn the raw ATS analysis response into a dict (or an error dict)."""
+    data = schemas.validate("ats_analysis", json_extract.extract_json(response_text))
+    if data is None:
+        return {"error": "AI returned invalid/non-JSON response. Please try again."}
+    return data
+
+
+def analyze_resume_with_jd(
+    resume_data: dict,
+    jd_text: str,
+    provider: str = "gemini",
+    api_key: str = None,
+    mode: str = None
+) -> dict:
+    """
+    Analyze the resume against the JD.
+    'fast' mode scores locally (ats_scorer); 'deep' mode asks the AI provider.
+    Returns a dict with score and feedback.
+    """
+    if (mode or ATS_MODE) == "fast":
+        return ats_scorer.score_resume(resume_data, jd_text)
+
+    prompt = build_ats_analysis_prompt(resume_data, jd_text)
     
     try:
         print("   🧠 Analyzing with Gemini Pro...")
@@ -185,47 +484,28 @@ def analyze_resume_with_jd(resume_data: dict, jd_text: str, provider: str = "gem
         # Force JSON mime type instruction in prompt is handled,
         # but for REST we just hope the model listens to "JSON ONLY".
         try:
-            response_text = query_provider(prompt, provider=provider, api_key=api_key)
+            response_text = query_provider(prompt, provider=provider, api_key=api_key, task="ats_analysis")
         except Exception as e:
             return {"error": f"AI Provider Error: {str(e)}"}
         
-        # internal helper to clean json
-        def clean_json_string(s):
-            if not s: return ""
-            match = re.search(r'```(?:json)?\s*(\{[\s\S]*?\})\s*```', s)
-            if match:
-                return match.group(1)
-            # Find first { to last }
-            match = re.search(r'\{[\s\S]*\}', s)
-            if match:
-                return match.group(0)
-            return ""
-
-        cleaned_text = clean_json_string(response_text)
-        
-        if not cleaned_text or not cleaned_text.strip():
-            return {"error": "AI returned invalid/non-JSON response. Please try again."}
-
-        return json.loads(cleaned_text)
+        return parse_ats_analysis_response(response_text)
             
     except Exception as e:
         print(f"Error in analysis: {e}")
         return {"error": str(e)}
 
 
-def answer_question_with_context(question: str, resume_data: dict, jd_text: str, provider: str = "gemini", api_key: str = None) -> dict:
-    """
-    Answer a job application question based on the candidate's resume.
-    Returns a plain-text answer suitable for copy-pasting into application forms.
-    """
-    prompt = f"""
+def build_question_prompt(question: str, resume_data: dict, jd_text: str) -> str:
+    """Build the application-question prompt."""
+    def render(profile, jd_text):
+        return f"""
     You are helping a job applicant answer a question from a job application form.
     
     JOB DESCRIPTION:
     {jd_text}
     
     APPLICANT'S RESUME:
-    {json.dumps(resume_data, indent=2)}
+    {profile}
     
     APPLICATION QUESTION:
     {question}
@@ -245,9 +525,18 @@ def answer_question_with_context(question: str, resume_data: dict, jd_text: str,
     
     Answer:
     """
+    return prompt_compiler.compile_prompt("qa", render, profile=resume_data, jd_text=jd_text)
+
+
+def answer_question_with_context(question: str, resume_data: dict, jd_text: str, provider: str = "gemini", api_key: str = None) -> dict:
+    """
+    Answer a job application question based on the candidate's resume.
+    Returns a plain-text answer suitable for copy-pasting into application forms.
+    """
+    prompt = build_question_prompt(question, resume_data, jd_text)
     
     try:
-        response_text = query_provider(prompt, provider=provider, api_key=api_key)
+        response_text = query_provider(prompt, provider=provider, api_key=api_key, task="qa")
         return {"answer": response_text.strip()}
     except Exception as e:
         return {"error": f"Failed to answer question: {str(e)}"}
@@ -280,7 +569,8 @@ def extract_base_resume_info(resume_text: str, provider: str = "gemini", api_key
     Extract base resume information using AI.
     Returns a JSON dict matching the get_base_resume structure.
     """
-    prompt = f"""
+    def render():
+        return f"""
     Extract the following information from the resume text into a strict JSON format.
     
     IMPORTANT: Look for "[Extracted Link: ...]" patterns in the text to identify LinkedIn and Portfolio URLs if they are not explicitly written out.
@@ -375,12 +665,12 @@ def extract_base_resume_info(resume_text: str, provider: str = "gemini", api_key
     Ensure all fields are filled based on the text. If a field is missing, use an empty string or empty list.
     Do not invent information.
     """
+    prompt = prompt_compiler.compile_prompt("extract_profile", render)
     
     try:
-        response_text = query_provider(prompt, provider=provider, api_key=api_key)
-        json_match = re.search(r'\{[\s\S]*\}', response_text)
-        if json_match:
-            data = json.loads(json_match.group())
+        response_text = query_provider(prompt, provider=provider, api_key=api_key, task="extract_profile")
+        data = schemas.validate("extract_profile", json_extract.extract_json(response_text))
+        if data:
             
             # Normalize Experience Role
             if 'experience' in data:
@@ -449,13 +739,6 @@ def get_base_resume() -> dict:
     }
 
 
-class JDAnalysis(BaseModel):
-    summary: str = Field(description="A concise summary of the job description.")
-    keywords: List[str] = Field(description="Keywords mentioned in the job description.")
-    required_skills: List[str] = Field(description="Skills required for the job.")
-    company_name: str = Field(description="The canonical name of the hiring company (e.g., 'Google', 'Anthropic'). Do not use generic terms like 'Company'. If unknown, use 'Unknown_Company'.")
-    job_identifier: str = Field(description="A short, file-safe identifier for the job. Prefer 'Job_<ID>' if a Job ID is prominent. Otherwise use 'Role_Name' (e.g., 'Software_Engineer'). Replace spaces with underscores.")
-
 def get_jd_analysis_prompt(jd_text: str) -> str:
     return f"""
     Analyze the following Job Description (JD) and extract the key information.
@@ -470,18 +753,10 @@ def get_jd_analysis_prompt(jd_text: str) -> str:
     {jd_text}
     """
 
-def parse_job_description(jd_text: str, provider: str = "gemini", api_key: str = None) -> dict:
-    """
-    Use AI provider to analyze the job description and extract key information.
-    
-    Args:
-        jd_text: The job description text
-        provider: One of 'gemini', 'ollama', or 'openrouter'
-    
-    Returns:
-        dict with: location, job_title, keywords, action_verbs, skill_gaps
-    """
-    prompt = f"""
+def build_jd_parse_prompt(jd_text: str) -> str:
+    """Build the job-description extraction prompt."""
+    def render(jd_text):
+        return f"""
 Analyze this job description and extract the following information. Return ONLY valid JSON.
 
 Job Description:
@@ -508,22 +783,40 @@ Be thorough in extracting keywords.
 - For "tech_stack_nuances", look for specific library names (e.g., "pandas" instead of just "Python") and cloud services (e.g., "Redshift" instead of just "AWS").
 - For "industry_terms", extract business-specific language (e.g., "risk modeling", "patient outcomes", "click-through rate").
 """
-    
-    try:
-        response_text = query_provider(prompt, provider, api_key=api_key)
-        
-        # Try to find JSON in the response
-        json_match = re.search(r'\{[\s\S]*\}', response_text)
-        if json_match:
-            try:
-                return json.loads(json_match.group())
-            except json.JSONDecodeError:
-                pass
-    except Exception as e:
-        print(f"⚠️ API Error (Job Parsing): {e}")
-        print("   Using default job description values.")
+    return prompt_compiler.compile_prompt("jd_parse", render, jd_text=jd_text)
+
+
+def parse_jd_response(response_text: str) -> Optional[dict]:
+    """Extract the JD analysis dict from a raw response, or None if unparsable."""
+    return schemas.validate("jd_parse", json_extract.extract_json(response_text))
+
 
-    # Fallback structure
+def parse_jd_header_response(response_text: str) -> Optional[dict]:
+    """Header fields from a hybrid-mode response, or None if unparsable."""
+    return schemas.validate("jd_header", json_extract.extract_json(response_text))
+
+
+def build_jd_header_prompt(jd_text: str) -> str:
+    """Build the small prompt used by hybrid JD parsing (header fields only)."""
+    def render(jd_text):
+        return f"""
+Extract the hiring company and role from this job description. Return ONLY valid JSON.
+
+Job Description:
+{jd_text}
+
+{{
+    "company_name": "The precise name of the company hiring",
+    "job_identifier": "The Job ID if found (e.g., 'R12345'), otherwise the Role Name in Snake Case",
+    "location": "City, State (primary location only)",
+    "job_title": "The exact job title from the posting"
+}}
+"""
+    return prompt_compiler.compile_prompt("jd_header", render, jd_text=jd_text)
+
+
+def default_jd_analysis() -> dict:
+    """Fallback JD analysis used when the provider fails."""
     return {
         "company_name": "Unknown_Company",
         "job_identifier": "Resume_Job",
@@ -538,6 +831,83 @@ Be thorough in extracting keywords.
     }
 
 
+def local_jd_analysis(jd_text: str) -> dict:
+    """JD analysis from the local skill extractor (no provider call)."""
+    analysis = skill_extractor.extract_keywords(jd_text)
+    if not analysis["job_title"]:
+        analysis["job_title"] = default_jd_analysis()["job_title"]
+    return analysis
+
+
+def merge_jd_header(analysis: dict, header: Optional[dict]) -> dict:
+    """Overlay provider-extracted header fields on a local analysis."""
+    for field in JD_HEADER_FIELDS:
+        value = (header or {}).get(field)
+        if isinstance(value, str) and value.strip():
+            analysis[field] = value.strip()
+    return analysis
+
+
+def lookup_jd_analysis(jd_text: str) -> Optional[dict]:
+    """Analysis of a previously seen near-identical JD, or None. Records the match for get_last_match()."""
+    match = jd_dedup.get_index().lookup(jd_text)
+    if match is None:
+        jd_dedup.record_match(None)
+        return None
+    jd_dedup.record_match({"id": match["id"], "similarity": match["similarity"]})
+    print(f"   ♻️ Near-duplicate JD (similarity {match['similarity']:.2f}): reusing previous analysis")
+    return match["analysis"]
+
+
+def parse_job_description(jd_text: str, provider: str = "gemini", api_key: str = None, mode: str = None) -> dict:
+    """
+    Use AI provider to analyze the job description and extract key information.
+    
+    Args:
+        jd_text: The job description text
+        provider: One of 'gemini' or 'groq'
+        mode: 'llm', 'hybrid' or 'local' (defaults to JD_PARSE_MODE)
+    
+    Returns:
+        dict with: location, job_title, keywords, action_verbs, skill_gaps
+    """
+    mode = mode or JD_PARSE_MODE
+    if mode == "local":
+        jd_dedup.record_match(None)
+        return local_jd_analysis(jd_text)
+
+    reused = lookup_jd_analysis(jd_text)
+    if reused is not None:
+        return reused
+
+    if mode == "hybrid":
+        analysis = local_jd_analysis(jd_text)
+        try:
+            response_text = query_provider(build_jd_header_prompt(jd_text), provider, api_key=api_key, task="jd_header")
+            analysis = merge_jd_header(analysis, parse_jd_header_response(response_text))
+            jd_dedup.get_index().add(jd_text, analysis)
+            return analysis
+        except Exception as e:
+            print(f"⚠️ API Error (Job Parsing): {e}")
+            print("   Using locally extracted job details.")
+            return analysis
+
+    prompt = build_jd_parse_prompt(jd_text)
+    
+    try:
+        response_text = query_provider(prompt, provider, api_key=api_key, task="jd_parse")
+        parsed = parse_jd_response(response_text)
+        if parsed is not None:
+            jd_dedup.get_index().add(jd_text, parsed)
+            return parsed
+    except Exception as e:
+        print(f"⚠️ API Error (Job Parsing): {e}")
+
+    # Provider down or unparsable: local extraction still yields real keywords
+    print("   Using locally extracted job description values.")
+    return local_jd_analysis(jd_text)
+
+
 def convert_markdown_to_html(text: str) -> str:
     """Convert markdown bold (**text**) to HTML bold (<b>text</b>)."""
     if not text:
@@ -595,90 +965,45 @@ def clean_tailored_resume(resume_data: dict) -> dict:
     return resume_data
 
 
-def find_best_match(gen_item, pool):
-    """
-    Find the best matching item from the original pool based on Company/Role/Name.
-    Returns the original item dict or None.
-    """
-    best_match = None
-    max_score = 0
-    
-    gen_company = (gen_item.get('company') or gen_item.get('organization') or "").lower().strip()
-    gen_role = (gen_item.get('role') or gen_item.get('title') or "").lower().strip()
-    gen_name = (gen_item.get('name') or gen_item.get('title') or "").lower().strip() # For projects/research
-
-    for orig_item in pool:
-        score = 0
-        orig_company = (orig_item.get('company') or orig_item.get('organization') or orig_item.get('conference') or "").lower().strip()
-        orig_role = (orig_item.get('role') or orig_item.get('title') or "").lower().strip()
-        orig_name = (orig_item.get('name') or orig_item.get('title') or "").lower().strip()
+# Fields restored from the matched original item, per generated section
+RESTORE_FIELDS = {
+    'experience': ['role', 'company', 'duration', 'dates', 'location'],
+    'projects': ['name', 'link', 'dates'],
+    'leadership': ['role', 'organization', 'duration', 'dates', 'location'],
+    'research': ['title', 'conference', 'dates', 'link'],
+    'certifications': ['name', 'issuer', 'dates'],
+    'awards': ['name', 'organization', 'dates'],
+    'volunteering': ['role', 'organization', 'dates', 'location'],
+}
 
-        # Company Match (Strongest signal for Exp/Lead/Research)
-        if gen_company and orig_company and gen_company == orig_company:
-            score += 3
-        elif gen_company and orig_company and (gen_company in orig_company or orig_company in gen_company):
-            score += 1
-            
-        # Role Match
-        if gen_role and orig_role and gen_role == orig_role:
-            score += 2
-        elif gen_role and orig_role and (gen_role in orig_role or orig_role in gen_role):
-            score += 1
-
-        # Project Name Match
-        if gen_name and orig_name and gen_name == orig_name:
-            score += 5 # High confidence for projects
-        elif gen_name and orig_name and (gen_name in orig_name or orig_name in gen_name):
-            score += 2
-
-        if score > max_score and score >= 2: # Threshold
-            max_score = score
-            best_match = orig_item
-            
-    return best_match
 
 def restore_immutable_fields(original_data: dict, generated_data: dict) -> dict:
     """
     Overwrites generated metadata (role, company, dates) with values 
     from the original input to prevent hallucination.
-    Uses fuzzy matching to handle reordering/moving of items.
-    """
-    # Create a flat pool of all original items
-    pool = []
-    if 'experience' in original_data: pool.extend(original_data['experience'])
-    if 'leadership' in original_data: pool.extend(original_data['leadership'])
-    if 'projects' in original_data: pool.extend(original_data['projects'])
-    if 'research' in original_data: pool.extend(original_data['research'])
-    if 'certifications' in original_data: pool.extend(original_data['certifications'])
-    if 'awards' in original_data: pool.extend(original_data['awards'])
-    if 'volunteering' in original_data: pool.extend(original_data['volunteering'])
-    
-    # helper to restore
-    def restore_section(section_name, fields_to_restore):
-        if section_name in generated_data:
-            for gen_item in generated_data[section_name]:
-                match = find_best_match(gen_item, pool)
-                if match:
-                    for field in fields_to_restore:
-                        if field in match:
-                            gen_item[field] = match[field]
-
-    # Restore Experience
-    restore_section('experience', ['role', 'company', 'duration', 'dates', 'location'])
-    
-    # Restore Projects
-    restore_section('projects', ['name', 'link', 'dates'])
-    
-    # Restore Leadership
-    restore_section('leadership', ['role', 'organization', 'duration', 'dates', 'location'])
-    
-    # Restore Research
-    restore_section('research', ['title', 'conference', 'dates', 'link'])
-    
-    # Restore New Sections
-    restore_section('certifications', ['name', 'issuer', 'dates'])
-    restore_section('awards', ['name', 'organization', 'dates'])
-    restore_section('volunteering', ['role', 'organization', 'dates', 'location'])
+    Generated items are matched one-to-one against the original items
+    (item_matcher index, built once per base profile) so reordered or
+    moved items still find their source.
+    """
+    generated = [
+        (section, item)
+        for section in RESTORE_FIELDS
+        for item in generated_data.get(section) or []
+        if isinstance(item, dict)
+    ]
+    matches = item_matcher.get_index(original_data).assign([item for _, item in generated])
+    item_matcher.record(matches)
+
+    for (section, gen_item), match in zip(generated, matches):
+        if match:
+            for field in RESTORE_FIELDS[section]:
+                if field in match.item:
+                    gen_item[field] = match.item[field]
+
+    unmatched = sum(1 for m in matches if m is None)
+    uncertain = sum(1 for m in matches if m is not None and m.confidence < item_matcher.LOW_CONFIDENCE)
+    if unmatched or uncertain:
+        print(f"   🔗 Restored fields on {len(matches) - unmatched}/{len(matches)} items ({uncertain} low-confidence matches)")
 
     return generated_data
 
@@ -704,40 +1029,8 @@ def enforce_bullet_limits(resume_data: dict, bullet_counts: dict) -> dict:
     return resume_data
 
 
-def tailor_resume(
-    base_resume: dict, 
-    jd_analysis: dict, 
-    provider: str = "gemini", 
-    api_key: str = None, 
-    tailoring_strategy: str = "balanced",
-    bullet_counts: dict = None
-) -> dict:
-    """
-    Use AI provider to tailor the resume content for ATS optimization.
-    Preserves all metrics and facts, only adjusts vocabulary.
-    
-    Args:
-        base_resume: The base resume data
-        jd_analysis: Analysis from parse_job_description
-        provider: One of 'gemini', 'groq'
-        api_key: API key for the provider
-        tailoring_strategy: 'profile_focus', 'balanced', or 'jd_focus'
-        bullet_counts: Optional dict with desired bullet counts per section
-                      Example: {'experience': [3, 4, 2], 'projects': [3, 0]}
-                      0 means remove that item
-    """
-    # Pre-process resume: filter out items with bullet_count = 0
-    # UPDATE: Removed aggressive filtering. 0 bullets should mean "keep item, 0 bullets".
-    # User can delete items explicitly via the remove button in UI.
-    if bullet_counts:
-        # We perform a shallow copy just to be safe if we mutate deeper, 
-        # but here we are just reading.
-        pass
-    
-    # [Dynamic Prompt Construction enabled]
-    # Old bullet_instructions logic removed in favor of itemized instructions below.
-    pass
-    
+def tailoring_strategy_note(tailoring_strategy: str = "balanced") -> str:
+    """Strategy-specific instructions for tailoring prompts."""
     # Strategy-specific instructions
     if tailoring_strategy == "profile_focus":
         strategy_note = """
@@ -784,48 +1077,61 @@ CRITICAL RULES FOR THIS STRATEGY:
 - Balance keyword optimization with genuine representation
 - This is the DEFAULT behavior - good mix of authenticity and optimization
 """
+    return strategy_note
+
+
+def build_tailor_prompt(
+    base_resume: dict,
+    jd_analysis: dict,
+    tailoring_strategy: str = "balanced",
+    bullet_counts: dict = None
+) -> str:
+    """
+    Build the full-resume tailoring prompt (see tailor_resume for arguments).
+    `base_resume` may be a dict or an already loaded profile_model.Profile.
+    """
+    # Pre-process resume: filter out items with bullet_count = 0
+    # UPDATE: Removed aggressive filtering. 0 bullets should mean "keep item, 0 bullets".
+    # User can delete items explicitly via the remove button in UI.
+    if bullet_counts:
+        # We perform a shallow copy just to be safe if we mutate deeper, 
+        # but here we are just reading.
+        pass
+    
+    # [Dynamic Prompt Construction enabled]
+    # Old bullet_instructions logic removed in favor of itemized instructions below.
+    pass
     
+    strategy_note = tailoring_strategy_note(tailoring_strategy)
+
     # Build Dynamic Itemized Prompt Content
     current_resume_content = ""
     
     # Contact & Summary
     current_resume_content += "--- SECTION: CONTACT & SUMMARY ---\n"
     base_info = {k: v for k, v in base_resume.items() if k not in ['experience', 'projects', 'leadership', 'skills']}
-    # Inject bullet counts into base_resume for AI guidance
-    # We do this on a copy to avoid mutating the original object permanently
-    resume_context = json.loads(json.dumps(base_resume))
-    
-    if bullet_counts:
-        if 'experience' in resume_context and 'experience' in bullet_counts:
-            for i, item in enumerate(resume_context['experience']):
-                if i < len(bullet_counts['experience']):
-                    item['target_bullets'] = bullet_counts['experience'][i]
-        
-        if 'projects' in resume_context and 'projects' in bullet_counts:
-            for i, item in enumerate(resume_context['projects']):
-                if i < len(bullet_counts['projects']):
-                    item['target_bullets'] = bullet_counts['projects'][i]
-                    
-        if 'leadership' in resume_context and 'leadership' in bullet_counts:
-            for i, item in enumerate(resume_context['leadership']):
-                if i < len(bullet_counts['leadership']):
-                    item['target_bullets'] = bullet_counts['leadership'][i]
-                    
-        if 'research' in resume_context and 'research' in bullet_counts:
-             for i, item in enumerate(resume_context['research']):
-                if i < len(bullet_counts['research']):
-                    item['target_bullets'] = bullet_counts['research'][i]
-
-    prompt = f"""
+    # Inject bullet counts as target_bullets for AI guidance (only the counted items are new)
+    resume_context = profile_model.load_profile(base_resume).with_targets(bullet_counts)
+
+    # Send only the most JD-relevant items and bullets; the rest is summarized
+    resume_context, prerank_report = relevance_ranker.prerank_profile(resume_context, jd_analysis)
+    omitted = relevance_ranker.omitted_summary(prerank_report)
+    omitted_note = f"""
+OMITTED FROM THE PROFILE ABOVE (ranked least relevant to this JD; do not recreate them):
+{omitted}
+""" if omitted else ""
+
+    def render(profile, jd_analysis):
+        return f"""
 You are a Strategic Resume Architect.
 JOB ANALYSIS:
-{json.dumps(jd_analysis, indent=2)}
+{jd_analysis}
 
 {strategy_note}
 
 CANDIDATE PROFILE (JSON):
-{json.dumps(resume_context, indent=2)}
-
+{profile}
+{omitted_note}
 TASK: Reconstruct the resume JSON to best fit the JD.
 1. **Analyze** the candidate's full profile (Experience, Projects, Leadership, Research).
 2. **Reorganize & Filter** items to tell the best story:
@@ -847,50 +1153,146 @@ GENERAL RULES:
 5. KEY NAMING: Use "role" for Experience job titles.
 6. **CRITICAL:** If an entire section (e.g., Research, Leadership) has NO relevant items, you may return an empty array [] for that section.
 """
+    return prompt_compiler.compile_prompt("tailor", render, profile=resume_context, jd_analysis=jd_analysis)
+
 
+def postprocess_tailored_resume(tailored: dict, base_resume: dict) -> dict:
+    """Clean markup, restore immutable fields and keep section titles on a tailored resume dict."""
+    # Post-process to convert any remaining markdown to HTML
+    cleaned = clean_tailored_resume(tailored)
+    
+    # RESTORE CONSTANTS (Role, Company, Dates) using fuzzy matching
+    cleaned = restore_immutable_fields(base_resume, cleaned)
+    
+    # PRESERVE SECTION TITLES
+    if 'section_titles' in base_resume:
+        cleaned['section_titles'] = base_resume['section_titles']
+    return cleaned
+
+
+def finalize_tailored_resume(
+    response_text: str,
+    base_resume: dict,
+    jd_analysis: dict,
+    provider: str = "gemini",
+    bullet_counts: dict = None,
+    error: Exception = None
+) -> dict:
+    """
+    Post-process a raw tailoring response into the final resume dict.
+    Falls back to a copy of the base resume when the response is unusable or
+    `error` is set (`base_resume` itself is never modified; batch jobs share it).
+    """
+    data = None
+    if error is None:
+        # Extract JSON from response (fences, trailing commas and truncation are handled)
+        data = json_extract.extract_json(response_text)
+        if data is None:
+            print(f"Raw Response: {response_text[:500]}...") # Print first 500 chars for debug
+    return finalize_tailored_data(data, base_resume, jd_analysis, provider, bullet_counts, error=error)
+
+
+def finalize_tailored_data(
+    data: Optional[dict],
+    base_resume: dict,
+    jd_analysis: dict,
+    provider: str = "gemini",
+    bullet_counts: dict = None,
+    error: Exception = None
+) -> dict:
+    """finalize_tailored_resume for a response already parsed into `data` (e.g. a streamed one)."""
+    warning = None
     try:
-        response_text = query_provider(prompt, provider, api_key=api_key)
-        
-        # Extract JSON from response
-        json_match = re.search(r'\{[\s\S]*\}', response_text)
-        if json_match:
-            try:
-                tailored = json.loads(json_match.group())
-                # Ensure we have all required fields
-                if 'name' in tailored and 'contact' in tailored:
-                    # Post-process to convert any remaining markdown to HTML
-                    cleaned = clean_tailored_resume(tailored)
-                    
-                    # RESTORE CONSTANTS (Role, Company, Dates) using fuzzy matching
-                    cleaned = restore_immutable_fields(base_resume, cleaned)
-                    
-                    # PRESERVE SECTION TITLES
-                    if 'section_titles' in base_resume:
-                        cleaned['section_titles'] = base_resume['section_titles']
-                    
-                    # Note: We rely on AI to respect bullet counts now, as strict enforcement
-                    # by index is impossible after reordering.
-                    
-                    return cleaned
-            except json.JSONDecodeError as e:
-                print(f"⚠️ JSON Decode Error: {e}")
-                print(f"Raw Response: {response_text[:500]}...") # Print first 500 chars for debug
-                pass
+        if error is not None:
+            raise error
+
+        tailored = schemas.validate("tailor", data)
+        if tailored is None:
+            print("⚠️ JSON Decode Error: no JSON object found in response")
+        # Ensure we have all required fields
+        elif 'name' in tailored and 'contact' in tailored:
+            # Note: We rely on AI to respect bullet counts now, as strict enforcement
+            # by index is impossible after reordering.
+            return postprocess_tailored_resume(tailored, base_resume)
     except Exception as e:
         print(f"⚠️ API Error (Tailoring): {e}")
         print("   Using base resume without AI tailoring.")
+        warning = f"AI Tailoring Failed ({provider}). Using Base Resume."
+
+    # Fresh containers: base_resume itself is never modified
+    fallback = profile_model.load_profile(base_resume).to_dict()
+    if warning:
         # Inject warning for UI to handle
-        base_resume['warning'] = f"AI Tailoring Failed ({provider}). Using Base Resume."
+        fallback['warning'] = warning
 
     # If parsing fails or API error, return base resume with just location updated (if valid)
     # If location detection also failed, it usually defaults to 'Remote' or 'N/A'
     if jd_analysis and 'location' in jd_analysis and jd_analysis['location'] not in ["Remote", "N/A"]:
-         base_resume['contact']['location'] = jd_analysis['location']
+         fallback['contact']['location'] = jd_analysis['location']
          
     # Enforce limits on base resume as well (fallback)
-    base_resume = enforce_bullet_limits(base_resume, bullet_counts)
-         
-    return base_resume
+    return enforce_bullet_limits(fallback, bullet_counts)
+
+
+def lookup_tailored_resume(base_resume: dict, jd_analysis: dict, tailoring_strategy: str, bullet_counts: dict = None):
+    """
+    Returns (reuse_key, resume). The resume is a previous tailoring of the same
+    profile against the same (possibly near-duplicate-reused) JD analysis, or None.
+    """
+    index = jd_dedup.get_index()
+    if not index.enabled:
+        return None, None
+    key = jd_dedup.tailoring_key(jd_analysis, base_resume, tailoring_strategy, bullet_counts)
+    resume = index.get_tailored(key)
+    if resume is not None:
+        print("   ♻️ Reusing resume tailored for a near-identical JD")
+    return key, resume
+
+
+def remember_tailored_resume(reuse_key: Optional[str], tailored: dict):
+    """Store a successful tailoring for reuse (fallbacks carrying a warning are not stored)."""
+    if reuse_key and isinstance(tailored, dict) and "warning" not in tailored:
+        jd_dedup.get_index().put_tailored(reuse_key, tailored)
+
+
+def tailor_resume(
+    base_resume: dict, 
+    jd_analysis: dict, 
+    provider: str = "gemini", 
+    api_key: str = None, 
+    tailoring_strategy: str = "balanced",
+    bullet_counts: dict = None
+) -> dict:
+    """
+    Use AI provider to tailor the resume content for ATS optimization.
+    Preserves all metrics and facts, only adjusts vocabulary.
+    
+    Args:
+        base_resume: The base resume data (dict or profile_model.Profile)
+        jd_analysis: Analysis from parse_job_description
+        provider: One of 'gemini', 'groq'
+        api_key: API key for the provider
+        tailoring_strategy: 'profile_focus', 'balanced', or 'jd_focus'
+        bullet_counts: Optional dict with desired bullet counts per section
+                      Example: {'experience': [3, 4, 2], 'projects': [3, 0]}
+                      0 means remove that item
+    """
+    # Loaded once; the prompt, restore and fallback all read this profile
+    profile = profile_model.load_profile(base_resume)
+    reuse_key, reused = lookup_tailored_resume(profile, jd_analysis, tailoring_strategy, bullet_counts)
+    if reused is not None:
+        return reused
+
+    prompt = build_tailor_prompt(profile, jd_analysis, tailoring_strategy, bullet_counts)
+
+    try:
+        response_text = query_provider(prompt, provider, api_key=api_key, task="tailor")
+    except Exception as e:
+        return finalize_tailored_resume("", profile, jd_analysis, provider, bullet_counts, error=e)
+
+    tailored = finalize_tailored_resume(response_text, profile, jd_analysis, provider, bullet_counts)
+    remember_tailored_resume(reuse_key, tailored)
+    return tailored
 
 
 def generate_answer(question: str, jd_text: str, provider: str = "gemini") -> str:
@@ -899,11 +1301,12 @@ def generate_answer(question: str, jd_text: str, provider: str = "gemini") -> st
     """
     base_resume = get_base_resume()
     
-    prompt = f"""
+    def render(profile, jd_text):
+        return f"""
 You are a career coach and technical interviewer assisting the candidate during a job application or interview.
 
 CANDIDATE PROFILE:
-{json.dumps(base_resume, indent=2)}
+{profile}
 
 JOB DESCRIPTION:
 {jd_text}
@@ -920,8 +1323,9 @@ Provide a concise, direct answer or talking point that the candidate can use.
 - Keep the tone professional and confident.
 - Answer in PLAIN TEXT only. Do NOT use markdown, bolding, italics, bullet points, or headers.
 """
+    prompt = prompt_compiler.compile_prompt("qa", render, profile=base_resume, jd_text=jd_text)
     try:
-        return query_provider(prompt, provider)
+        return query_provider(prompt, provider, task="qa")
     except Exception as e:
         return f"Error generating answer: {str(e)}"
 
@@ -0,0 +1,392 @@
+"""
+AI Resume Generator - Mock LLM Server
+Local stand-in that speaks the Gemini generateContent / streamGenerateContent
+and Groq chat-completions wire formats, so the pipeline can be benchmarked
+and load-tested without live keys.
+
+Modes:
+    record  - forward each request to the real provider and save the reply as a fixture
+              (upstream errors are passed through with their status and body, not saved)
+    replay  - answer from fixtures with a configurable latency distribution,
+              429/500 injection and SSE streaming
+
+Point the app at it with GEMINI_BASE_URL / GROQ_BASE_URL (or
+provider_transport.configure_transport), e.g.:
+
+    python mock_llm_server.py --mode replay --fixtures fixtures --latency lognormal:0.0,0.5
+    GEMINI_BASE_URL=http://127.0.0.1:8765 GROQ_BASE_URL=http://127.0.0.1:8765 python main.py
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+import provider_transport
+
+GEMINI_PATH = re.compile(r'^/v1beta/models/(?P<model>[^:]+):(?P<method>generateContent|streamGenerateContent)$')
+GROQ_PATH = "/openai/v1/chat/completions"
+
+DEFAULT_RESPONSE = '{"score": 0, "missing_keywords": [], "matching_areas": [], "recommendations": [], "summary_feedback": ""}'
+
+
+def parse_latency(spec: str):
+    """
+    Build a latency sampler from a spec string:
+        fixed:0.5 | uniform:0.2,1.5 | normal:1.0,0.3 | lognormal:0.0,0.5 | none
+    Returns a zero-argument function giving seconds.
+    """
+    if not spec or spec == "none":
+        return lambda: 0.0
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v]
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda: max(0.0, random.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(values[0], values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def fixture_key(provider: str, model: str, prompt: str) -> str:
+    """Stable fixture identifier for one request."""
+    raw = json.dumps([provider, model, prompt], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class UpstreamError(Exception):
+    """A non-200 (or unreachable) upstream reply in record mode, passed through to the client."""
+
+    def __init__(self, status: int, payload, headers: dict = None):
+        super().__init__(f"upstream returned {status}")
+        self.status = status
+        self.payload = payload
+        self.headers = headers or {}
+
+
+def _upstream_post(url: str, **kwargs) -> dict:
+    """POST to the real provider; the JSON body on 200, else UpstreamError."""
+    try:
+        response = requests.post(url, timeout=120, **kwargs)
+    except requests.RequestException as e:
+        raise UpstreamError(502, {"error": {"code": 502, "message": f"Upstream unreachable: {e}"}})
+    if response.status_code == 200:
+        return response.json()
+    try:
+        payload = response.json()
+    except ValueError:
+        payload = {"error": {"code": response.status_code, "message": response.text[:500]}}
+    # Rate-limit hints are what the client's scheduler acts on
+    headers = {
+        name: value for name, value in response.headers.items()
+        if name.lower() == "retry-after" or name.lower().startswith("x-ratelimit-")
+    }
+    raise UpstreamError(response.status_code, payload, headers)
+
+
+class FixtureStore:
+    """Directory of recorded responses, one JSON file per request. Thread-safe."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, provider: str, model: str, prompt: str):
+        path = self._path(fixture_key(provider, model, prompt))
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)["text"]
+
+    def save(self, provider: str, model: str, prompt: str, text: str):
+        record = {
+            "provider": provider,
+            "model": model,
+            "prompt_preview": prompt[:200],
+            "text": text,
+            "recorded_at": time.time(),
+        }
+        with self._lock:
+            with open(self._path(fixture_key(provider, model, prompt)), 'w') as f:
+                json.dump(record, f, indent=2)
+
+
+class MockConfig:
+    """Behavior knobs shared by all handler threads."""
+
+    def __init__(
+        self,
+        mode: str = "replay",
+        fixtures: str = "fixtures",
+        latency: str = "none",
+        error_429: float = 0.0,
+        error_500: float = 0.0,
+        retry_after: float = 1.0,
+        chunk_size: int = 40,
+        chunk_delay: float = 0.02,
+        default_response: str = DEFAULT_RESPONSE,
+        seed: int = None
+    ):
+        self.mode = mode
+        self.store = FixtureStore(fixtures)
+        self.latency = parse_latency(latency)
+        self.error_429 = error_429
+        self.error_500 = error_500
+        self.retry_after = retry_after
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.default_response = default_response
+        self.stats = {"requests": 0, "fixture_hits": 0, "fixture_misses": 0, "injected_429": 0, "injected_500": 0, "recorded": 0, "upstream_errors": 0}
+        self.lock = threading.Lock()
+        if seed is not None:
+            random.seed(seed)
+
+    def count(self, key: str):
+        with self.lock:
+            self.stats[key] += 1
+
+
+def _gemini_prompt(body: dict) -> str:
+    return "".join(part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", []))
+
+
+def _groq_prompt(body: dict) -> str:
+    return "".join(m.get("content", "") for m in body.get("messages", []) if m.get("role") == "user")
+
+
+def _chunks(text: str, size: int):
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    """Routes Gemini and Groq requests to record or replay logic."""
+
+    server_version = "MockLLM/1.0"
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real providers
+
+    @property
+    def config(self) -> MockConfig:
+        return self.server.mock_config
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def _send_json(self, status: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_sse(self, events):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for event in events:
+            data = f"data: {event}\r\n\r\n".encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+            if self.config.chunk_delay:
+                time.sleep(self.config.chunk_delay)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _inject_error(self, provider: str) -> bool:
+        roll = random.random()
+        if roll < self.config.error_429:
+            self.config.count("injected_429")
+            message = "Rate limit exceeded (injected)"
+            if provider == "gemini":
+                payload = {"error": {"code": 429, "message": message, "status": "RESOURCE_EXHAUSTED",
+                                     "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo",
+                                                  "retryDelay": f"{self.config.retry_after}s"}]}}
+            else:
+                payload = {"error": {"message": message, "type": "tokens", "code": "rate_limit_exceeded"}}
+            self._send_json(429, payload, {"Retry-After": str(self.config.retry_after)})
+            return True
+        if roll < self.config.error_429 + self.config.error_500:
+            self.config.count("injected_500")
+            self._send_json(500, {"error": {"code": 500, "message": "Internal error (injected)"}})
+            return True
+        return False
+
+    def _resolve_text(self, provider: str, model: str, prompt: str, forward) -> Optional[str]:
+        """Response text for a request, or None when an upstream error was already sent."""
+        if self.config.mode == "record":
+            try:
+                text = forward()
+            except UpstreamError as e:
+                # Errors are not fixtures: replays inject them with --error-429 / --error-500
+                self.config.count("upstream_errors")
+                self._send_json(e.status, e.payload, e.headers)
+                return None
+            self.config.store.save(provider, model, prompt, text)
+            self.config.count("recorded")
+            return text
+
+        text = self.config.store.load(provider, model, prompt)
+        if text is None:
+            self.config.count("fixture_misses")
+            return self.config.default_response
+        self.config.count("fixture_hits")
+        return text
+
+    def do_POST(self):
+        self.config.count("requests")
+        parts = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        gemini = GEMINI_PATH.match(parts.path)
+        if gemini:
+            self._handle_gemini(gemini.group("model"), gemini.group("method"), parse_qs(parts.query), body)
+        elif parts.path == GROQ_PATH:
+            self._handle_groq(body)
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {parts.path}"}})
+
+    def _handle_gemini(self, model: str, method: str, query: dict, body: dict):
+        if self.config.mode == "replay":
+            if self._inject_error("gemini"):
+                return
+            time.sleep(self.config.latency())
+
+        prompt = _gemini_prompt(body)
+        api_key = (query.get("key") or [""])[0]
+
+        def forward():
+            url = f"{provider_transport.GEMINI_BASE_URL}/v1beta/models/{model}:generateContent?key={api_key}"
+            return _upstream_post(url, json=body)['candidates'][0]['content']['parts'][0]['text']
+
+        text = self._resolve_text("gemini", model, prompt, forward)
+        if text is None:
+            return
+
+        if method == "streamGenerateContent":
+            self._send_sse(
+                json.dumps({"candidates": [{"content": {"parts": [{"text": chunk}], "role": "model"}}]})
+                for chunk in _chunks(text, self.config.chunk_size)
+            )
+        else:
+            self._send_json(200, {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"},
+                                                  "finishReason": "STOP"}]})
+
+    def _handle_groq(self, body: dict):
+        model = body.get("model", "")
+        if self.config.mode == "replay":
+            if self._inject_error("groq"):
+                return
+            time.sleep(self.config.latency())
+
+        prompt = _groq_prompt(body)
+        auth = self.headers.get("Authorization", "")
+
+        def forward():
+            upstream = dict(body)
+            upstream.pop("stream", None)
+            return _upstream_post(
+                f"{provider_transport.GROQ_BASE_URL}{GROQ_PATH}",
+                headers={"Authorization": auth, "Content-Type": "application/json"},
+                json=upstream
+            )['choices'][0]['message']['content']
+
+        text = self._resolve_text("groq", model, prompt, forward)
+        if text is None:
+            return
+
+        if body.get("stream"):
+            events = [
+                json.dumps({"id": "mock", "object": "chat.completion.chunk", "model": model,
+                            "choices": [{"index": 0, "delta": {"content": chunk}, "finish_reason": None}]})
+                for chunk in _chunks(text, self.config.chunk_size)
+            ]
+            events.append("[DONE]")
+            self._send_sse(events)
+        else:
+            self._send_json(200, {
+                "id": "mock",
+                "object": "chat.completion",
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            }, {"x-ratelimit-remaining-requests": "1000", "x-ratelimit-remaining-tokens": "1000000"})
+
+
+def start_server(host: str = "127.0.0.1", port: int = 8765, **config) -> ThreadingHTTPServer:
+    """
+    Start the mock server on a background thread (port 0 picks a free port).
+    Returns the server; call server.shutdown() when done.
+    """
+    server = ThreadingHTTPServer((host, port), MockLLMHandler)
+    server.daemon_threads = True
+    server.mock_config = MockConfig(**config)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def server_url(server: ThreadingHTTPServer) -> str:
+    """Base URL to hand to configure_transport."""
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gemini/Groq stand-in for benchmarking")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--mode", choices=["record", "replay"], default="replay")
+    parser.add_argument("--fixtures", default="fixtures", help="Fixture directory")
+    parser.add_argument("--latency", default="none", help="fixed:S | uniform:A,B | normal:MU,SD | lognormal:MU,SIGMA")
+    parser.add_argument("--error-429", type=float, default=0.0, help="Probability of an injected 429")
+    parser.add_argument("--error-500", type=float, default=0.0, help="Probability of an injected 500")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on injected 429s")
+    parser.add_argument("--chunk-size", type=int, default=40, help="Characters per streamed chunk")
+    parser.add_argument("--chunk-delay", type=float, default=0.02, help="Seconds between streamed chunks")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), MockLLMHandler)
+    server.daemon_threads = True
+    server.mock_config = MockConfig(
+        mode=args.mode,
+        fixtures=args.fixtures,
+        latency=args.latency,
+        error_429=args.error_429,
+        error_500=args.error_500,
+        retry_after=args.retry_after,
+        chunk_size=args.chunk_size,
+        chunk_delay=args.chunk_delay,
+        seed=args.seed
+    )
+    print(f"🧪 Mock LLM server ({args.mode}) on {server_url(server)} - fixtures: {args.fixtures}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"📊 {server.mock_config.stats}")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
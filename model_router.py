@@ -0,0 +1,239 @@
+"""
+AI Resume Generator - Model Router
+Chooses the model for each request from its task type (jd_parse,
+jd_header, ats_analysis, tailor, tailor_plan, tailor_section, tailor_patch,
+tailor_bullets, qa, extract_profile) using a configurable policy
+table, instead of guessing from the prompt text. Candidates are ranked by
+preference and adjusted with the observed latency and error rate from the
+circuit breakers plus an estimated per-call cost, so cheap extraction tasks
+stay on fast models and an unhealthy model is routed around.
+"""
+
+import copy
+import threading
+from typing import Dict, List, Optional
+
+import circuit_breaker
+
+# Static model facts: prior latency (seconds, used until enough calls are observed)
+# and list price in USD per million input/output tokens.
+MODEL_PROFILES = {
+    ("gemini", "gemini-2.5-flash"): {"p50": 5.0, "p95": 15.0, "cost_in": 0.30, "cost_out": 2.50},
+    ("gemini", "gemini-2.5-pro"): {"p50": 20.0, "p95": 60.0, "cost_in": 1.25, "cost_out": 10.00},
+    ("groq", "llama-3.3-70b-versatile"): {"p50": 3.0, "p95": 10.0, "cost_in": 0.59, "cost_out": 0.79},
+    ("groq", "llama-3.1-8b-instant"): {"p50": 1.0, "p95": 4.0, "cost_in": 0.05, "cost_out": 0.08},
+    ("groq", "qwen/qwen3-32b"): {"p50": 4.0, "p95": 12.0, "cost_in": 0.29, "cost_out": 0.59},
+}
+
+GROQ_CHAIN = ["llama-3.3-70b-versatile", "llama-3.1-8b-instant", "qwen/qwen3-32b"]
+
+# Per-task candidates (in order of preference) and scoring weights.
+#   weights.rank    - seconds-equivalent penalty per step down the preference list
+#   weights.latency - penalty per second of observed p95 above the model's prior p95
+#   weights.error   - penalty for a 100% error rate
+#   weights.cost    - penalty per cent of estimated call cost
+#   max_p95         - observed p95 above this demotes the model behind healthier ones
+#   output_tokens   - expected completion size for the cost estimate
+DEFAULT_WEIGHTS = {"rank": 10.0, "latency": 1.0, "error": 60.0, "cost": 1.0}
+
+TASK_POLICIES = {
+    # Structured extraction: fast model is plenty
+    "jd_parse": {
+        "gemini": ["gemini-2.5-flash", "gemini-2.5-pro"],
+        "groq": GROQ_CHAIN,
+        "max_p95": 30.0,
+        "output_tokens": 800,
+    },
+    # Hybrid JD parsing: four header fields only
+    "jd_header": {
+        "gemini": ["gemini-2.5-flash", "gemini-2.5-pro"],
+        "groq": GROQ_CHAIN,
+        "max_p95": 20.0,
+        "output_tokens": 120,
+    },
+    "extract_profile": {
+        "gemini": ["gemini-2.5-flash", "gemini-2.5-pro"],
+        "groq": GROQ_CHAIN,
+        "max_p95": 45.0,
+        "output_tokens": 3000,
+    },
+    "qa": {
+        "gemini": ["gemini-2.5-flash", "gemini-2.5-pro"],
+        "groq": GROQ_CHAIN,
+        "max_p95": 30.0,
+        "output_tokens": 400,
+    },
+    # Judgement-heavy tasks keep the strongest model first
+    "ats_analysis": {
+        "gemini": ["gemini-2.5-pro", "gemini-2.5-flash"],
+        "groq": GROQ_CHAIN,
+        "max_p95": 90.0,
+        "output_tokens": 800,
+    },
+    "tailor": {
+        "gemini": ["gemini-2.5-pro", "gemini-2.5-flash"],
+        "groq": GROQ_CHAIN,
+        "max_p95": 120.0,
+        "output_tokens": 4000,
+    },
+    # Sharded tailoring: a quick placement plan, then one rewrite per section
+    "tailor_plan": {
+        "gemini": ["gemini-2.5-flash", "gemini-2.5-pro"],
+        "groq": GROQ_CHAIN,
+        "max_p95": 30.0,
+        "output_tokens": 300,
+    },
+    "tailor_section": {
+        "gemini": ["gemini-2.5-pro", "gemini-2.5-flash"],
+        "groq": GROQ_CHAIN,
+        "max_p95": 60.0,
+        "output_tokens": 1200,
+    },
+    # Patch tailoring: full judgement, but output is an edit script
+    "tailor_patch": {
+        "gemini": ["gemini-2.5-pro", "gemini-2.5-flash"],
+        "groq": GROQ_CHAIN,
+        "max_p95": 90.0,
+        "output_tokens": 1000,
+    },
+    # Tailoring sessions: extra bullets for a few items of an existing result
+    "tailor_bullets": {
+        "gemini": ["gemini-2.5-pro", "gemini-2.5-flash"],
+        "groq": GROQ_CHAIN,
+        "max_p95": 45.0,
+        "output_tokens": 500,
+    },
+}
+DEFAULT_POLICY = {
+    "gemini": ["gemini-2.5-flash"],
+    "groq": GROQ_CHAIN,
+    "max_p95": 60.0,
+    "output_tokens": 1000,
+}
+
+# Router settings (see configure_router)
+_config = {
+    "min_samples": 3,        # Observed calls needed before live latency replaces the prior
+    "slow_penalty": 100.0,   # Added when observed p95 exceeds the task's max_p95
+    "open_penalty": 1000.0,  # Added when the model's circuit is open
+}
+
+_lock = threading.Lock()
+_policies = copy.deepcopy(TASK_POLICIES)
+_profiles = dict(MODEL_PROFILES)
+_weights = dict(DEFAULT_WEIGHTS)
+
+
+def configure_router(
+    policies: Dict[str, dict] = None,
+    profiles: Dict[tuple, dict] = None,
+    weights: dict = None,
+    **settings
+) -> dict:
+    """
+    Update the routing table. `policies` entries are merged per task
+    (e.g. {"qa": {"gemini": ["gemini-2.5-flash"]}}), `profiles` per model,
+    `weights` replace individual default weights.
+    Returns the effective policy table.
+    """
+    with _lock:
+        for task, policy in (policies or {}).items():
+            _policies.setdefault(task, copy.deepcopy(DEFAULT_POLICY)).update(policy)
+        for key, profile in (profiles or {}).items():
+            _profiles[key] = dict(_profiles.get(key, {}), **profile)
+        _weights.update(weights or {})
+        for key, value in settings.items():
+            if key not in _config:
+                raise ValueError(f"Unknown router setting: {key}")
+            if value is not None:
+                _config[key] = value
+    return router_table()
+
+
+def router_table() -> dict:
+    """Current policies, model profiles, weights and settings."""
+    with _lock:
+        return {
+            "policies": copy.deepcopy(_policies),
+            "profiles": {f"{p}/{m}": dict(v) for (p, m), v in _profiles.items()},
+            "weights": dict(_weights),
+            "settings": dict(_config),
+        }
+
+
+def get_policy(task: Optional[str]) -> dict:
+    """Policy for `task` (the default policy for unknown or missing tasks)."""
+    with _lock:
+        return copy.deepcopy(_policies.get(task, DEFAULT_POLICY))
+
+
+def candidate_models(task: Optional[str], provider: str) -> List[str]:
+    """The task's static candidate list for a provider (stable, for cache keys)."""
+    return list(get_policy(task).get(provider) or DEFAULT_POLICY.get(provider, []))
+
+
+def estimate_cost(provider: str, model: str, prompt_tokens: int, output_tokens: int) -> float:
+    """Estimated USD cost of one call."""
+    profile = _profiles.get((provider, model), {})
+    return (prompt_tokens * profile.get("cost_in", 0.0) + output_tokens * profile.get("cost_out", 0.0)) / 1_000_000
+
+
+def score_model(provider: str, model: str, rank: int, policy: dict, prompt_tokens: int) -> dict:
+    """Score one candidate (lower is better) and explain the inputs."""
+    snapshot = circuit_breaker.get_breaker(provider, model).snapshot()
+    profile = _profiles.get((provider, model), {})
+    observed = snapshot["calls"] >= _config["min_samples"] and snapshot["p95_latency"] is not None
+    p95 = snapshot["p95_latency"] if observed else profile.get("p95", 30.0)
+    cost = estimate_cost(provider, model, prompt_tokens, policy.get("output_tokens", 1000))
+
+    score = (
+        rank * _weights["rank"]
+        + max(0.0, p95 - profile.get("p95", p95)) * _weights["latency"]
+        + snapshot["error_rate"] * _weights["error"]
+        + cost * 100 * _weights["cost"]
+    )
+    if observed and p95 > policy.get("max_p95", float("inf")):
+        score += _config["slow_penalty"]
+    if snapshot["state"] == circuit_breaker.OPEN:
+        score += _config["open_penalty"]
+
+    return {
+        "model": model,
+        "score": round(score, 3),
+        "p50": snapshot["p50_latency"] if observed else profile.get("p50"),
+        "p95": p95,
+        "observed": observed,
+        "error_rate": snapshot["error_rate"],
+        "state": snapshot["state"],
+        "cost_usd": round(cost, 6),
+    }
+
+
+def route(task: Optional[str], provider: str = "gemini", prompt: str = "") -> dict:
+    """
+    Pick the model(s) for a request.
+    Returns {"task", "provider", "model", "models", "scores"} where `models`
+    is every candidate best-first (the fallback order for chains like Groq).
+    """
+    policy = get_policy(task)
+    candidates = policy.get(provider) or DEFAULT_POLICY.get(provider, [])
+    if not candidates:
+        raise Exception(f"No models configured for provider {provider}")
+
+    prompt_tokens = (len(prompt) + 3) // 4
+    scores = [score_model(provider, model, rank, policy, prompt_tokens) for rank, model in enumerate(candidates)]
+    ranked = sorted(scores, key=lambda s: s["score"])
+
+    if ranked[0]["model"] != candidates[0]:
+        preferred = next(s for s in scores if s["model"] == candidates[0])
+        print(f"   🧭 Router ({task or 'default'}): {provider}/{ranked[0]['model']} instead of "
+              f"{candidates[0]} (state {preferred['state']}, p95 {preferred['p95']}s, "
+              f"errors {preferred['error_rate']:.0%})")
+
+    return {
+        "task": task,
+        "provider": provider,
+        "model": ranked[0]["model"],
+        "models": [s["model"] for s in ranked],
+        "scores": ranked,
+    }
@@ -0,0 +1,305 @@
+"""
+AI Resume Generator - Patch-Based Tailoring
+Tailoring mode where the model returns a compact edit script instead of
+re-emitting the whole resume. Items and bullets are referenced by the
+profile model's stable ids ("experience.0", bullets "experience.0.b2"), which
+survive pre-ranking; a local applier validates the script and applies it to
+the loaded profile. Output tokens scale with the amount of change, not with
+resume length.
+
+Edit script ops:
+    {"op": "set_summary", "text": "..."}
+    {"op": "replace_bullet", "id": "experience.0.b1", "text": "..."}
+    {"op": "drop", "id": "projects.2"} / {"op": "drop", "id": "experience.0.b3"}
+    {"op": "move", "id": "experience.3", "to": "leadership"}
+    {"op": "reorder", "section": "experience", "ids": ["experience.1", "experience.0"]}
+    {"op": "reorder", "id": "experience.0", "ids": ["experience.0.b2", "experience.0.b0"]}
+    {"op": "add_skills", "category": "Cloud", "skills": ["BigQuery"]}
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+import json_extract
+import main
+import profile_model
+import prompt_compiler
+import relevance_ranker
+import schemas
+import sharded_tailor
+
+# Sections whose items the edit script can reference
+PATCH_SECTIONS = ["experience", "projects", "leadership", "research", "volunteering", "certifications", "awards"]
+# Sections an item may be moved to
+MOVE_TARGETS = ["experience", "projects", "leadership", "research", "volunteering"]
+
+OPS = {"set_summary", "replace_bullet", "drop", "move", "reorder", "add_skills"}
+
+_BULLET_ID = re.compile(r'^(.+)\.b(\d+)$')
+
+
+def patch_items(profile: profile_model.Profile) -> Dict[str, profile_model.Item]:
+    """Item id -> Item for every item the edit script can reference, in section order."""
+    return {
+        item.id: item
+        for section in PATCH_SECTIONS
+        for item in profile.items_of(section)
+        if isinstance(item, profile_model.Item)
+    }
+
+
+def render_profile(profile: profile_model.Profile) -> str:
+    """Profile as id-annotated text: compact input the edit script can reference."""
+    lines = []
+    if profile.get("summary"):
+        lines.append(f"SUMMARY: {profile['summary']}")
+    skills = profile.get("skills")
+    if isinstance(skills, dict) and skills:
+        lines.append("SKILLS:")
+        lines.extend(f"  {category}: {value}" for category, value in skills.items())
+
+    current = None
+    for item_id, item in patch_items(profile).items():
+        if item.section != current:
+            lines.append(f"{item.section.upper()}:")
+            current = item.section
+        target = f" [target_bullets={item.target_bullets}]" if item.target_bullets is not None else ""
+        lines.append(f"  [{item_id}] {relevance_ranker.item_label(item.section, item)}{target}")
+        for j, bullet in enumerate(item.bullets or ()):
+            lines.append(f"    {item_id}.b{j}: {bullet}")
+    return "\n".join(lines)
+
+
+def build_patch_prompt(profile: profile_model.Profile, jd_analysis: dict, strategy_note: str, omitted: str = "") -> str:
+    """Prompt asking for an edit script against the id-annotated profile."""
+    profile_text = render_profile(profile)
+    omitted_note = f"\nOMITTED FROM THE PROFILE (ranked least relevant; do not recreate them):\n{omitted}\n" if omitted else ""
+
+    def render(jd_analysis):
+        return f"""
+You are a Strategic Resume Architect. Tailor the candidate's resume to the job by returning
+an EDIT SCRIPT, not the resume. Anything you do not edit stays exactly as it is.
+
+JOB ANALYSIS:
+{jd_analysis}
+
+{strategy_note}
+
+CANDIDATE PROFILE (ids in brackets; bullet ids like experience.0.b1):
+{profile_text}
+{omitted_note}
+AVAILABLE OPS:
+- {{"op": "set_summary", "text": "2-3 sentence summary optimized for the JD"}}
+- {{"op": "replace_bullet", "id": "experience.0.b1", "text": "rewritten bullet"}}
+- {{"op": "drop", "id": "projects.2"}} (an item) or {{"op": "drop", "id": "experience.0.b3"}} (a bullet)
+- {{"op": "move", "id": "experience.3", "to": "leadership"}} (experience, projects, leadership, research, volunteering)
+- {{"op": "reorder", "section": "experience", "ids": ["experience.1", "experience.0"]}} or {{"op": "reorder", "id": "experience.0", "ids": ["experience.0.b2", "experience.0.b0"]}}
+- {{"op": "add_skills", "category": "Cloud", "skills": ["BigQuery"]}}
+
+RULES:
+- Only emit ops for real changes. Respect target_bullets (drop bullets to meet it).
+- Use <b>tags</b> for bolding key achievements in rewritten text.
+- Return ONLY valid JSON: {{"ops": [...]}}
+"""
+    return prompt_compiler.compile_prompt("tailor_patch", render, jd_analysis=jd_analysis)
+
+
+class _Edit:
+    """Working state of one profile item while a script is applied."""
+    __slots__ = ("id", "section", "data", "bullets", "dropped")
+
+    def __init__(self, item: profile_model.Item):
+        self.id = item.id
+        self.section = item.section
+        self.data = dict(item.fields)
+        if item.target_bullets is not None:
+            self.data["target_bullets"] = item.target_bullets
+        self.bullets = [[f"{item.id}.b{j}", b, False] for j, b in enumerate(item.bullets)] if item.bullets is not None else None
+        self.dropped = False
+
+
+def apply_patch(profile: profile_model.Profile, ops: List[dict]) -> Tuple[dict, dict]:
+    """
+    Validate and apply an edit script to `profile` (immutable; only the
+    edited items and the top-level containers are new).
+    Invalid ops are skipped and reported, never fatal.
+    Returns (resume, report) with report = {"applied": n, "skipped": [{"op", "reason"}]}.
+    """
+    resume = {k: v for k, v in profile.to_dict().items() if k not in PATCH_SECTIONS}
+    items = {item_id: _Edit(item) for item_id, item in patch_items(profile).items()}
+    order = list(items)  # Section order is decided at the end; this keeps relative order
+    report = {"applied": 0, "skipped": []}
+
+    def bullet(bullet_id: str):
+        # Resolve by the stable id each entry carries: reorders move entries, ids stay put
+        match = _BULLET_ID.match(bullet_id or "")
+        item = items.get(match.group(1)) if match else None
+        if item is None or item.bullets is None:
+            return None, None
+        return item, next((b for b in item.bullets if b[0] == bullet_id), None)
+
+    def apply(op: dict) -> Optional[str]:
+        """Apply one op; returns the reason when it is invalid."""
+        kind = op.get("op")
+        if kind not in OPS:
+            return f"unknown op {kind!r}"
+
+        if kind == "set_summary":
+            if not isinstance(op.get("text"), str) or not op["text"].strip():
+                return "empty summary"
+            resume["summary"] = op["text"].strip()
+
+        elif kind == "replace_bullet":
+            _, target = bullet(op.get("id"))
+            if target is None:
+                return f"unknown bullet {op.get('id')!r}"
+            if not isinstance(op.get("text"), str) or not op["text"].strip():
+                return "empty bullet text"
+            target[1] = op["text"].strip()
+
+        elif kind == "drop":
+            if op.get("id") in items:
+                items[op["id"]].dropped = True
+            else:
+                _, target = bullet(op.get("id"))
+                if target is None:
+                    return f"unknown id {op.get('id')!r}"
+                target[2] = True
+
+        elif kind == "move":
+            item = items.get(op.get("id"))
+            if item is None:
+                return f"unknown item {op.get('id')!r}"
+            if op.get("to") not in MOVE_TARGETS or item.section not in MOVE_TARGETS:
+                return f"cannot move {item.section} to {op.get('to')!r}"
+            for old, new in sharded_tailor.MOVE_FIELDS.get((item.section, op["to"]), {}).items():
+                if old in item.data:
+                    item.data[new] = item.data.pop(old)
+            item.section = op["to"]
+
+        elif kind == "reorder":
+            ids = op.get("ids")
+            if not isinstance(ids, list):
+                return "ids must be a list"
+            if op.get("id"):
+                item = items.get(op["id"])
+                if item is None or item.bullets is None:
+                    return f"unknown item {op['id']!r}"
+                by_id = {b[0]: b for b in item.bullets}
+                if any(i not in by_id for i in ids):
+                    return "reorder references bullets of another item"
+                listed = [by_id[i] for i in dict.fromkeys(ids)]
+                item.bullets = listed + [b for b in item.bullets if b[0] not in ids]
+            else:
+                if any(i not in items for i in ids):
+                    return "reorder references unknown items"
+                ranked = list(dict.fromkeys(ids))
+                order[:] = ranked + [i for i in order if i not in ranked]
+
+        elif kind == "add_skills":
+            skills = op.get("skills")
+            if isinstance(skills, str):
+                skills = [s.strip() for s in skills.split(",")]
+            if not isinstance(skills, list) or not op.get("category"):
+                return "add_skills needs a category and a list of skills"
+            current = resume.setdefault("skills", {})
+            if not isinstance(current, dict):
+                return "profile skills are not categorized"
+            existing = [s.strip() for s in str(current.get(op["category"], "")).split(",") if s.strip()]
+            known = {s.lower() for s in existing}
+            existing += [s for s in (str(x).strip() for x in skills) if s and s.lower() not in known]
+            current[op["category"]] = ", ".join(existing)
+        return None
+
+    for op in ops if isinstance(ops, list) else []:
+        reason = apply(op) if isinstance(op, dict) else "op is not an object"
+        if reason:
+            report["skipped"].append({"op": op, "reason": reason})
+        else:
+            report["applied"] += 1
+
+    for section in PATCH_SECTIONS:
+        if section in profile or any(items[i].section == section for i in order):
+            resume[section] = []
+    for item_id in order:
+        item = items[item_id]
+        if item.dropped:
+            continue
+        data = item.data
+        if item.bullets is not None:
+            data["bullets"] = [text for _, text, dropped in item.bullets if not dropped]
+            target = data.get("target_bullets")
+            if isinstance(target, int) and target < len(data["bullets"]):
+                data["bullets"] = data["bullets"][:target]
+        data.pop("target_bullets", None)
+        resume[item.section].append(data)
+    return resume, report
+
+
+def parse_patch(response_text: str) -> Optional[List[dict]]:
+    """The ops list of a patch response, or None if there is none."""
+    data = schemas.validate("tailor_patch", json_extract.extract_json(response_text))
+    if isinstance(data, dict) and isinstance(data.get("ops"), list):
+        return data["ops"]
+    return None
+
+
+def prepare_profile(
+    profile: profile_model.Profile,
+    jd_analysis: dict,
+    bullet_counts: Optional[dict]
+) -> Tuple[profile_model.Profile, str]:
+    """Annotated, pre-ranked profile the script may reference, plus the omitted summary."""
+    profile, report = relevance_ranker.prerank_profile(profile.with_targets(bullet_counts), jd_analysis)
+    return profile, relevance_ranker.omitted_summary(report)
+
+
+def finish_patch(
+    response_text: str,
+    profile: profile_model.Profile,
+    base_resume: profile_model.Profile,
+    jd_analysis: dict,
+    provider: str,
+    bullet_counts: Optional[dict],
+    reuse_key: Optional[str]
+) -> dict:
+    """Apply a patch response (shared by the sync and async paths)."""
+    ops = parse_patch(response_text)
+    if ops is None:
+        return main.finalize_tailored_resume(
+            "", base_resume, jd_analysis, provider, bullet_counts,
+            error=Exception("no edit script in response")
+        )
+
+    resume, report = apply_patch(profile, ops)
+    for skipped in report["skipped"]:
+        print(f"   ⚠️ Skipped edit {skipped['op']}: {skipped['reason']}")
+    print(f"   🩹 Patch tailoring: applied {report['applied']} edits ({len(response_text)} chars of output)")
+
+    tailored = main.postprocess_tailored_resume(resume, base_resume)
+    main.remember_tailored_resume(reuse_key, tailored)
+    return tailored
+
+
+def tailor_resume_patch(
+    base_resume: dict,
+    jd_analysis: dict,
+    provider: str = "gemini",
+    api_key: str = None,
+    tailoring_strategy: str = "balanced",
+    bullet_counts: dict = None
+) -> dict:
+    """Patch-mode version of main.tailor_resume (same arguments and result)."""
+    base_resume = profile_model.load_profile(base_resume)
+    reuse_key, reused = main.lookup_tailored_resume(base_resume, jd_analysis, tailoring_strategy, bullet_counts)
+    if reused is not None:
+        return reused
+
+    profile, omitted = prepare_profile(base_resume, jd_analysis, bullet_counts)
+    prompt = build_patch_prompt(profile, jd_analysis, main.tailoring_strategy_note(tailoring_strategy), omitted)
+    try:
+        response_text = main.query_provider(prompt, provider, api_key=api_key, task="tailor_patch")
+    except Exception as e:
+        return main.finalize_tailored_resume("", base_resume, jd_analysis, provider, bullet_counts, error=e)
+
+    return finish_patch(response_text, profile, base_resume, jd_analysis, provider, bullet_counts, reuse_key)
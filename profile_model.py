@@ -0,0 +1,180 @@
+"""
+AI Resume Generator - Profile Model
+Normalized, read-only view of a resume profile. Loading resolves field
+aliases once ("title"/"position"/"job_title"/"designation" -> "role",
+"school" -> "institution") and gives every list item a stable id
+("experience.0") that survives pre-ranking, so the tailoring modes and
+sessions all refer to items the same way. Profiles and items are immutable
+mappings: updates return a new Profile that shares every untouched item,
+tuple and string with the old one. Each tailoring entry point loads the
+profile once and passes it through, so the hot path and the PDF builder
+read it without copying the whole document. to_dict() gives back plain
+JSON data; json_default lets json.dumps serialize a Profile directly.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# List sections whose entries become Items
+ITEM_SECTIONS = ["education", "experience", "projects", "leadership", "research", "volunteering", "certifications", "awards"]
+# Sections whose items take bullet counts (see Profile.with_targets)
+COUNT_SECTIONS = ["experience", "projects", "leadership", "research"]
+
+# Canonical field -> aliases resolved at load time, per section
+FIELD_ALIASES = {
+    "education": {"institution": ("school",)},
+    "experience": {"role": ("title", "position", "job_title", "designation")},
+    "leadership": {"role": ("title",)},
+    "volunteering": {"role": ("title",)},
+}
+# Fields every item of a section has after loading
+REQUIRED_FIELDS = {
+    "education": ("institution",),
+    "experience": ("role",),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Item(Mapping):
+    """One profile entry. Reads like the original dict (canonical field names)."""
+    id: str
+    section: str
+    fields: Mapping
+    bullets: Optional[Tuple[str, ...]] = None
+    target_bullets: Optional[int] = None
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "bullets" and self.bullets is not None:
+            return self.bullets
+        if key == "target_bullets" and self.target_bullets is not None:
+            return self.target_bullets
+        return self.fields[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.fields
+        if self.bullets is not None:
+            yield "bullets"
+        if self.target_bullets is not None:
+            yield "target_bullets"
+
+    def __len__(self) -> int:
+        return len(self.fields) + (self.bullets is not None) + (self.target_bullets is not None)
+
+    def to_dict(self) -> dict:
+        data = dict(self.fields)
+        if self.bullets is not None:
+            data["bullets"] = list(self.bullets)
+        if self.target_bullets is not None:
+            data["target_bullets"] = self.target_bullets
+        return data
+
+
+def load_item(section: str, index: int, data: dict) -> Item:
+    """Item with aliases resolved to canonical field names."""
+    fields = {k: v for k, v in data.items() if k != "bullets"}
+    for canonical, aliases in FIELD_ALIASES.get(section, {}).items():
+        if canonical not in fields:
+            alias = next((a for a in aliases if a in fields), None)
+            if alias is not None:
+                fields[canonical] = fields.pop(alias)
+    for field in REQUIRED_FIELDS.get(section, ()):
+        fields.setdefault(field, "")
+    target = fields.pop("target_bullets", None)
+    bullets = data.get("bullets")
+    return Item(
+        id=f"{section}.{index}",
+        section=section,
+        fields=MappingProxyType(fields),
+        bullets=tuple(bullets) if isinstance(bullets, list) else None,
+        target_bullets=target if isinstance(target, int) else None,
+    )
+
+
+@dataclass(frozen=True, slots=True, weakref_slot=True)
+class Profile(Mapping):
+    """
+    A loaded profile. Item sections are tuples of Items; every other key
+    (name, contact, summary, skills, section_titles, ...) is kept as given.
+    """
+    data: Mapping
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def items_of(self, section: str) -> Tuple[Item, ...]:
+        return self.data.get(section) or ()
+
+    def item(self, item_id: str) -> Optional[Item]:
+        """Item by stable id ("projects.2"), or None."""
+        section, _, index = item_id.rpartition(".")
+        items = self.items_of(section)
+        return items[int(index)] if index.isdigit() and int(index) < len(items) else None
+
+    def with_values(self, **changes) -> "Profile":
+        """New profile with top-level keys replaced (everything else shared)."""
+        return replace(self, data=MappingProxyType({**self.data, **changes}))
+
+    def with_targets(self, bullet_counts: Optional[dict]) -> "Profile":
+        """
+        New profile with each item's requested bullet count set as its
+        target_bullets. Sections without counts are shared, not copied.
+        """
+        changes = {}
+        for section in COUNT_SECTIONS:
+            counts = (bullet_counts or {}).get(section)
+            items = self.items_of(section)
+            if not counts or not items:
+                continue
+            changes[section] = tuple(
+                replace(item, target_bullets=counts[i]) if i < len(counts) else item
+                for i, item in enumerate(items)
+            )
+        return self.with_values(**changes) if changes else self
+
+    def to_dict(self) -> dict:
+        """
+        Plain JSON data. Containers are new (callers may modify them); strings
+        are shared.
+        """
+        data = {}
+        for key, value in self.data.items():
+            if isinstance(value, tuple) and key in ITEM_SECTIONS:
+                data[key] = [item.to_dict() if isinstance(item, Item) else item for item in value]
+            elif isinstance(value, dict):
+                data[key] = dict(value)
+            elif isinstance(value, list):
+                data[key] = list(value)
+            else:
+                data[key] = value
+        return data
+
+
+def json_default(value):
+    """json.dumps default= hook: Profiles and Items serialize as their plain data."""
+    if isinstance(value, (Profile, Item)):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def load_profile(data) -> Profile:
+    """Normalize a profile dict (a Profile is returned as is)."""
+    if isinstance(data, Profile):
+        return data
+    values: Dict[str, Any] = {}
+    for key, value in (data or {}).items():
+        if key in ITEM_SECTIONS and isinstance(value, list):
+            values[key] = tuple(
+                load_item(key, i, item) if isinstance(item, dict) else item
+                for i, item in enumerate(value)
+            )
+        else:
+            values[key] = value
+    return Profile(MappingProxyType(values))
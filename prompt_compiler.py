@@ -0,0 +1,290 @@
+"""
+AI Resume Generator - Prompt Compiler
+Builds provider prompts from compact, canonical serializations of the
+profile and JD analysis (no indentation, empty fields dropped), estimates
+their token count and enforces a per-task token budget by trimming
+low-priority content before anything is sent.
+"""
+
+import copy
+import json
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+import profile_model
+
+# Token budget per task (whole prompt) and whether profile content may be trimmed.
+# Tailoring never trims the profile: anything the model does not see is lost.
+TASK_BUDGETS = {
+    "jd_parse": {"tokens": 6000, "trim_profile": True},
+    "jd_header": {"tokens": 1500, "trim_profile": True},
+    "ats_analysis": {"tokens": 8000, "trim_profile": True},
+    "qa": {"tokens": 6000, "trim_profile": True},
+    "extract_profile": {"tokens": 10000, "trim_profile": False},
+    "tailor": {"tokens": 16000, "trim_profile": False},
+    "tailor_plan": {"tokens": 6000, "trim_profile": False},
+    "tailor_section": {"tokens": 8000, "trim_profile": False},
+    "tailor_patch": {"tokens": 16000, "trim_profile": False},
+    "tailor_bullets": {"tokens": 6000, "trim_profile": False},
+}
+DEFAULT_BUDGET = {"tokens": 8000, "trim_profile": False}
+
+# JD analysis keys dropped first when over budget (least useful to the model first)
+JD_LOW_PRIORITY_KEYS = [
+    "key_metrics_emphasis", "industry_terms", "soft_skills", "action_verbs",
+    "domain_context", "years_experience", "job_identifier", "company_name",
+]
+
+# Profile sections dropped first when over budget (before bullets are capped)
+PROFILE_LOW_PRIORITY_SECTIONS = ["volunteering", "awards", "certifications", "languages", "research", "leadership"]
+
+CHARS_PER_TOKEN = 4
+
+# JD text blocks dropped first when over budget (boilerplate) and kept longest (requirements)
+JD_DROP_CUES = re.compile(
+    r'\b(benefits?|perks?|equal opportunity|eeo|salary|compensation|pay range|401\(?k\)?|paid time off|pto|'
+    r'insurance|about us|our mission|our values|diversity|accommodations?|privacy|how to apply)\b', re.I
+)
+JD_KEEP_CUES = re.compile(
+    r'\b(requirements?|required|qualifications?|must|experience|skills?|responsibilit\w*|proficien\w*|'
+    r'knowledge|degree|preferred|nice to have|you will|you have)\b', re.I
+)
+_JD_HEADING = re.compile(r'^\s*[^.!?]{1,60}:\s*$')
+
+# Prompt compiler settings (see configure_prompts)
+_config = {
+    # Render the old indented serialization too, to report saved tokens (costs a second render per prompt)
+    "track_savings": os.getenv("PROMPT_TRACK_SAVINGS", "0") == "1",
+}
+
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def configure_prompts(track_savings: bool = None) -> dict:
+    """Update prompt compiler settings. Returns the effective configuration."""
+    if track_savings is not None:
+        _config["track_savings"] = track_savings
+    return dict(_config)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def prune_empty(value):
+    """Recursively drop None, empty strings, empty lists and empty dicts."""
+    if isinstance(value, dict):
+        pruned = {}
+        for key, item in value.items():
+            item = prune_empty(item)
+            if item is None or item == "" or item == [] or item == {}:
+                continue
+            pruned[key] = item
+        return pruned
+    if isinstance(value, list):
+        return [p for p in (prune_empty(item) for item in value) if p is not None and p != "" and p != [] and p != {}]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+@lru_cache(maxsize=256)
+def _compact_from_raw(raw: str) -> str:
+    return json.dumps(prune_empty(json.loads(raw)), separators=(",", ":"), ensure_ascii=False)
+
+
+def compact_json(data) -> str:
+    """
+    Compact, canonical serialization with empty fields removed.
+    Results are cached on the raw content, so the same profile or JD analysis
+    reused across prompts is pruned only once.
+    """
+    if not data:
+        return "{}"
+    raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=profile_model.json_default)
+    return _compact_from_raw(raw)
+
+
+def _trim_profile_steps() -> List[Tuple[str, Callable[[dict], bool]]]:
+    """Ordered trimming steps for a profile, least valuable content first."""
+    steps = []
+
+    for section in PROFILE_LOW_PRIORITY_SECTIONS:
+        def drop_section(p, section=section):
+            if p.get(section):
+                del p[section]
+                return True
+            return False
+        steps.append((f"dropped {section}", drop_section))
+
+    for limit in (3, 2):
+        def cap_bullets(p, limit=limit):
+            changed = False
+            for section in ("projects", "experience"):
+                items = p.get(section) or []
+                # Older items (later in the list) lose bullets first
+                for item in reversed(items):
+                    bullets = item.get("bullets") if isinstance(item, dict) else None
+                    if isinstance(bullets, list) and len(bullets) > limit:
+                        item["bullets"] = bullets[:limit]
+                        changed = True
+            return changed
+        steps.append((f"capped bullets at {limit}", cap_bullets))
+
+    return steps
+
+
+def jd_blocks(jd_text: str) -> List[str]:
+    """JD text split into blocks at blank lines and at short "Heading:" lines."""
+    blocks, current = [], []
+    for line in jd_text.splitlines(keepends=True):
+        if (not line.strip() or _JD_HEADING.match(line)) and any(l.strip() for l in current):
+            blocks.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        blocks.append("".join(current))
+    return blocks
+
+
+def trim_jd_text(jd_text: str, max_chars: int) -> str:
+    """
+    JD text cut to about `max_chars` by dropping its least relevant blocks:
+    boilerplate (benefits, EEO, salary, about us) first, then blocks without
+    requirement cues, later blocks before earlier ones. Kept blocks stay in
+    their original order; a single remaining block is cut at its head.
+    """
+    blocks = jd_blocks(jd_text)
+
+    def relevance(i: int):
+        block = blocks[i]
+        return (len(JD_KEEP_CUES.findall(block)) - 2 * len(JD_DROP_CUES.findall(block)), -i)
+
+    kept = set(range(len(blocks)))
+    size = len(jd_text)
+    for i in sorted(kept, key=relevance):
+        if size <= max_chars or len(kept) == 1:
+            break
+        kept.discard(i)
+        size -= len(blocks[i])
+    return "".join(blocks[i] for i in sorted(kept))[:max_chars]
+
+
+def _record(task: str, report: dict):
+    with _stats_lock:
+        entry = _stats.setdefault(task, {"prompts": 0, "tokens": 0, "saved_tokens": 0, "over_budget": 0})
+        entry["prompts"] += 1
+        entry["tokens"] += report["tokens"]
+        entry["saved_tokens"] += report["saved_tokens"]
+        if report["tokens"] > report["budget"]:
+            entry["over_budget"] += 1
+        entry["last"] = report
+
+
+def compile_prompt(
+    task: str,
+    render: Callable[..., str],
+    profile: Optional[dict] = None,
+    jd_analysis: Optional[dict] = None,
+    jd_text: Optional[str] = None,
+    budget_tokens: int = None
+) -> str:
+    """
+    Render a prompt for `task` within its token budget.
+
+    `render` receives the serialized parts as keyword arguments
+    (profile=..., jd_analysis=..., jd_text=... for those supplied) and returns
+    the prompt. When the result is over budget, low-priority JD analysis keys,
+    profile content (if the task allows it) and finally the least relevant JD
+    text blocks (see trim_jd_text) are trimmed until it fits. The size report
+    is printed and kept in prompt_stats(); saved tokens against the old
+    indented serialization are only measured with track_savings enabled.
+    """
+    policy = TASK_BUDGETS.get(task, DEFAULT_BUDGET)
+    budget = budget_tokens or policy["tokens"]
+
+    def render_parts(p, jd, text):
+        parts = {}
+        if profile is not None:
+            parts["profile"] = compact_json(p)
+        if jd_analysis is not None:
+            parts["jd_analysis"] = compact_json(jd)
+        if jd_text is not None:
+            parts["jd_text"] = text
+        return render(**parts)
+
+    # Baseline: what the old indented serialization would have cost
+    baseline_tokens = None
+    if _config["track_savings"]:
+        baseline_parts = {}
+        if profile is not None:
+            baseline_parts["profile"] = json.dumps(profile, indent=2, default=profile_model.json_default)
+        if jd_analysis is not None:
+            baseline_parts["jd_analysis"] = json.dumps(jd_analysis, indent=2)
+        if jd_text is not None:
+            baseline_parts["jd_text"] = jd_text
+        baseline_tokens = estimate_tokens(render(**baseline_parts))
+
+    cur_profile, cur_jd, cur_text = profile, jd_analysis, jd_text
+    prompt = render_parts(cur_profile, cur_jd, cur_text)
+    tokens = estimate_tokens(prompt)
+    trims = []
+
+    if tokens > budget and jd_analysis:
+        cur_jd = dict(jd_analysis)
+        for key in JD_LOW_PRIORITY_KEYS:
+            if tokens <= budget:
+                break
+            if key in cur_jd:
+                del cur_jd[key]
+                trims.append(f"dropped jd.{key}")
+                prompt = render_parts(cur_profile, cur_jd, cur_text)
+                tokens = estimate_tokens(prompt)
+
+    if tokens > budget and profile and policy["trim_profile"]:
+        # Plain, modifiable copy (a Profile is immutable)
+        cur_profile = json.loads(json.dumps(profile, default=profile_model.json_default))
+        for description, step in _trim_profile_steps():
+            if tokens <= budget:
+                break
+            if step(cur_profile):
+                trims.append(description)
+                prompt = render_parts(cur_profile, cur_jd, cur_text)
+                tokens = estimate_tokens(prompt)
+
+    if tokens > budget and jd_text:
+        # Drop the least relevant blocks (boilerplate first), wherever they are
+        overflow_chars = (tokens - budget) * CHARS_PER_TOKEN
+        keep = max(CHARS_PER_TOKEN * 200, len(jd_text) - overflow_chars)
+        if keep < len(jd_text):
+            cur_text = trim_jd_text(jd_text, keep)
+            trims.append(f"trimmed jd_text to {len(cur_text)} chars")
+            prompt = render_parts(cur_profile, cur_jd, cur_text)
+            tokens = estimate_tokens(prompt)
+
+    report = {
+        "task": task,
+        "tokens": tokens,
+        "budget": budget,
+        "baseline_tokens": baseline_tokens,
+        "saved_tokens": max(0, baseline_tokens - tokens) if baseline_tokens is not None else 0,
+        "trims": trims,
+    }
+    _record(task, report)
+    trim_note = f", trimmed: {'; '.join(trims)}" if trims else ""
+    saved_note = f" (saved ~{report['saved_tokens']})" if baseline_tokens is not None else ""
+    print(f"   📏 Prompt ({task}): ~{tokens} tokens of {budget} budget{saved_note}{trim_note}")
+    return prompt
+
+
+def prompt_stats() -> dict:
+    """Per-task prompt size counters and the last report for each task."""
+    with _stats_lock:
+        return copy.deepcopy(_stats)
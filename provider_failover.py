@@ -0,0 +1,219 @@
+"""
+AI Resume Generator - Cross-Provider Failover
+Runs a request against an ordered list of providers (e.g. Gemini then Groq)
+under one per-request deadline. When the current provider errors, returns an
+empty response or does not answer within its share of the deadline, the
+request moves on to the next provider. Sync attempts run on the caller's
+thread; their share of the deadline is enforced through the transport
+timeouts (provider_transport.deadline_scope), so it starts counting when the
+attempt does. The provider that actually served the
+request is recorded for the caller.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import os
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import provider_transport
+
+# Failover settings (see configure_failover)
+_config = {
+    "enabled": os.getenv("LLM_FAILOVER", "1") != "0",
+    "deadline": float(os.getenv("LLM_DEADLINE", "180")),  # Whole request, all providers
+    "attempt_timeout": {"gemini": 120.0, "groq": 60.0},   # Cap per provider attempt
+    "order": {
+        "gemini": ["gemini", "groq"],
+        "groq": ["groq", "gemini"],
+    },
+}
+
+# Per thread / per asyncio task: which provider served the last request
+_last_served = contextvars.ContextVar("last_served", default=None)
+
+# Per context: provider -> semaphore held around each attempt (see provider_limits)
+_provider_slots = contextvars.ContextVar("provider_slots", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """No provider answered within the request deadline."""
+
+
+def configure_failover(
+    enabled: bool = None,
+    deadline: float = None,
+    attempt_timeout: dict = None,
+    order: dict = None
+) -> dict:
+    """Update failover settings. Returns the effective configuration."""
+    if enabled is not None:
+        _config["enabled"] = enabled
+    if deadline is not None:
+        _config["deadline"] = deadline
+    if attempt_timeout:
+        _config["attempt_timeout"] = dict(_config["attempt_timeout"], **attempt_timeout)
+    if order:
+        _config["order"] = dict(_config["order"], **order)
+    return dict(_config)
+
+
+def is_enabled(override: Optional[bool] = None) -> bool:
+    return _config["enabled"] if override is None else override
+
+
+def failover_order(provider: str) -> List[str]:
+    """Providers to try for a request that asked for `provider`, in order."""
+    if not _config["enabled"]:
+        return [provider]
+    order = _config["order"].get(provider) or [provider]
+    if order[0] != provider:
+        order = [provider] + [p for p in order if p != provider]
+    return list(order)
+
+
+def get_last_served() -> Optional[dict]:
+    """
+    Report for the most recent failover request in this thread / task:
+    {"requested", "provider", "attempts": [{"provider", "elapsed", "error"}], "elapsed"}.
+    """
+    return _last_served.get()
+
+
+def record_served(report: Optional[dict]):
+    """Set the served-by report for this thread / task (e.g. for merged or cached requests)."""
+    _last_served.set(report)
+
+
+@contextlib.contextmanager
+def provider_limits(slots: Dict[str, threading.Semaphore]):
+    """
+    Limit concurrent calls per provider for requests made in this context
+    (thread, or tasks/threads started with a copy of it). Each sync attempt
+    holds a slot of the provider it actually calls, so failover traffic is
+    counted against the provider that serves it. Waiting for a slot does not
+    use the attempt's share of the deadline.
+    """
+    token = _provider_slots.set(slots)
+    try:
+        yield
+    finally:
+        _provider_slots.reset(token)
+
+
+def _slot(provider: str):
+    return (_provider_slots.get() or {}).get(provider) or contextlib.nullcontext()
+
+
+def _attempt_budget(provider: str, started: float, deadline: float) -> float:
+    remaining = deadline - (time.monotonic() - started)
+    return min(remaining, _config["attempt_timeout"].get(provider, remaining))
+
+
+def _finish(report: dict, started: float, provider: Optional[str]):
+    report["provider"] = provider
+    report["elapsed"] = round(time.monotonic() - started, 3)
+    _last_served.set(report)
+    if provider and provider != report["requested"]:
+        print(f"   🔀 Failover: served by {provider} instead of {report['requested']} in {report['elapsed']}s")
+
+
+def run_with_failover(
+    providers: List[str],
+    attempt: Callable[[str], str],
+    deadline: float = None
+) -> str:
+    """
+    Call attempt(provider) for each provider in order until one returns a
+    non-empty response. Each attempt runs inline under a transport deadline
+    for its share of the request deadline: HTTP timeouts and rate-limit waits
+    are capped at the time left, so a slow provider fails over instead of
+    blocking. With failover disabled, only the first provider is called.
+    """
+    deadline = deadline or _config["deadline"]
+    started = time.monotonic()
+    report = {"requested": providers[0], "provider": None, "attempts": []}
+    last_error = None
+
+    if not _config["enabled"]:
+        with _slot(providers[0]):
+            text = attempt(providers[0])
+        _finish(report, started, providers[0])
+        return text
+
+    for provider in providers:
+        with _slot(provider):
+            budget = _attempt_budget(provider, started, deadline)
+            if budget <= 0:
+                break
+            attempt_start = time.monotonic()
+            try:
+                with provider_transport.deadline_scope(budget):
+                    text = attempt(provider)
+                error = None if text else "empty response"
+            except Exception as e:
+                text, error = None, str(e)
+        if error is not None and time.monotonic() - attempt_start >= budget:
+            error = f"no response within {budget:.1f}s ({error})"
+        report["attempts"].append({
+            "provider": provider,
+            "elapsed": round(time.monotonic() - attempt_start, 3),
+            "error": error,
+        })
+        if error is None:
+            _finish(report, started, provider)
+            return text
+        last_error = error
+        print(f"   ⚠️ {provider} failed ({error}); trying next provider...")
+
+    _finish(report, started, None)
+    if last_error is None or (time.monotonic() - started) >= deadline:
+        raise DeadlineExceeded(f"No provider answered within {deadline:.1f}s (last error: {last_error})")
+    raise Exception(f"All providers failed. Last error: {last_error}")
+
+
+async def run_with_failover_async(
+    providers: List[str],
+    attempt: Callable[[str], Awaitable[str]],
+    deadline: float = None
+) -> str:
+    """Async counterpart of run_with_failover (timed-out attempts are cancelled)."""
+    deadline = deadline or _config["deadline"]
+    started = time.monotonic()
+    report = {"requested": providers[0], "provider": None, "attempts": []}
+    last_error = None
+
+    if not _config["enabled"]:
+        text = await attempt(providers[0])
+        _finish(report, started, providers[0])
+        return text
+
+    for provider in providers:
+        budget = _attempt_budget(provider, started, deadline)
+        if budget <= 0:
+            break
+        attempt_start = time.monotonic()
+        try:
+            text = await asyncio.wait_for(attempt(provider), timeout=budget)
+            error = None if text else "empty response"
+        except asyncio.TimeoutError:
+            text, error = None, f"no response within {budget:.1f}s"
+        except Exception as e:
+            text, error = None, str(e)
+        report["attempts"].append({
+            "provider": provider,
+            "elapsed": round(time.monotonic() - attempt_start, 3),
+            "error": error,
+        })
+        if error is None:
+            _finish(report, started, provider)
+            return text
+        last_error = error
+        print(f"   ⚠️ {provider} failed ({error}); trying next provider...")
+
+    _finish(report, started, None)
+    if last_error is None or (time.monotonic() - started) >= deadline:
+        raise DeadlineExceeded(f"No provider answered within {deadline:.1f}s (last error: {last_error})")
+    raise Exception(f"All providers failed. Last error: {last_error}")
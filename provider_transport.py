@@ -0,0 +1,180 @@
+"""
+AI Resume Generator - Provider Transport
+Owns one long-lived, pooled HTTP session per provider host so repeated
+Gemini/Groq calls reuse keep-alive connections instead of paying a new
+TCP+TLS handshake on every request.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Provider endpoints
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com"
+GROQ_BASE_URL = "https://api.groq.com"
+
+# Transport defaults (overridable via environment or configure_transport)
+_config = {
+    # Point at a local stand-in (see mock_llm_server.py) for benchmarking
+    "gemini_base_url": os.getenv("GEMINI_BASE_URL", GEMINI_BASE_URL).rstrip("/"),
+    "groq_base_url": os.getenv("GROQ_BASE_URL", GROQ_BASE_URL).rstrip("/"),
+    "pool_size": int(os.getenv("LLM_POOL_SIZE", "10")),
+    "keep_alive": os.getenv("LLM_KEEP_ALIVE", "1") != "0",
+    "connect_timeout": float(os.getenv("LLM_CONNECT_TIMEOUT", "10")),
+    "read_timeout": float(os.getenv("LLM_READ_TIMEOUT", "60")),
+}
+
+_sessions: dict = {}
+_sessions_lock = threading.Lock()
+
+# Monotonic time by which the current request must be answered (see deadline_scope)
+_deadline = contextvars.ContextVar("transport_deadline", default=None)
+
+
+def configure_transport(
+    pool_size: int = None,
+    keep_alive: bool = None,
+    connect_timeout: float = None,
+    read_timeout: float = None,
+    gemini_base_url: str = None,
+    groq_base_url: str = None
+) -> dict:
+    """
+    Update transport settings. Existing pools are closed so the next
+    request picks up the new configuration.
+    Returns the effective configuration.
+    """
+    updates = {
+        "pool_size": pool_size,
+        "keep_alive": keep_alive,
+        "connect_timeout": connect_timeout,
+        "read_timeout": read_timeout,
+        "gemini_base_url": gemini_base_url.rstrip("/") if gemini_base_url else None,
+        "groq_base_url": groq_base_url.rstrip("/") if groq_base_url else None,
+    }
+    with _sessions_lock:
+        for key, value in updates.items():
+            if value is not None:
+                _config[key] = value
+    close_all()
+    return dict(_config)
+
+
+def get_transport_config() -> dict:
+    """Return a copy of the current transport settings."""
+    return dict(_config)
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _build_session(host: str) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,  # One host per session
+        pool_maxsize=_config["pool_size"],
+        max_retries=0  # Retries are decided by the callers
+    )
+    session.mount(host, adapter)
+    session.headers.update({"Content-Type": "application/json"})
+    if not _config["keep_alive"]:
+        session.headers["Connection"] = "close"
+    return session
+
+
+def get_session(url: str) -> requests.Session:
+    """
+    Return the shared session for the host of `url`, creating it on first use.
+    Sessions are safe to share across threads; the adapter pool hands out
+    one connection per in-flight request.
+    """
+    host = _host_key(url)
+    session = _sessions.get(host)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = _build_session(host)
+            _sessions[host] = session
+        return session
+
+
+@contextmanager
+def deadline_scope(seconds: float):
+    """
+    Bound every request made in this context (thread / asyncio task) to finish
+    within `seconds`. Nested scopes keep the earlier deadline.
+    """
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time():
+    """Seconds left before the current deadline_scope expires (None outside one)."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def resolve_timeout(timeout=None):
+    """
+    Normalize a timeout into a (connect, read) tuple.
+    A bare number is treated as the read timeout. Inside a deadline_scope
+    both parts are capped at the time remaining.
+    """
+    if timeout is None:
+        timeout = (_config["connect_timeout"], _config["read_timeout"])
+    elif isinstance(timeout, (int, float)):
+        timeout = (_config["connect_timeout"], float(timeout))
+    remaining = remaining_time()
+    if remaining is None:
+        return timeout
+    return tuple(min(part, remaining) if part is not None else remaining for part in timeout)
+
+
+def post(url: str, json: dict = None, headers: dict = None, timeout=None, stream: bool = False) -> requests.Response:
+    """POST through the pooled session for the target host."""
+    remaining = remaining_time()
+    if remaining is not None and remaining <= 0:
+        raise requests.exceptions.Timeout("request deadline passed before sending")
+    session = get_session(url)
+    return session.post(
+        url,
+        json=json,
+        headers=headers,
+        timeout=resolve_timeout(timeout),
+        stream=stream
+    )
+
+
+def gemini_url(model: str, api_key: str, method: str = "generateContent") -> str:
+    """Build a Gemini REST endpoint URL."""
+    return f"{_config['gemini_base_url']}/v1beta/models/{model}:{method}?key={api_key}"
+
+
+def groq_url() -> str:
+    """Build the Groq chat-completions endpoint URL."""
+    return f"{_config['groq_base_url']}/openai/v1/chat/completions"
+
+
+def close_all():
+    """Close every pooled session (e.g. on shutdown or reconfiguration)."""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
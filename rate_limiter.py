@@ -0,0 +1,356 @@
+"""
+AI Resume Generator - Rate-Limit Scheduler
+Per-model token buckets (requests/min and tokens/min) in front of the
+provider calls. Requests queue for capacity instead of being dropped,
+Retry-After / x-ratelimit-* headers are honored, and retries use jittered
+exponential backoff.
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+import provider_transport
+
+# Free-tier quotas per model: (requests/min, tokens/min). None = unlimited.
+DEFAULT_MODEL_LIMITS = {
+    ("gemini", "gemini-2.5-flash"): (10, 250000),
+    ("gemini", "gemini-2.5-pro"): (5, 250000),
+    ("groq", "llama-3.3-70b-versatile"): (30, 12000),
+    ("groq", "llama-3.1-8b-instant"): (30, 6000),
+    ("groq", "qwen/qwen3-32b"): (60, 6000),
+}
+
+RETRYABLE_STATUS = {429, 500, 503}
+
+
+class RateLimitWaitTooLong(Exception):
+    """The model is blocked for longer than the caller is willing to queue."""
+
+# Scheduler settings (see configure_rate_limits)
+_config = {
+    "enabled": os.getenv("LLM_RATE_LIMIT", "1") != "0",
+    "max_retries": 3,
+    "max_wait": 20.0,        # Longest single Retry-After we will sit out before giving up on a model
+    "backoff_base": 1.0,
+    "backoff_cap": 30.0,
+    "output_token_reserve": 1024,  # Tokens reserved for the response when admitting a request
+}
+
+
+class TokenBucket:
+    """
+    Reservation-based token bucket. Callers reserve capacity up front and are
+    told how long to wait, so concurrent callers queue in arrival order.
+    """
+
+    def __init__(self, capacity: float, per_minute: float):
+        self.capacity = capacity
+        self.rate = per_minute / 60.0
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take `amount` tokens (possibly going into debt); return seconds to wait."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        self.tokens -= amount
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def release(self, amount: float):
+        """Give back a reservation that was not used."""
+        self.tokens = min(self.capacity, self.tokens + min(amount, self.capacity))
+
+
+class ModelLimiter:
+    """Request and token buckets for one (provider, model)."""
+
+    def __init__(self, rpm: Optional[int], tpm: Optional[int]):
+        self.requests = TokenBucket(rpm, rpm) if rpm else None
+        self.tokens = TokenBucket(tpm, tpm) if tpm else None
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self, est_tokens: int, max_wait: float = None) -> float:
+        """
+        Reserve one request and return the wait. A wait longer than `max_wait`
+        is returned without keeping the reservation, so the queue is not held up.
+        """
+        with self.lock:
+            now = time.monotonic()
+            wait = max(0.0, self.blocked_until - now)
+            taken = [(bucket, amount) for bucket, amount in ((self.requests, 1), (self.tokens, est_tokens)) if bucket]
+            for bucket, amount in taken:
+                wait = max(wait, bucket.reserve(amount, now))
+            if max_wait is not None and wait > max_wait:
+                for bucket, amount in taken:
+                    bucket.release(amount)
+            return wait
+
+    def blocked_for(self) -> float:
+        """Seconds until a provider-imposed block lifts."""
+        with self.lock:
+            return max(0.0, self.blocked_until - time.monotonic())
+
+    def block_for(self, seconds: float):
+        with self.lock:
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """Parse '7.66s', '2m59.56s', '120ms' or plain seconds into seconds."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    total = 0.0
+    matched = False
+    for amount, unit in re.findall(r'([\d.]+)(ms|h|m|s)', value):
+        matched = True
+        total += float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return total if matched else None
+
+
+def retry_after_seconds(status_code: int, headers, body: str = "") -> Optional[float]:
+    """
+    Work out how long the provider asked us to wait.
+    Checks Retry-After, Groq's x-ratelimit-reset-* headers and Gemini's RetryInfo.
+    """
+    headers = headers or {}
+    delay = parse_duration(headers.get("retry-after"))
+    if delay is not None:
+        return delay
+
+    if status_code == 429:
+        resets = [parse_duration(headers.get(h)) for h in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")]
+        resets = [r for r in resets if r is not None]
+        if resets:
+            return max(resets)
+
+        # Gemini: {"error": {"details": [{"@type": "...RetryInfo", "retryDelay": "30s"}]}}
+        try:
+            details = json.loads(body).get("error", {}).get("details", [])
+            for detail in details:
+                if "retryDelay" in detail:
+                    return parse_duration(detail["retryDelay"])
+        except (ValueError, AttributeError):
+            pass
+    return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for retry `attempt` (0-based)."""
+    ceiling = min(_config["backoff_cap"], _config["backoff_base"] * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+def estimate_tokens(prompt: str) -> int:
+    """Rough token count for admission control (~4 chars per token plus response reserve)."""
+    return len(prompt) // 4 + _config["output_token_reserve"]
+
+
+def _deadline_capped(max_wait: float = None) -> float:
+    """`max_wait` (default from settings) capped at the time left in the transport deadline."""
+    if max_wait is None:
+        max_wait = _config["max_wait"]
+    remaining = provider_transport.remaining_time()
+    if remaining is not None:
+        # Never sit out a wait the request deadline cannot cover
+        max_wait = min(max_wait, max(remaining, 0.0))
+    return max_wait
+
+
+class RateLimitScheduler:
+    """Admission control and retry policy shared by every provider call."""
+
+    def __init__(self, limits: Dict[tuple, tuple] = None):
+        self._limits = dict(DEFAULT_MODEL_LIMITS)
+        if limits:
+            self._limits.update(limits)
+        self._limiters: Dict[tuple, ModelLimiter] = {}
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "queued": 0, "wait_seconds": 0.0, "retries": 0, "rate_limited": 0}
+
+    def limiter(self, provider: str, model: str) -> ModelLimiter:
+        key = (provider, model)
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                rpm, tpm = self._limits.get(key, (None, None))
+                limiter = ModelLimiter(rpm, tpm)
+                self._limiters[key] = limiter
+            return limiter
+
+    def reserve(self, provider: str, model: str, est_tokens: int = 0, max_wait: float = None) -> float:
+        """
+        Reserve capacity for one request and return how long to wait before sending.
+        Raises RateLimitWaitTooLong if the model is blocked, or its queue is
+        backed up, for more than `max_wait`.
+        """
+        limiter = self.limiter(provider, model)
+        if max_wait is not None:
+            blocked = limiter.blocked_for()
+            if blocked > max_wait:
+                raise RateLimitWaitTooLong(f"{provider}/{model} is rate limited for another {blocked:.0f}s")
+        wait = limiter.reserve(est_tokens, max_wait)
+        if max_wait is not None and wait > max_wait:
+            raise RateLimitWaitTooLong(f"{provider}/{model} has no capacity for another {wait:.0f}s")
+        with self._lock:
+            self._stats["requests"] += 1
+            if wait > 0:
+                self._stats["queued"] += 1
+                self._stats["wait_seconds"] += wait
+        if wait > 0:
+            print(f"   ⏳ Rate limit: queuing {provider}/{model} for {wait:.1f}s...")
+        return wait
+
+    def acquire(self, provider: str, model: str, est_tokens: int = 0, max_wait: float = None):
+        """Block until the model has capacity for one more request."""
+        wait = self.reserve(provider, model, est_tokens, max_wait)
+        if wait > 0:
+            time.sleep(wait)
+
+    def observe(self, provider: str, model: str, response):
+        """Update model state from response headers (remaining quota, resets)."""
+        headers = response.headers or {}
+        limiter = self.limiter(provider, model)
+        for remaining_header, reset_header in (
+            ("x-ratelimit-remaining-requests", "x-ratelimit-reset-requests"),
+            ("x-ratelimit-remaining-tokens", "x-ratelimit-reset-tokens"),
+        ):
+            remaining = headers.get(remaining_header)
+            if remaining is not None and str(remaining).strip() == "0":
+                reset = parse_duration(headers.get(reset_header))
+                if reset:
+                    limiter.block_for(reset)
+
+    def retry_delay(self, provider: str, model: str, response, attempt: int, max_wait: float, cancelled=None) -> Optional[float]:
+        """
+        Decide whether to retry a response.
+        Returns None to stop, else the seconds to sleep before the next attempt
+        (0 when a provider block already makes the next reservation wait).
+        """
+        self.observe(provider, model, response)
+        if response.status_code not in RETRYABLE_STATUS:
+            return None
+
+        header_delay = retry_after_seconds(response.status_code, response.headers, response.text)
+        blocked = False
+        if response.status_code == 429:
+            with self._lock:
+                self._stats["rate_limited"] += 1
+            if header_delay is not None:
+                # Everyone queued on this model has to sit it out too
+                self.limiter(provider, model).block_for(header_delay)
+                blocked = True
+        delay = header_delay if header_delay is not None else backoff_delay(attempt)
+
+        if attempt >= _config["max_retries"] or delay > max_wait or (cancelled is not None and cancelled.is_set()):
+            return None
+
+        with self._lock:
+            self._stats["retries"] += 1
+        print(f"   🔁 {provider}/{model} returned {response.status_code}: retry {attempt + 1} in {delay:.1f}s...")
+        return 0.0 if blocked else delay
+
+    def send(
+        self,
+        provider: str,
+        model: str,
+        request: Callable[[], object],
+        est_tokens: int = 0,
+        max_wait: float = None,
+        cancelled=None
+    ):
+        """
+        Run `request()` (returning a requests.Response) under the model's limits.
+        Retryable statuses are retried with Retry-After or jittered backoff.
+        A Retry-After longer than `max_wait` returns the failing response, and a model
+        already blocked for longer raises RateLimitWaitTooLong, so the caller can fall back.
+        """
+        max_wait = _deadline_capped(max_wait)
+
+        attempt = 0
+        while True:
+            self.acquire(provider, model, est_tokens, max_wait)
+            response = request()
+            delay = self.retry_delay(provider, model, response, attempt, max_wait, cancelled)
+            if delay is None:
+                return response
+            attempt += 1
+            time.sleep(delay)
+
+    async def send_async(
+        self,
+        provider: str,
+        model: str,
+        request: Callable[[], Awaitable],
+        est_tokens: int = 0,
+        max_wait: float = None
+    ):
+        """Async counterpart of send(); `request()` returns an awaitable httpx.Response."""
+        max_wait = _deadline_capped(max_wait)
+
+        attempt = 0
+        while True:
+            wait = self.reserve(provider, model, est_tokens, max_wait)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            response = await request()
+            delay = self.retry_delay(provider, model, response, attempt, max_wait)
+            if delay is None:
+                return response
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+
+scheduler = RateLimitScheduler()
+
+
+def configure_rate_limits(limits: Dict[tuple, tuple] = None, **settings) -> dict:
+    """
+    Replace the model quota table and/or update scheduler settings
+    (enabled, max_retries, max_wait, backoff_base, backoff_cap, output_token_reserve).
+    """
+    global scheduler
+    for key, value in settings.items():
+        if key not in _config:
+            raise ValueError(f"Unknown rate limit setting: {key}")
+        if value is not None:
+            _config[key] = value
+    if limits is not None:
+        scheduler = RateLimitScheduler(limits)
+    return dict(_config)
+
+
+def send(provider: str, model: str, request: Callable[[], object], prompt: str = "", max_wait: float = None, cancelled=None):
+    """Send a provider request through the shared scheduler (or directly when disabled)."""
+    if not _config["enabled"]:
+        return request()
+    return scheduler.send(provider, model, request, estimate_tokens(prompt), max_wait=max_wait, cancelled=cancelled)
+
+
+async def send_async(provider: str, model: str, request: Callable[[], Awaitable], prompt: str = "", max_wait: float = None):
+    """Async counterpart of send()."""
+    if not _config["enabled"]:
+        return await request()
+    return await scheduler.send_async(provider, model, request, estimate_tokens(prompt), max_wait=max_wait)
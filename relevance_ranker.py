@@ -0,0 +1,204 @@
+"""
+AI Resume Generator - Relevance Pre-Ranking
+Ranks every profile item and bullet against the parsed JD before the tailor
+prompt is built (weighted keyword overlap plus TF-IDF similarity) and keeps
+only the top candidates per section within a configurable budget. The model
+gets a one-line summary of what was left out instead of the full text, so
+long-career profiles no longer produce huge prompts. Each request reports
+its input-token savings.
+"""
+
+import copy
+import os
+import threading
+from dataclasses import replace
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+import ats_scorer
+import profile_model
+import prompt_compiler
+
+# Items kept per section (the rest are summarized as omitted)
+DEFAULT_SECTION_BUDGETS = {
+    "experience": 6,
+    "projects": 4,
+    "leadership": 3,
+    "research": 3,
+    "volunteering": 2,
+    "certifications": 5,
+    "awards": 4,
+}
+
+# Fields naming an item in the omitted summary
+_LABEL_FIELDS = {
+    "experience": ("role", "company"),
+    "projects": ("name", None),
+    "leadership": ("role", "organization"),
+    "research": ("title", "conference"),
+    "volunteering": ("role", "organization"),
+    "certifications": ("name", "issuer"),
+    "awards": ("name", "organization"),
+}
+
+# Weight of each JD analysis list in keyword overlap
+KEYWORD_WEIGHTS = {"mandatory_keywords": 2.0, "preferred_keywords": 1.0, "tech_stack_nuances": 1.0, "industry_terms": 0.5}
+# Relevance = overlap share * OVERLAP_WEIGHT + TF-IDF cosine * (1 - OVERLAP_WEIGHT)
+OVERLAP_WEIGHT = 0.6
+
+# Pre-ranking settings (see configure_prerank)
+_config = {
+    "enabled": os.getenv("TAILOR_PRERANK", "1") != "0",
+    "budgets": dict(DEFAULT_SECTION_BUDGETS),
+    "max_bullets": int(os.getenv("TAILOR_MAX_BULLETS", "6")),
+}
+
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "pruned_requests": 0, "tokens_before": 0, "tokens_after": 0, "saved_tokens": 0}
+
+
+def configure_prerank(enabled: bool = None, budgets: dict = None, max_bullets: int = None) -> dict:
+    """Update pre-ranking settings. Returns the effective configuration."""
+    if enabled is not None:
+        _config["enabled"] = enabled
+    if budgets:
+        _config["budgets"].update(budgets)
+    if max_bullets is not None:
+        _config["max_bullets"] = max_bullets
+    return copy.deepcopy(_config)
+
+
+def _jd_keywords(jd_analysis: dict) -> Tuple[List[str], np.ndarray]:
+    weights: Dict[str, float] = {}
+    for key, weight in KEYWORD_WEIGHTS.items():
+        for keyword in jd_analysis.get(key) or []:
+            if isinstance(keyword, str) and keyword.strip():
+                weights[keyword] = max(weights.get(keyword, 0.0), weight)
+    return list(weights), np.array(list(weights.values()), dtype=np.float64)
+
+
+def score_texts(texts: List[str], jd_analysis: dict) -> np.ndarray:
+    """Relevance (0-1) of each text to the JD analysis."""
+    if not texts:
+        return np.zeros(0)
+    keywords, weights = _jd_keywords(jd_analysis or {})
+    if keywords:
+        presence = np.array([ats_scorer.keyword_presence(t, keywords) for t in texts], dtype=np.float64)
+        overlap = presence @ weights / weights.sum()
+    else:
+        overlap = np.zeros(len(texts))
+
+    query = " ".join(keywords + [str(jd_analysis.get(k) or "") for k in ("job_title", "domain_context")])
+    vectors = ats_scorer._tfidf([ats_scorer.tokenize(t) for t in texts] + [ats_scorer.tokenize(query)])
+    cosine = vectors[:-1] @ vectors[-1]
+    return OVERLAP_WEIGHT * overlap + (1 - OVERLAP_WEIGHT) * cosine
+
+
+def _item_text(item: dict) -> str:
+    parts = [str(v) for k, v in item.items() if isinstance(v, str) and k not in ("dates", "link", "location")]
+    return " ".join(parts + [str(b) for b in item.get("bullets") or []])
+
+
+def item_label(section: str, item: dict) -> str:
+    """Short human-readable name of an item ("ML Engineer at Globex (2020-2024)")."""
+    title_key, org_key = _LABEL_FIELDS.get(section, ("name", None))
+    title = item.get(title_key) or item.get("name") or ""
+    org = item.get(org_key, "") if org_key else ""
+    label = f"{title} at {org}" if title and org else (title or org or "Untitled")
+    return f"{label} ({item['dates']})" if item.get("dates") else label
+
+
+def _pinned(item: dict) -> bool:
+    """Items the user asked bullets for are always sent."""
+    target = item.get("target_bullets")
+    return isinstance(target, int) and target > 0
+
+
+def _keep_top(scores: np.ndarray, keep: int, pinned: List[bool]) -> List[int]:
+    """Indices of pinned items plus the best-scoring rest up to `keep`, in original order."""
+    chosen = {i for i, pin in enumerate(pinned) if pin}
+    for i in np.argsort(-scores, kind="stable"):
+        if len(chosen) >= keep:
+            break
+        chosen.add(int(i))
+    return sorted(chosen)
+
+
+def prerank_profile(profile, jd_analysis: dict) -> Tuple[profile_model.Profile, dict]:
+    """
+    Keep the most JD-relevant items and bullets of a profile (dict or Profile).
+
+    Returns (pruned_profile, report). The pruned Profile keeps every item's id
+    and shares everything it did not trim with the input. The report lists the
+    omitted items per section, the number of omitted bullets and the estimated
+    input tokens before/after.
+    """
+    profile = profile_model.load_profile(profile)
+    report = {"omitted": {}, "omitted_bullets": 0, "tokens_before": 0, "tokens_after": 0, "saved_tokens": 0}
+    if not _config["enabled"] or not profile or not jd_analysis:
+        return profile, report
+
+    changes = {}
+    max_bullets = _config["max_bullets"]
+    for section, budget in _config["budgets"].items():
+        items = [item for item in profile.items_of(section) if isinstance(item, profile_model.Item)]
+        if not items:
+            continue
+
+        if len(items) > budget:
+            scores = score_texts([_item_text(item) for item in items], jd_analysis)
+            kept = _keep_top(scores, budget, [_pinned(item) for item in items])
+            report["omitted"][section] = [item_label(section, item) for i, item in enumerate(items) if i not in kept]
+            items = [items[i] for i in kept]
+
+        trimmed = []
+        for item in items:
+            bullets = item.bullets
+            limit = max(max_bullets, item.target_bullets or 0)
+            if bullets is not None and len(bullets) > limit:
+                scores = score_texts([str(b) for b in bullets], jd_analysis)
+                keep = _keep_top(scores, limit, [False] * len(bullets))
+                report["omitted_bullets"] += len(bullets) - len(keep)
+                item = replace(item, bullets=tuple(bullets[i] for i in keep))
+            trimmed.append(item)
+        changes[section] = tuple(trimmed)
+    pruned = profile.with_values(**changes)
+
+    if not report["omitted"] and not report["omitted_bullets"]:
+        _record(report, pruned=False)
+        return profile, report
+
+    report["tokens_before"] = prompt_compiler.estimate_tokens(prompt_compiler.compact_json(profile))
+    report["tokens_after"] = prompt_compiler.estimate_tokens(prompt_compiler.compact_json(pruned))
+    report["saved_tokens"] = report["tokens_before"] - report["tokens_after"]
+    _record(report, pruned=True)
+
+    kept_note = ", ".join(f"{section} -{len(labels)}" for section, labels in report["omitted"].items())
+    bullet_note = f", bullets -{report['omitted_bullets']}" if report["omitted_bullets"] else ""
+    print(f"   ✂️ Pre-rank: {kept_note or 'items kept'}{bullet_note} (saved ~{report['saved_tokens']} input tokens)")
+    return pruned, report
+
+
+def omitted_summary(report: dict) -> str:
+    """Prompt lines describing what pre-ranking left out ("" when nothing was)."""
+    lines = [f"- {section.title()}: {'; '.join(labels)}" for section, labels in report.get("omitted", {}).items()]
+    if report.get("omitted_bullets"):
+        lines.append(f"- {report['omitted_bullets']} lower-relevance bullets of the items shown")
+    return "\n".join(lines)
+
+
+def _record(report: dict, pruned: bool):
+    with _stats_lock:
+        _stats["requests"] += 1
+        if pruned:
+            _stats["pruned_requests"] += 1
+            for key in ("tokens_before", "tokens_after", "saved_tokens"):
+                _stats[key] += report[key]
+        _stats["last"] = report
+
+
+def prerank_stats() -> dict:
+    """Pre-ranking counters and the last per-request report."""
+    with _stats_lock:
+        return copy.deepcopy(_stats)
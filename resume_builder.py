@@ -4,6 +4,7 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib import colors
 import re
+import profile_model
 
 # --- CONFIGURATION ---
 PAGE_WIDTH, PAGE_HEIGHT = letter
@@ -61,14 +62,14 @@ def calculate_exact_resume_height(data: dict, styles: dict = None) -> float:
     if 'education' in data and data['education']:
         total_height += 2 + 14 + 2 + 2 + 3  # Section header + HR + Spacer
         for edu in data['education']:
-            # create_aligned_row for school/dates (BoldEntry)
-            h_school = get_real_paragraph_height(edu['school'], styles['BoldEntry'], CONTENT_WIDTH * 0.75)
+            # create_aligned_row for institution/dates (BoldEntry)
+            h_school = get_real_paragraph_height(edu.get('institution', edu.get('school', '')), styles['BoldEntry'], CONTENT_WIDTH * 0.75)
             h_dates = get_real_paragraph_height(edu.get('dates', ''), styles['BoldEntry'], CONTENT_WIDTH * 0.25)
             total_height += max(h_school, h_dates)
             
             # create_aligned_row for degree/location (ItalicEntry)
-            h_degree = get_real_paragraph_height(edu['degree'], styles['ItalicEntry'], CONTENT_WIDTH * 0.75)
-            h_loc = get_real_paragraph_height(edu['location'], styles['ItalicEntry'], CONTENT_WIDTH * 0.25)
+            h_degree = get_real_paragraph_height(edu.get('degree', ''), styles['ItalicEntry'], CONTENT_WIDTH * 0.75)
+            h_loc = get_real_paragraph_height(edu.get('location', ''), styles['ItalicEntry'], CONTENT_WIDTH * 0.25)
             total_height += max(h_degree, h_loc)
             
             # GPA bullet (BulletPoint: spaceBefore=1.5, leading=12)
@@ -92,13 +93,13 @@ def calculate_exact_resume_height(data: dict, styles: dict = None) -> float:
         total_height += 2 + 14 + 2 + 2 + 1  # Section header + HR + Spacer(1, 1)
         for exp in data['experience']:
             # BoldEntry (company)
-            h_comp = get_real_paragraph_height(exp['company'], styles['BoldEntry'], CONTENT_WIDTH * 0.75)
+            h_comp = get_real_paragraph_height(exp.get('company', ''), styles['BoldEntry'], CONTENT_WIDTH * 0.75)
             h_dates = get_real_paragraph_height(exp.get('dates', ''), styles['BoldEntry'], CONTENT_WIDTH * 0.25)
             total_height += max(h_comp, h_dates)
             
             # ItalicEntry (role)
-            h_role = get_real_paragraph_height(exp['role'], styles['ItalicEntry'], CONTENT_WIDTH * 0.75)
-            h_loc = get_real_paragraph_height(exp['location'], styles['ItalicEntry'], CONTENT_WIDTH * 0.25)
+            h_role = get_real_paragraph_height(exp.get('role', exp.get('title', '')), styles['ItalicEntry'], CONTENT_WIDTH * 0.75)
+            h_loc = get_real_paragraph_height(exp.get('location', ''), styles['ItalicEntry'], CONTENT_WIDTH * 0.25)
             total_height += max(h_role, h_loc)
             
             for bullet in exp.get('bullets', []):
@@ -363,8 +364,7 @@ def generate_resume(data, filename_or_buffer):
         elif section == "education":
             story.append(Spacer(1, 3))
             for edu in data['education']:
-                school = edu.get('school', edu.get('institution', ''))
-                story.append(create_aligned_row(school, edu.get('dates', ''), styles['BoldEntry']))
+                story.append(create_aligned_row(edu.get('institution', ''), edu.get('dates', ''), styles['BoldEntry']))
                 story.append(create_aligned_row(edu.get('degree', ''), edu.get('location', ''), styles['ItalicEntry']))
                 if edu.get('gpa'):
                      story.append(Paragraph(f"• {edu['gpa']}", styles['BulletPoint']))
@@ -420,8 +420,7 @@ def generate_resume(data, filename_or_buffer):
             story.append(Spacer(1, 1))
             for lead in data['leadership']:
                 story.append(create_aligned_row(lead.get('organization', ''), lead.get('dates', ''), styles['BoldEntry']))
-                lead_role = lead.get('role', lead.get('title', ''))
-                story.append(create_aligned_row(lead_role, lead.get('location', ''), styles['ItalicEntry']))
+                story.append(create_aligned_row(lead.get('role', ''), lead.get('location', ''), styles['ItalicEntry']))
                 for bullet in lead.get('bullets', []):
                     story.append(Paragraph(f"• {bullet}", styles['BulletPoint']))
                 story.append(Spacer(1, 2))
@@ -470,15 +469,17 @@ def generate_resume(data, filename_or_buffer):
 def create_resume_pdf(data, output_path_or_buffer):
     """
     Adapter to convert main.py's data structure to the new generate_resume format.
+    The profile model resolves field aliases (institution, role) once at load;
+    only the contact line is replaced, everything else is shared, not copied.
     
     NOTE: Automatic trimming has been disabled. Resume is generated with data as provided.
     Users control bullet counts manually through the editor.
     """
-    new_data = data.copy()
+    profile = profile_model.load_profile(data)
     
-    # 1. Adapt Contact (Dict -> String)
-    if isinstance(data.get('contact'), dict):
-        c = data['contact']
+    # Adapt Contact (Dict -> String)
+    if isinstance(profile.get('contact'), dict):
+        c = profile['contact']
         
         # Create clickable links
         linkedin = c.get('linkedin_url')
@@ -494,35 +495,8 @@ def create_resume_pdf(data, output_path_or_buffer):
             linkedin_str,
             portfolio_str
         ]
-        new_data['contact'] = " | ".join([comp for comp in components if comp])
-        
-    # 2. Adapt Education (institution -> school)
-    if 'education' in data:
-        new_edu = []
-        for item in data['education']:
-            new_item = item.copy()
-            if 'institution' in item:
-                new_item['school'] = item['institution']
-            new_edu.append(new_item)
-        new_data['education'] = new_edu
-        
-    # 3. Adapt Experience (ensure role field exists)
-    if 'experience' in data:
-        new_exp = []
-        for item in data['experience']:
-            new_item = item.copy()
-            # Ensure 'role' field exists with robust fallback
-            if 'role' not in new_item:
-                for key in ['title', 'position', 'job_title', 'designation']:
-                    if key in item:
-                        new_item['role'] = item[key]
-                        break
-            
-            if 'role' not in new_item:
-                new_item['role'] = ''  # Fallback to empty string if absolutely nothing found
-            new_exp.append(new_item)
-        new_data['experience'] = new_exp
+        profile = profile.with_values(contact=" | ".join([comp for comp in components if comp]))
 
     # Generate PDF with data as-is (no automatic trimming)
-    generate_resume(new_data, output_path_or_buffer)
+    generate_resume(profile, output_path_or_buffer)
     return output_path_or_buffer
@@ -0,0 +1,395 @@
+"""
+AI Resume Generator - Structured Output Schemas
+Pydantic models for every JSON-producing task (JD analysis, ATS analysis,
+extracted profile, tailored resume). The models are sent to the providers
+as structured-output constraints (Gemini responseSchema / JSON mode, Groq
+json_schema / json_object) and used to validate responses on the way back,
+coercing the usual near-misses (comma strings for lists, "85%" scores,
+nulls) instead of discarding the response. Fields a usable response cannot
+lack (ATS score, tailored name/contact, JD keyword lists) are required, so
+an empty or wrong-shaped reply fails validation instead of passing as defaults.
+"""
+
+import copy
+import math
+import os
+import re
+import threading
+from typing import Annotated, Any, Dict, List, Optional
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, ValidationError
+
+
+def _to_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return ", ".join(_to_text(v) for v in value if v is not None)
+    if isinstance(value, dict):
+        return ", ".join(f"{k}: {_to_text(v)}" for k, v in value.items())
+    return str(value).strip()
+
+
+def _to_str_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [part.strip() for part in re.split(r'[,\n;]', value) if part.strip()]
+    if isinstance(value, (list, tuple)):
+        return [_to_text(v) for v in value if v is not None and _to_text(v)]
+    return [_to_text(value)]
+
+
+def _to_score(value: Any) -> int:
+    if isinstance(value, str):
+        match = re.search(r'\d+(?:\.\d+)?', value)
+        if not match:
+            raise ValueError(f"score is not numeric: {value!r}")
+        value = match.group()
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"score is not numeric: {value!r}")
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f"score is not finite: {value!r}")
+    return max(0, min(100, int(round(value))))
+
+
+def _to_skills(value: Any) -> Dict[str, str]:
+    if value is None:
+        return {}
+    if isinstance(value, (list, tuple, str)):
+        skills = _to_text(value)
+        return {"Skills": skills} if skills else {}
+    return value
+
+
+Text = Annotated[str, BeforeValidator(_to_text)]
+StrList = Annotated[List[str], BeforeValidator(_to_str_list)]
+Score = Annotated[int, BeforeValidator(_to_score)]
+Skills = Annotated[Dict[str, Text], BeforeValidator(_to_skills)]
+
+
+class LenientModel(BaseModel):
+    """Unknown keys are kept (e.g. section_titles) so validation never drops content."""
+    model_config = ConfigDict(extra="allow")
+
+
+class JDAnalysis(LenientModel):
+    company_name: Text = Field("", description="Precise name of the hiring company.")
+    job_identifier: Text = Field("", description="Job ID if present, else the role name in Snake_Case.")
+    location: Text = Field("", description="Primary location as City, State.")
+    job_title: Text = Field("", description="Exact job title from the posting.")
+    mandatory_keywords: StrList = Field(description="Required technical skills.")
+    preferred_keywords: StrList = Field(description="Nice-to-have skills.")
+    soft_skills: StrList = Field(default_factory=list)
+    action_verbs: StrList = Field(default_factory=list, description="Verbs used in the JD.")
+    industry_terms: StrList = Field(default_factory=list, description="Domain-specific terminology.")
+    years_experience: Text = Field("", description="Number or range if mentioned.")
+    domain_context: Text = Field("", description="Industry or sector.")
+    tech_stack_nuances: StrList = Field(default_factory=list, description="Specific versions, sub-tools and libraries.")
+    key_metrics_emphasis: StrList = Field(default_factory=list)
+
+
+class ATSAnalysis(LenientModel):
+    score: Score = Field(description="ATS match score from 0 to 100.")
+    missing_keywords: StrList = Field(default_factory=list)
+    matching_areas: StrList = Field(default_factory=list)
+    recommendations: StrList = Field(default_factory=list)
+    summary_feedback: Text = Field("", description="Brief summary of the fit.")
+
+
+class Contact(LenientModel):
+    location: Text = ""
+    phone: Text = ""
+    email: Text = ""
+    linkedin_url: Text = ""
+    portfolio_url: Text = ""
+
+
+class Education(LenientModel):
+    institution: Text = ""
+    degree: Text = ""
+    gpa: Text = ""
+    dates: Text = ""
+    location: Text = ""
+
+
+class Experience(LenientModel):
+    company: Text = ""
+    role: Text = ""
+    dates: Text = ""
+    location: Text = ""
+    bullets: StrList = Field(default_factory=list)
+
+
+class Project(LenientModel):
+    name: Text = ""
+    dates: Text = ""
+    bullets: StrList = Field(default_factory=list)
+
+
+class Leadership(LenientModel):
+    organization: Text = ""
+    role: Text = ""
+    dates: Text = ""
+    location: Text = ""
+    bullets: StrList = Field(default_factory=list)
+
+
+class Research(LenientModel):
+    title: Text = ""
+    conference: Text = ""
+    dates: Text = ""
+    link: Text = ""
+    bullets: StrList = Field(default_factory=list)
+
+
+class Certification(LenientModel):
+    name: Text = ""
+    issuer: Text = ""
+    dates: Text = ""
+
+
+class Award(LenientModel):
+    name: Text = ""
+    organization: Text = ""
+    dates: Text = ""
+
+
+class ResumeProfile(LenientModel):
+    """Extracted profile and tailored resume share one shape."""
+    name: Text = ""
+    contact: Contact = Field(default_factory=Contact)
+    summary: Text = ""
+    education: List[Education] = Field(default_factory=list)
+    skills: Skills = Field(default_factory=dict)
+    experience: List[Experience] = Field(default_factory=list)
+    projects: List[Project] = Field(default_factory=list)
+    leadership: List[Leadership] = Field(default_factory=list)
+    research: List[Research] = Field(default_factory=list)
+    certifications: List[Certification] = Field(default_factory=list)
+    awards: List[Award] = Field(default_factory=list)
+    volunteering: List[Leadership] = Field(default_factory=list)
+    languages: Text = ""
+
+
+class TailoredResume(ResumeProfile):
+    """A full tailored resume must at least name the candidate and keep the contact block."""
+    name: Text
+    contact: Contact
+
+
+class JDHeader(LenientModel):
+    """Header fields only (hybrid JD parsing; keywords come from the local extractor)."""
+    company_name: Text = Field("", description="Precise name of the hiring company.")
+    job_identifier: Text = Field("", description="Job ID if present, else the role name in Snake_Case.")
+    location: Text = Field("", description="Primary location as City, State.")
+    job_title: Text = Field("", description="Exact job title from the posting.")
+
+
+class TailorPlan(LenientModel):
+    """Sharded tailoring placement: item ids ("experience.0") per target section; unlisted items are dropped."""
+    experience: StrList = Field(default_factory=list)
+    projects: StrList = Field(default_factory=list)
+    leadership: StrList = Field(default_factory=list)
+    research: StrList = Field(default_factory=list)
+
+
+class TailorPatch(LenientModel):
+    """Patch tailoring edit script (ops are validated by patch_tailor.apply_patch)."""
+    ops: List[Dict[str, Any]] = Field(default_factory=list)
+
+
+class ItemBullets(LenientModel):
+    id: Text = ""
+    bullets: StrList = Field(default_factory=list)
+
+
+class TailorBullets(LenientModel):
+    """Tailoring session expansion: new bullets per profile item id ("experience.0")."""
+    items: List[ItemBullets] = Field(default_factory=list)
+
+
+TASK_SCHEMAS = {
+    "jd_parse": JDAnalysis,
+    "jd_header": JDHeader,
+    "ats_analysis": ATSAnalysis,
+    "extract_profile": ResumeProfile,
+    "tailor": TailoredResume,
+    "tailor_plan": TailorPlan,
+    "tailor_section": ResumeProfile,
+    "tailor_patch": TailorPatch,
+    "tailor_bullets": TailorBullets,
+}
+
+# Tasks whose validated output keeps only the keys the model produced
+# (resume dicts must not grow empty sections; a blank JD location must not
+# overwrite the candidate's)
+_SPARSE_TASKS = {"jd_parse", "jd_header", "extract_profile", "tailor", "tailor_section"}
+
+# Groq models that accept response_format json_schema; the rest get json_object
+GROQ_JSON_SCHEMA_MODELS = {
+    "openai/gpt-oss-20b",
+    "openai/gpt-oss-120b",
+    "moonshotai/kimi-k2-instruct",
+    "meta-llama/llama-4-maverick-17b-128e-instruct",
+    "meta-llama/llama-4-scout-17b-16e-instruct",
+}
+
+# Structured output settings (see configure_structured_output)
+_config = {
+    "enabled": os.getenv("LLM_STRUCTURED_OUTPUT", "1") != "0",
+}
+
+_GEMINI_KEYS = {"type", "format", "description", "nullable", "enum", "properties", "required", "items"}
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, dict] = {}
+_gemini_schema_cache: Dict[str, Optional[dict]] = {}
+
+
+def configure_structured_output(enabled: bool = None) -> dict:
+    """Update structured output settings. Returns the effective configuration."""
+    if enabled is not None:
+        _config["enabled"] = enabled
+    return dict(_config)
+
+
+def schema_for_task(task: Optional[str]):
+    """Pydantic model for a task, or None for free-text tasks (e.g. qa)."""
+    return TASK_SCHEMAS.get(task) if task else None
+
+
+def _to_gemini(node: dict, defs: dict) -> Optional[dict]:
+    """Convert a JSON-schema node to Gemini's OpenAPI subset; None if not representable."""
+    if "$ref" in node:
+        return _to_gemini(defs[node["$ref"].split("/")[-1]], defs)
+    if "anyOf" in node:
+        options = [o for o in node["anyOf"] if o.get("type") != "null"]
+        if len(options) != 1:
+            return None
+        converted = _to_gemini(options[0], defs)
+        if converted is not None:
+            converted["nullable"] = True
+        return converted
+
+    kind = node.get("type")
+    if kind == "object":
+        properties = node.get("properties")
+        if not properties:
+            return None  # Free-form maps (e.g. skills) have no Gemini equivalent
+        converted_props = {}
+        for name, prop in properties.items():
+            converted = _to_gemini(prop, defs)
+            if converted is None:
+                return None
+            converted_props[name] = converted
+        return {
+            "type": "OBJECT",
+            "properties": converted_props,
+            "required": list(converted_props),
+            "propertyOrdering": list(converted_props),
+        }
+    if kind == "array":
+        items = _to_gemini(node.get("items", {"type": "string"}), defs)
+        return {"type": "ARRAY", "items": items} if items is not None else None
+    if kind in ("string", "integer", "number", "boolean"):
+        result = {k: v for k, v in node.items() if k in _GEMINI_KEYS}
+        result["type"] = kind.upper()
+        return result
+    return None
+
+
+def gemini_schema(task: Optional[str]) -> Optional[dict]:
+    """Gemini responseSchema for a task, or None when the schema is not representable."""
+    model = schema_for_task(task)
+    if model is None:
+        return None
+    if task not in _gemini_schema_cache:
+        schema = model.model_json_schema()
+        _gemini_schema_cache[task] = _to_gemini(schema, schema.get("$defs", {}))
+    return copy.deepcopy(_gemini_schema_cache[task])
+
+
+def gemini_generation_config(task: Optional[str]) -> Optional[dict]:
+    """
+    generationConfig for a JSON task: JSON mode plus responseSchema where the
+    schema fits Gemini's subset (resume shapes with free-form skill maps get
+    JSON mode only).
+    """
+    if not _config["enabled"] or schema_for_task(task) is None:
+        return None
+    config = {"responseMimeType": "application/json"}
+    schema = gemini_schema(task)
+    if schema is not None:
+        config["responseSchema"] = schema
+    return config
+
+
+def groq_response_format(task: Optional[str], model_id: str) -> Optional[dict]:
+    """Groq response_format for a JSON task: json_schema where the model supports it, else json_object."""
+    model = schema_for_task(task)
+    if not _config["enabled"] or model is None:
+        return None
+    if model_id in GROQ_JSON_SCHEMA_MODELS:
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": model.__name__, "schema": model.model_json_schema()},
+        }
+    return {"type": "json_object"}
+
+
+def _record(task: str, ok: bool, error: str = None):
+    with _stats_lock:
+        entry = _stats.setdefault(task, {"validated": 0, "failed": 0})
+        entry["validated" if ok else "failed"] += 1
+        if error:
+            entry["last_error"] = error
+
+
+def validate(task: Optional[str], data: Any) -> Any:
+    """
+    Validate and coerce a parsed response against its task schema.
+    Returns the coerced dict, or None when the response is not an object or
+    misses a required field (callers fall back); failures are counted.
+    Free-text tasks (no schema) get `data` back unchanged.
+    """
+    model = schema_for_task(task)
+    if model is None:
+        return data
+    if not isinstance(data, dict):
+        _record(task, False, "response is not a JSON object")
+        return None
+    try:
+        validated = model.model_validate(data)
+    except ValidationError as e:
+        summary = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()[:3])
+        print(f"   ⚠️ Schema validation failed ({task}): {summary}")
+        _record(task, False, summary)
+        return None
+    _record(task, True)
+    return validated.model_dump(exclude_unset=task in _SPARSE_TASKS)
+
+
+def conforms(task: Optional[str], data: Any) -> bool:
+    """Whether `data` passes the task schema (not counted in validation_stats)."""
+    model = schema_for_task(task)
+    if model is None:
+        return True
+    if not isinstance(data, dict):
+        return False
+    try:
+        model.model_validate(data)
+    except ValidationError:
+        return False
+    return True
+
+
+def validation_stats() -> dict:
+    """Per-task validated/failed counts and failure rate."""
+    with _stats_lock:
+        stats = copy.deepcopy(_stats)
+    for entry in stats.values():
+        total = entry["validated"] + entry["failed"]
+        entry["failure_rate"] = round(entry["failed"] / total, 4) if total else 0.0
+    return stats
@@ -0,0 +1,310 @@
+"""
+AI Resume Generator - Sharded Tailoring
+Section-parallel alternative to main.tailor_resume. One short planning call
+decides which profile items go in which section; summary, skills and each
+item section are then rewritten by concurrent, smaller calls against the
+same JD analysis. Wall-clock time approaches the slowest section instead of
+the whole resume's output length, and a malformed or failed section is
+retried on its own instead of discarding everything.
+"""
+
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import json_extract
+import main
+import profile_model
+import prompt_compiler
+import relevance_ranker
+import schemas
+
+# Sections the planner may place items in (in output order)
+ITEM_SECTIONS = ["experience", "projects", "leadership", "research"]
+
+# Extra attempts for a shard whose call fails or returns an unusable section
+SHARD_RETRIES = 1
+
+# Field renames when the plan moves an item between sections
+MOVE_FIELDS = {
+    ("experience", "leadership"): {"company": "organization"},
+    ("leadership", "experience"): {"organization": "company"},
+    ("experience", "volunteering"): {"company": "organization"},
+    ("volunteering", "experience"): {"organization": "company"},
+    ("research", "projects"): {"title": "name"},
+    ("projects", "research"): {"name": "title"},
+}
+
+
+def item_ids(profile: profile_model.Profile) -> Dict[str, profile_model.Item]:
+    """Every item the planner can place, by its profile id ("experience.0")."""
+    return {
+        item.id: item
+        for section in ITEM_SECTIONS
+        for item in profile.items_of(section)
+        if isinstance(item, profile_model.Item)
+    }
+
+
+def default_plan(profile: profile_model.Profile) -> Dict[str, List[str]]:
+    """Keep every item where it is (used when planning fails)."""
+    plan = {section: [] for section in ITEM_SECTIONS}
+    for item_id, item in item_ids(profile).items():
+        plan[item.section].append(item_id)
+    return plan
+
+
+def build_plan_prompt(profile: profile_model.Profile, jd_analysis: dict) -> str:
+    """Prompt for the placement plan: item titles only, no bullet rewriting."""
+    lines = []
+    for item_id, item in item_ids(profile).items():
+        title = relevance_ranker.item_label(item.section, item)
+        first_bullet = str((item.bullets or ("",))[0])[:100]
+        lines.append(f"{item_id}: {title}" + (f" - {first_bullet}" if first_bullet else ""))
+    items = "\n".join(lines)
+
+    def render(jd_analysis):
+        return f"""
+You are planning a tailored resume. Decide where each candidate item belongs.
+
+JOB ANALYSIS:
+{jd_analysis}
+
+CANDIDATE ITEMS (id: title - first bullet):
+{items}
+
+RULES:
+- Put the items most relevant to the job in "experience" (jobs) or "projects".
+- Move less relevant jobs to "leadership"; research may stay in "research" or move to "projects".
+- Leave out items that are completely unrelated to the job.
+- Order ids within each section by relevance. Use each id at most once.
+
+Return ONLY valid JSON: {{"experience": ["experience.0"], "projects": [], "leadership": [], "research": []}}
+"""
+    return prompt_compiler.compile_prompt("tailor_plan", render, jd_analysis=jd_analysis)
+
+
+def parse_plan(response_text: str, profile: profile_model.Profile) -> Optional[Dict[str, List[str]]]:
+    """Validated plan (unknown and repeated ids dropped), or None if unusable."""
+    data = schemas.validate("tailor_plan", json_extract.extract_json(response_text))
+    if not isinstance(data, dict):
+        return None
+    known = item_ids(profile)
+    seen = set()
+    plan = {section: [] for section in ITEM_SECTIONS}
+    for section in ITEM_SECTIONS:
+        for item_id in data.get(section) or []:
+            if item_id in known and item_id not in seen:
+                plan[section].append(item_id)
+                seen.add(item_id)
+    # A plan that keeps nothing is a failed plan, not a decision
+    return plan if seen or not known else None
+
+
+def apply_plan(plan: Dict[str, List[str]], profile: profile_model.Profile) -> Dict[str, List[dict]]:
+    """Items per target section as plain dicts, with fields renamed when an item changes section."""
+    known = item_ids(profile)
+    placed = {}
+    for section in ITEM_SECTIONS:
+        items = []
+        for item_id in plan.get(section, []):
+            source = known[item_id].section
+            item = known[item_id].to_dict()
+            for old, new in MOVE_FIELDS.get((source, section), {}).items():
+                if old in item:
+                    item[new] = item.pop(old)
+            items.append(item)
+        placed[section] = items
+    return placed
+
+
+def build_shard_prompts(
+    profile: profile_model.Profile,
+    placed: Dict[str, List[dict]],
+    jd_analysis: dict,
+    strategy_note: str
+) -> Dict[str, str]:
+    """One rewrite prompt per non-empty section: summary, skills and each item section."""
+    shards = {}
+
+    def render_for(section: str, instructions: str):
+        def render(profile, jd_analysis):
+            return f"""
+You are a Strategic Resume Architect rewriting ONE section of a resume.
+JOB ANALYSIS:
+{jd_analysis}
+
+{strategy_note}
+
+SECTION CONTENT (JSON):
+{profile}
+
+TASK:
+{instructions}
+
+RULES:
+- Use <b>tags</b> for bolding key achievements.
+- Return ONLY valid JSON of the form {{"{section}": ...}} with no other keys.
+"""
+        return render
+
+    headline = [relevance_ranker.item_label("experience", item) for item in placed.get("experience", [])[:3]]
+    summary_content = {"name": profile.get("name"), "summary": profile.get("summary"), "top_experience": headline}
+    shards["summary"] = prompt_compiler.compile_prompt(
+        "tailor_section",
+        render_for("summary", "Write a strong 2-3 sentence summary optimized for the JD, grounded in the content above. Return it as a string."),
+        profile=summary_content, jd_analysis=jd_analysis
+    )
+
+    if profile.get("skills"):
+        shards["skills"] = prompt_compiler.compile_prompt(
+            "tailor_section",
+            render_for("skills", "Reorganize the skills by JD relevance per the strategy. Return an object of category -> comma-separated skills."),
+            profile={"skills": profile["skills"]}, jd_analysis=jd_analysis
+        )
+
+    for section in ITEM_SECTIONS:
+        if not placed.get(section):
+            continue
+        shards[section] = prompt_compiler.compile_prompt(
+            "tailor_section",
+            render_for(section, (
+                "Rewrite the bullets of every item for impact, metrics and JD keywords. "
+                "Keep every item and all of its other fields; you may reorder items by relevance. "
+                "Respect 'target_bullets' if specified for an item. "
+                'Use "role" for job titles.'
+            )),
+            profile={section: placed[section]}, jd_analysis=jd_analysis
+        )
+    return shards
+
+
+def parse_shard(section: str, response_text: str):
+    """The section value from a shard response; raises if it is missing or malformed."""
+    data = schemas.validate("tailor_section", json_extract.extract_json(response_text))
+    if not isinstance(data, dict) or section not in data:
+        raise Exception(f"shard response has no '{section}' key")
+    value = data[section]
+    if section == "summary" and not (isinstance(value, str) and value.strip()):
+        raise Exception("empty summary")
+    if section == "skills" and not (isinstance(value, dict) and value):
+        raise Exception("skills is not a non-empty object")
+    if section in ITEM_SECTIONS and not isinstance(value, list):
+        raise Exception(f"'{section}' is not a list")
+    return value
+
+
+def run_shard(section: str, prompt: str, call: Callable[[str, bool], str]) -> Tuple[object, float]:
+    """
+    Call and parse one shard, retrying it alone (with the cache bypassed) if it
+    fails. Returns (value, seconds). Raises after the last attempt.
+    """
+    start = time.monotonic()
+    for attempt in range(1 + SHARD_RETRIES):
+        try:
+            return parse_shard(section, call(prompt, attempt > 0)), time.monotonic() - start
+        except Exception as e:
+            if attempt == SHARD_RETRIES:
+                raise
+            print(f"   🔁 Shard '{section}' failed ({e}); retrying it alone...")
+
+
+def merge_shards(profile: profile_model.Profile, placed: Dict[str, List[dict]], results: Dict[str, object]) -> dict:
+    """Assemble the resume: shard outputs where they succeeded, planned originals where they failed."""
+    merged = {k: v for k, v in profile.to_dict().items() if k not in ITEM_SECTIONS}
+    for section in ITEM_SECTIONS:
+        items = results.get(section, placed.get(section, []))
+        merged[section] = [
+            {k: v for k, v in item.items() if k != "target_bullets"} if isinstance(item, dict) else item
+            for item in items
+        ]
+    for section in ("summary", "skills"):
+        if section in results:
+            merged[section] = results[section]
+    return merged
+
+
+def report_timings(plan_seconds: float, shard_seconds: Dict[str, float], wall: float):
+    slowest = max(shard_seconds.values(), default=0.0)
+    total = sum(shard_seconds.values())
+    print(f"   🧩 Sharded tailoring: plan {plan_seconds:.1f}s, {len(shard_seconds)} shards in {wall:.1f}s "
+          f"(slowest {slowest:.1f}s, sequential would be {total:.1f}s)")
+
+
+def tailor_resume_sharded(
+    base_resume: dict,
+    jd_analysis: dict,
+    provider: str = "gemini",
+    api_key: str = None,
+    tailoring_strategy: str = "balanced",
+    bullet_counts: dict = None,
+    max_workers: int = None
+) -> dict:
+    """
+    Sharded version of main.tailor_resume (same arguments and result).
+    Falls back to the base resume only if every shard fails.
+    """
+    base_resume = profile_model.load_profile(base_resume)
+    reuse_key, reused = main.lookup_tailored_resume(base_resume, jd_analysis, tailoring_strategy, bullet_counts)
+    if reused is not None:
+        return reused
+
+    profile, _ = relevance_ranker.prerank_profile(base_resume.with_targets(bullet_counts), jd_analysis)
+
+    start = time.monotonic()
+    plan = None
+    try:
+        response_text = main.query_provider(build_plan_prompt(profile, jd_analysis), provider, api_key=api_key, task="tailor_plan")
+        plan = parse_plan(response_text, profile)
+    except Exception as e:
+        print(f"   ⚠️ Tailoring plan failed ({e}); keeping items in place.")
+    plan_seconds = time.monotonic() - start
+    placed = apply_plan(plan or default_plan(profile), profile)
+
+    prompts = build_shard_prompts(profile, placed, jd_analysis, main.tailoring_strategy_note(tailoring_strategy))
+
+    def call(prompt: str, retry: bool) -> str:
+        return main.query_provider(prompt, provider, api_key=api_key, task="tailor_section", bypass_cache=retry)
+
+    results, seconds, errors = {}, {}, {}
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max_workers or len(prompts)) as pool:
+        # Shards run in the caller's context (provider limits, transport deadline)
+        futures = {
+            section: pool.submit(contextvars.copy_context().run, run_shard, section, prompt, call)
+            for section, prompt in prompts.items()
+        }
+        for section, future in futures.items():
+            try:
+                results[section], seconds[section] = future.result()
+            except Exception as e:
+                errors[section] = e
+    report_timings(plan_seconds, seconds, time.monotonic() - start)
+
+    return finish_sharded(base_resume, jd_analysis, provider, bullet_counts, profile, placed, results, errors, reuse_key)
+
+
+def finish_sharded(
+    base_resume: profile_model.Profile,
+    jd_analysis: dict,
+    provider: str,
+    bullet_counts: Optional[dict],
+    profile: profile_model.Profile,
+    placed: Dict[str, List[dict]],
+    results: Dict[str, object],
+    errors: Dict[str, Exception],
+    reuse_key: Optional[str]
+) -> dict:
+    """Merge shard results into the final resume (shared by the sync and async paths)."""
+    if not results:
+        error = next(iter(errors.values()), Exception("no shards to run"))
+        return main.finalize_tailored_resume("", base_resume, jd_analysis, provider, bullet_counts, error=error)
+
+    for section, error in errors.items():
+        print(f"   ⚠️ Shard '{section}' failed after retry ({error}); keeping its original content.")
+
+    tailored = main.postprocess_tailored_resume(merge_shards(profile, placed, results), base_resume)
+    if not errors:
+        main.remember_tailored_resume(reuse_key, tailored)
+    return tailored
@@ -0,0 +1,163 @@
+"""
+AI Resume Generator - Single-Flight Request Deduplication
+Collapses identical in-flight LLM requests: the first caller for a request
+fingerprint performs the upstream call, and every concurrent caller with the
+same fingerprint waits for it and shares its result (or its error).
+Works for both the thread-based and the asyncio call paths.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import weakref
+from typing import Awaitable, Callable, Optional
+
+# Single-flight settings (see configure_single_flight)
+_config = {
+    "enabled": os.getenv("LLM_SINGLE_FLIGHT", "1") != "0",
+}
+
+
+def request_fingerprint(cache_key: str, api_key: Optional[str] = None) -> str:
+    """
+    Fingerprint for an upstream request.
+    Callers with different API keys never share a call (quota and errors are per key).
+    """
+    key_hash = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:12]
+    return f"{cache_key}:{key_hash}"
+
+
+class _Call:
+    """
+    One in-flight request and the number of callers merged into it.
+    On the async path `result` holds the shared task and `done` is unused.
+    """
+
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Registry of in-flight requests keyed on their fingerprint. Thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        # asyncio futures belong to one event loop, so async flights are tracked per loop
+        self._async_calls = weakref.WeakKeyDictionary()
+        self._stats = {"calls": 0, "executed": 0, "merged": 0, "shared_errors": 0}
+
+    def do(self, key: str, fn: Callable[[], str]) -> str:
+        """Run fn() for `key`, or wait for the identical call already in flight."""
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self._stats["executed"] += 1
+                leader = True
+            else:
+                call.waiters += 1
+                self._stats["merged"] += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+                if call.error is not None:
+                    self._stats["shared_errors"] += call.waiters
+            call.done.set()
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[str]]) -> str:
+        """
+        Async counterpart of do().
+        The upstream call runs as its own task, so one waiter being cancelled
+        does not cancel the request for everyone else.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._stats["calls"] += 1
+            calls = self._async_calls.setdefault(loop, {})
+            call = calls.get(key)
+            if call is None:
+                call = _Call()
+                call.result = loop.create_task(fn())
+                calls[key] = call
+                self._stats["executed"] += 1
+                call.result.add_done_callback(lambda task, calls=calls, call=call: self._finish_async(calls, key, call))
+            else:
+                call.waiters += 1
+                self._stats["merged"] += 1
+        return await asyncio.shield(call.result)
+
+    def _finish_async(self, calls: dict, key: str, call: _Call):
+        task = call.result
+        with self._lock:
+            if calls.get(key) is call:
+                del calls[key]
+            if not task.cancelled() and task.exception() is not None:
+                self._stats["shared_errors"] += call.waiters
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls) + sum(len(calls) for calls in self._async_calls.values())
+
+    def stats(self) -> dict:
+        """Counters: calls seen, upstream calls executed, calls merged into another, errors shared."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["in_flight"] = self.in_flight()
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            for key in self._stats:
+                self._stats[key] = 0
+
+
+_flights = SingleFlight()
+
+
+def configure_single_flight(enabled: bool = None) -> dict:
+    """Update single-flight settings. Returns the effective configuration."""
+    if enabled is not None:
+        _config["enabled"] = enabled
+    return dict(_config)
+
+
+def do(key: str, fn: Callable[[], str]) -> str:
+    """Thread-path entry point (runs fn() directly when disabled)."""
+    if not _config["enabled"]:
+        return fn()
+    return _flights.do(key, fn)
+
+
+async def do_async(key: str, fn: Callable[[], Awaitable[str]]) -> str:
+    """Async-path entry point (awaits fn() directly when disabled)."""
+    if not _config["enabled"]:
+        return await fn()
+    return await _flights.do_async(key, fn)
+
+
+def single_flight_stats() -> dict:
+    """Merge counters for the shared registry."""
+    return _flights.stats()
@@ -0,0 +1,322 @@
+"""
+AI Resume Generator - Local Skill Extractor
+Extracts keywords from a job description without an LLM round trip:
+a multi-pattern Aho-Corasick automaton over a bundled, extensible
+skill/technology taxonomy (skill_taxonomy.json) finds every alias in one
+pass, aliases are normalized to canonical names ("k8s" -> Kubernetes), and
+section headings ("Requirements", "Nice to have", ...) decide mandatory vs
+preferred. Returns the same dict shape as main.parse_job_description.
+"""
+
+import json
+import os
+import re
+import threading
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_taxonomy.json")
+
+# Headings that switch the current section
+REQUIRED_HEADINGS = (
+    "requirements", "required", "must have", "must-have", "minimum qualifications",
+    "basic qualifications", "qualifications", "what you bring", "what you'll need",
+    "what you need", "you have", "who you are", "skills", "experience",
+)
+PREFERRED_HEADINGS = (
+    "preferred", "nice to have", "nice-to-have", "bonus", "preferred qualifications",
+    "desired", "pluses", "good to have", "extra credit",
+)
+# Headings of sections that describe the offer, not the candidate: no keywords or domain come from them
+OFFER_HEADINGS = re.compile(
+    r'\b(benefits|perks|compensation|salary|pay range|what we offer|we offer|equal opportunity|eeo)\b'
+)
+# Inline cues that mark a single clause as preferred wherever it appears
+_CUE_WORDS = r'preferred|a plus|nice to have|nice-to-have|bonus|desirable|ideally'
+PREFERRED_CUES = re.compile(rf'\b({_CUE_WORDS})\b', re.I)
+# Clause boundaries within a line: ";", sentence ends (not after e.g./i.e./etc.) and "," right before a cue
+CLAUSE_BOUNDARY = re.compile(
+    rf';|(?<=[.!?])(?<!e\.g\.)(?<!i\.e\.)(?<!etc\.)\s+(?=[A-Z(])|,(?=\s*(?i:{_CUE_WORDS})\b)'
+)
+
+YEARS_PATTERN = re.compile(r'(\d+\s*(?:\+|-\s*\d+|to\s*\d+)?)\s*\+?\s*(?:years|yrs)', re.I)
+VERSION_PATTERN = re.compile(r'\s*v?(\d+(?:\.\d+)*\+?)')
+
+# Labelled header fields ("Company: Acme", "Location - Austin, TX", "Job ID: R12345")
+HEADER_PATTERNS = {
+    "company_name": re.compile(r'^\s*(?:company|employer|organization)\s*[:\-–]\s*(.+)$', re.I | re.M),
+    "job_title": re.compile(r'^\s*(?:job title|title|position|role)\s*[:\-–]\s*(.+)$', re.I | re.M),
+    "location": re.compile(r'^\s*(?:location|based in|office)\s*[:\-–]\s*(.+)$', re.I | re.M),
+    "job_id": re.compile(r'\b(?:job|req(?:uisition)?)\s*(?:id|#|number|no\.?)\s*[:#]?\s*([A-Z0-9][\w-]{2,20})', re.I),
+}
+ABOUT_COMPANY = re.compile(r'^\s*about\s+(?!us\b|the role\b|the team\b|you\b|this\b)([A-Z][\w&.\- ]{1,40}?)\s*:?\s*$', re.M)
+
+# Word-boundary characters: a match must not be glued to these on either side
+_LEFT_GLUE = set("abcdefghijklmnopqrstuvwxyz0123456789-./")
+_RIGHT_GLUE = set("abcdefghijklmnopqrstuvwxyz0123456789-+#")
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: finds every occurrence of every pattern in one linear scan."""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, object]]] = [[]]
+        self._built = False
+
+    def add(self, pattern: str, value):
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(pattern), value))
+        self._built = False
+
+    def build(self):
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0) if self._goto[fallback].get(ch, 0) != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+        self._built = True
+
+    def iter_matches(self, text: str):
+        """Yield (start, end, value) for every pattern occurrence."""
+        if not self._built:
+            self.build()
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for length, value in self._out[node]:
+                yield i - length + 1, i + 1, value
+
+
+class SkillExtractor:
+    """Taxonomy-backed keyword extractor. Instances are immutable after construction and thread-safe."""
+
+    def __init__(self, taxonomy: dict):
+        self.taxonomy = taxonomy
+        self.nuance_categories = set(taxonomy.get("nuance_categories", []))
+        self._automaton = AhoCorasick()
+
+        for category, terms in taxonomy.get("skills", {}).items():
+            self._add_terms(terms, ("skill", category))
+        self._add_terms(taxonomy.get("soft_skills", {}), ("soft_skill", None))
+        self._add_terms(taxonomy.get("industry_terms", {}), ("industry_term", None))
+        self._add_terms(taxonomy.get("domains", {}), ("domain", None))
+        self._add_terms(taxonomy.get("metrics", {}), ("metric", None))
+        self._add_terms({verb: [verb] for verb in taxonomy.get("action_verbs", [])}, ("action_verb", None))
+        self._automaton.build()
+
+    def _add_terms(self, terms: Dict[str, List[str]], kind: tuple):
+        for canonical, aliases in terms.items():
+            for alias in set(aliases) | {canonical.lower()}:
+                case_sensitive = alias.startswith("=")
+                pattern = alias[1:] if case_sensitive else alias
+                if not case_sensitive and canonical in {a[1:] for a in aliases if a.startswith("=")} and pattern == canonical.lower():
+                    continue  # Canonical name is only matched case-sensitively (e.g. "Go", "R")
+                self._automaton.add(pattern.lower(), (canonical, kind, pattern if case_sensitive else None))
+
+    def find(self, text: str) -> List[Tuple[int, int, str, tuple]]:
+        """Non-overlapping matches (longest wins) as (start, end, canonical, kind)."""
+        lowered = text.lower()
+        candidates = []
+        for start, end, (canonical, kind, exact) in self._automaton.iter_matches(lowered):
+            if start > 0 and lowered[start - 1] in _LEFT_GLUE and lowered[start].isalnum():
+                continue
+            if end < len(lowered) and lowered[end] in _RIGHT_GLUE and lowered[end - 1].isalnum():
+                continue
+            if exact is not None and text[start:end] != exact:
+                continue
+            candidates.append((start, end, canonical, kind))
+
+        candidates.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        matches = []
+        last_end = -1
+        for match in candidates:
+            if match[0] >= last_end:
+                matches.append(match)
+                last_end = match[1]
+        return matches
+
+    @staticmethod
+    def _section_of(line: str, current: str) -> Tuple[str, str]:
+        """
+        Return (section, remainder) for a line given the current section.
+        Heading lines switch the section; "Nice to have: Kafka, Spark" switches
+        it and keeps the text after the colon as the remainder. Offer headings
+        ("Benefits", "Perks: ...") switch to "offer".
+        """
+        raw = line.strip()
+        marked = raw.startswith("#") or (raw.startswith("**") and raw.rstrip(":").endswith("**"))
+        head, colon, rest = raw.partition(":")
+        heading = head.strip().strip("*#-•").strip().lower()
+        if not heading or len(heading) > 60 or not (colon or marked or heading in REQUIRED_HEADINGS + PREFERRED_HEADINGS):
+            return current, line
+
+        if any(heading.startswith(h) or heading.endswith(h) for h in PREFERRED_HEADINGS):
+            return "preferred", rest
+        if any(heading.startswith(h) for h in REQUIRED_HEADINGS):
+            return "required", rest
+        if OFFER_HEADINGS.search(heading):
+            return "offer", rest
+        if len(heading.split()) <= 5 and not rest.strip():
+            return "other", ""  # Responsibilities, About us, Benefits, ...
+        return current, line
+
+    def extract(self, jd_text: str) -> dict:
+        """Keyword analysis in the parse_job_description dict shape."""
+        mandatory, preferred = [], []
+        seen_mandatory, seen_preferred = set(), set()
+        soft, verbs, industry, nuances = [], [], [], []
+        domains, metrics = Counter(), []
+        section = "other"
+
+        clauses = []
+        for line in jd_text.splitlines():
+            section, line = self._section_of(line, section)
+            # Cues apply per clause: "Python required; Kafka a plus" has one of each
+            clauses.extend((section, clause) for clause in CLAUSE_BOUNDARY.split(line) if clause.strip())
+
+        for section, line in clauses:
+            if section == "offer":
+                continue
+            line_preferred = section == "preferred" or bool(PREFERRED_CUES.search(line))
+
+            for start, end, canonical, (kind, category) in self.find(line):
+                if kind == "skill":
+                    if line_preferred:
+                        if canonical not in seen_mandatory and canonical not in seen_preferred:
+                            preferred.append(canonical)
+                            seen_preferred.add(canonical)
+                    elif canonical not in seen_mandatory:
+                        mandatory.append(canonical)
+                        seen_mandatory.add(canonical)
+                        if canonical in seen_preferred:
+                            preferred.remove(canonical)
+                            seen_preferred.discard(canonical)
+                    version = VERSION_PATTERN.match(line, end)
+                    if category in self.nuance_categories:
+                        _append_unique(nuances, canonical)
+                    elif version and category == "Languages":
+                        _append_unique(nuances, f"{canonical} {version.group(1)}")
+                elif kind == "soft_skill":
+                    _append_unique(soft, canonical)
+                elif kind == "action_verb":
+                    _append_unique(verbs, canonical)
+                elif kind == "industry_term":
+                    _append_unique(industry, canonical)
+                elif kind == "domain":
+                    domains[canonical] += 1
+                elif kind == "metric":
+                    _append_unique(metrics, canonical)
+
+        years = YEARS_PATTERN.search(jd_text)
+        return {
+            **extract_header(jd_text),
+            "mandatory_keywords": mandatory,
+            "preferred_keywords": preferred,
+            "soft_skills": soft,
+            "action_verbs": verbs,
+            "industry_terms": industry,
+            "years_experience": re.sub(r'\s+', '', years.group(1)) + " years" if years else "",
+            "domain_context": domains.most_common(1)[0][0] if domains else "",
+            "tech_stack_nuances": nuances,
+            "key_metrics_emphasis": metrics,
+        }
+
+
+def extract_header(jd_text: str) -> dict:
+    """Best-effort company/title/location/identifier from labelled lines; defaults otherwise."""
+    def labelled(field):
+        match = HEADER_PATTERNS[field].search(jd_text)
+        return match.group(1).strip()[:80] if match else ""
+
+    def clean_title(text):
+        return text.strip("#* ").rstrip(".,;:!- ").strip()
+
+    company = labelled("company_name")
+    if not company:
+        about = ABOUT_COMPANY.search(jd_text)
+        company = about.group(1).strip() if about else ""
+    title = clean_title(labelled("job_title"))
+    if not title:
+        first_line = next((l.strip() for l in jd_text.splitlines() if l.strip()), "")
+        # A first line ending in ":" is a heading ("About the role:"), not a title
+        if len(first_line) <= 60 and not first_line.endswith(":"):
+            title = clean_title(first_line)
+    job_id = HEADER_PATTERNS["job_id"].search(jd_text)
+
+    if job_id:
+        identifier = job_id.group(1)
+    elif title:
+        identifier = "_".join(re.findall(r'[A-Za-z0-9]+', title)[:5])
+    else:
+        identifier = "Resume_Job"
+
+    return {
+        "company_name": company or "Unknown_Company",
+        "job_identifier": identifier,
+        "location": labelled("location") or "Remote",
+        "job_title": title,
+    }
+
+
+def _append_unique(items: list, value: str):
+    if value not in items:
+        items.append(value)
+
+
+def load_taxonomy(path: str = TAXONOMY_PATH, extra_path: Optional[str] = None) -> dict:
+    """Load the bundled taxonomy, merging an optional user file (same layout) over it."""
+    with open(path, 'r', encoding='utf-8') as f:
+        taxonomy = json.load(f)
+    extra_path = extra_path or os.getenv("SKILL_TAXONOMY_PATH")
+    if extra_path and os.path.exists(extra_path):
+        with open(extra_path, 'r', encoding='utf-8') as f:
+            extra = json.load(f)
+        for key, value in extra.items():
+            if key == "skills":
+                for category, terms in value.items():
+                    taxonomy["skills"].setdefault(category, {}).update(terms)
+            elif isinstance(value, dict):
+                taxonomy.setdefault(key, {}).update(value)
+            elif isinstance(value, list):
+                taxonomy[key] = list(dict.fromkeys(taxonomy.get(key, []) + value))
+    return taxonomy
+
+
+_extractor: Optional[SkillExtractor] = None
+_extractor_lock = threading.Lock()
+
+
+def get_extractor() -> SkillExtractor:
+    """Shared extractor built from the bundled (plus SKILL_TAXONOMY_PATH) taxonomy on first use."""
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = SkillExtractor(load_taxonomy())
+    return _extractor
+
+
+def extract_keywords(jd_text: str) -> dict:
+    """Local JD analysis (same shape as main.parse_job_description)."""
+    return get_extractor().extract(jd_text or "")
@@ -0,0 +1,216 @@
+"""
+AI Resume Generator - Streaming Generation
+Streams model output (Gemini streamGenerateContent / Groq stream: true) and
+feeds it through SectionStreamParser so tailor_resume sections can be
+previewed (post-processed) as soon as they close.
+"""
+
+import copy
+import json
+import os
+import time
+from typing import Iterator, List
+
+import circuit_breaker
+import main
+import model_router
+import profile_model
+import provider_transport
+import rate_limiter
+from streaming_json import SectionStreamParser
+
+
+def _iter_sse_data(response) -> Iterator[str]:
+    """Yield the payload of each `data:` line of a server-sent-events response."""
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        yield data
+
+
+def _open_stream(provider: str, model: str, url: str, payload: dict, prompt: str, headers: dict = None):
+    """
+    Open a streaming request under the rate limiter and circuit breaker.
+    A 400 against a Gemini response schema is retried once in plain JSON mode,
+    as call_gemini_api does.
+    """
+    breaker = circuit_breaker.get_breaker(provider, model)
+    if not breaker.allow():
+        raise circuit_breaker.CircuitOpenError(f"Circuit open for {provider}/{model}")
+
+    def send():
+        return rate_limiter.send(
+            provider, model,
+            circuit_breaker.track(provider, model, lambda: provider_transport.post(
+                url, json=payload, headers=headers, timeout=None, stream=True
+            )),
+            prompt=prompt
+        )
+
+    try:
+        response = send()
+        if response.status_code == 400 and main.drop_response_schema(payload):
+            response.close()
+            print(f"   ⚠️ Gemini Schema Error ({model}): Retrying stream with JSON mode only...")
+            response = send()
+    except rate_limiter.RateLimitWaitTooLong:
+        breaker.release_probe()
+        raise
+    if response.status_code != 200:
+        body = response.text
+        response.close()
+        raise Exception(f"{provider} stream error {response.status_code}: {body}")
+    return response
+
+
+def stream_gemini(prompt: str, api_key: str, model: str = "gemini-2.5-flash", task: str = None) -> Iterator[str]:
+    """Yield text chunks from Gemini streamGenerateContent."""
+    if not api_key:
+        raise Exception("Gemini API Key missing.")
+    url = provider_transport.gemini_url(model, api_key, method="streamGenerateContent") + "&alt=sse"
+    response = _open_stream("gemini", model, url, main.build_gemini_payload(prompt, task), prompt)
+    try:
+        for data in _iter_sse_data(response):
+            chunk = json.loads(data)
+            for candidate in chunk.get("candidates", []):
+                for part in candidate.get("content", {}).get("parts", []):
+                    if part.get("text"):
+                        yield part["text"]
+    finally:
+        response.close()
+
+
+def stream_groq(
+    prompt: str,
+    api_key: str = None,
+    expect_json: bool = False,
+    models: List[str] = None,
+    task: str = None
+) -> Iterator[str]:
+    """
+    Yield text chunks from Groq chat completions with stream: true.
+    Walks the model chain until one accepts the request; once tokens are
+    flowing the stream is not switched to another model.
+    """
+    if not api_key:
+        api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise Exception("GROQ_API_KEY not found.")
+
+    headers = {"Authorization": f"Bearer {api_key}"}
+    response = None
+    for model_id in models or main.GROQ_MODELS_CHAIN:
+        payload = main.build_groq_payload(prompt, model_id, expect_json, task)
+        payload["stream"] = True
+        try:
+            print(f"   ⚡ Groq: Streaming with {model_id}...")
+            response = _open_stream("groq", model_id, provider_transport.groq_url(), payload, prompt, headers=headers)
+            break
+        except Exception as e:
+            print(f"   ⚠️ Groq Stream Error ({model_id}): {e}")
+    if response is None:
+        raise Exception("All Groq models failed to stream.")
+
+    try:
+        for data in _iter_sse_data(response):
+            chunk = json.loads(data)
+            for choice in chunk.get("choices", []):
+                content = choice.get("delta", {}).get("content")
+                if content:
+                    yield content
+    finally:
+        response.close()
+
+
+def stream_provider(
+    prompt: str,
+    provider: str = "gemini",
+    api_key: str = None,
+    expect_json: bool = False,
+    task: str = None
+) -> Iterator[str]:
+    """Streaming counterpart of main.query_provider (model chosen by model_router)."""
+    route = model_router.route(task, provider, prompt)
+    if provider == "groq":
+        return stream_groq(prompt, api_key=api_key, expect_json=expect_json, models=route["models"], task=task)
+    if not api_key and os.getenv("GEMINI_API_KEY"):
+        api_key = os.getenv("GEMINI_API_KEY")
+    return stream_gemini(prompt, api_key, model=route["model"], task=task)
+
+
+def _process_partial(section: str, value, base_resume: dict):
+    """
+    Preview of one section or item: markdown cleanup and immutable-field
+    restore on a copy (the parser's result stays raw for the final pass).
+    """
+    partial = main.clean_tailored_resume({section: copy.deepcopy(value)})
+    partial = main.restore_immutable_fields(base_resume, partial)
+    return partial[section]
+
+
+def tailor_resume_stream(
+    base_resume: dict,
+    jd_analysis: dict,
+    provider: str = "gemini",
+    api_key: str = None,
+    tailoring_strategy: str = "balanced",
+    bullet_counts: dict = None
+) -> Iterator[dict]:
+    """
+    Streaming version of main.tailor_resume.
+
+    Yields events as the model output arrives:
+        {"type": "item", "section", "index", "value", "elapsed"}  - one list element closed
+        {"type": "section", "section", "value", "elapsed"}        - one top-level section closed
+        {"type": "done", "resume", "metrics"}                       - final resume (same as tailor_resume)
+    Item and section values are cleaned and restored previews (each matched on
+    its own). The final resume is built from the raw output like tailor_resume:
+    schema validation, then one restore across the whole resume, so matching
+    stays one-to-one.
+    Metrics include time_to_first_chunk, time_to_first_section and total time.
+    """
+    base_resume = profile_model.load_profile(base_resume)
+    prompt = main.build_tailor_prompt(base_resume, jd_analysis, tailoring_strategy, bullet_counts)
+    parser = SectionStreamParser()
+    start = time.monotonic()
+    metrics = {"time_to_first_chunk": None, "time_to_first_section": None, "sections": {}}
+    processed_items = {}
+    error = None
+
+    try:
+        for chunk in stream_provider(prompt, provider, api_key=api_key, task="tailor"):
+            if metrics["time_to_first_chunk"] is None:
+                metrics["time_to_first_chunk"] = round(time.monotonic() - start, 3)
+            for event in parser.feed(chunk):
+                elapsed = round(time.monotonic() - start, 3)
+                section = event["section"]
+                if event["type"] == "item":
+                    event["value"] = _process_partial(section, [event["value"]], base_resume)[0]
+                    processed_items.setdefault(section, []).append(event["value"])
+                elif isinstance(event["value"], list) and len(processed_items.get(section, [])) == len(event["value"]):
+                    # Every element was already processed as it closed
+                    event["value"] = processed_items[section]
+                else:
+                    event["value"] = _process_partial(section, event["value"], base_resume)
+                event["elapsed"] = elapsed
+                if event["type"] == "section":
+                    if metrics["time_to_first_section"] is None:
+                        metrics["time_to_first_section"] = elapsed
+                    metrics["sections"][section] = elapsed
+                yield event
+    except Exception as e:
+        error = e
+
+    if error is not None and parser.done:
+        # The object closed before the stream failed: the resume is complete
+        print(f"   ⚠️ Stream ended with an error after the resume closed ({error}); keeping it.")
+        error = None
+
+    # Same validation, restore and fallback (with warning) as tailor_resume
+    resume = main.finalize_tailored_data(parser.result() or None, base_resume, jd_analysis, provider, bullet_counts, error=error)
+    metrics["total"] = round(time.monotonic() - start, 3)
+    print(f"   📶 Streamed tailoring: first section in {metrics['time_to_first_section']}s, total {metrics['total']}s")
+    yield {"type": "done", "resume": resume, "metrics": metrics}
@@ -0,0 +1,157 @@
+"""
+AI Resume Generator - Incremental JSON Section Parser
+Consumes a streamed JSON object chunk by chunk and reports each top-level
+section as soon as its value closes. Array sections (experience, projects, ...)
+additionally report every element as it closes, so early items can be
+post-processed while later ones are still generating.
+"""
+
+import json
+from typing import List
+
+import json_extract
+
+# Top-level sections whose list elements are emitted individually
+ITEM_SECTIONS = (
+    "education", "experience", "projects", "leadership", "research",
+    "certifications", "awards", "volunteering"
+)
+
+
+class SectionStreamParser:
+    """
+    Single-pass, resumable scanner over the first top-level JSON object in a stream.
+
+    feed() returns a list of events:
+        {"type": "section", "section": key, "value": parsed_value}
+        {"type": "item", "section": key, "index": i, "value": parsed_item}
+    Leading prose or code fences before the first '{' are ignored.
+    """
+
+    def __init__(self, item_sections=ITEM_SECTIONS):
+        self.item_sections = set(item_sections)
+        self.text = ""
+        self.sections = {}
+        self.done = False
+
+        self._pos = 0
+        self._start = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._state = "key"       # key -> colon -> value_start -> value
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+        self._items_mode = False
+        self._item_start = None
+        self._item_index = 0
+
+    def feed(self, chunk: str) -> List[dict]:
+        """Consume the next chunk of model output; return newly completed events."""
+        events = []
+        if self.done or not chunk:
+            return events
+        self.text += chunk
+        text = self.text
+        i = self._pos
+        n = len(text)
+
+        while i < n and not self.done:
+            ch = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._state == "key":
+                        self._key = json.loads(text[self._key_start:i + 1])
+                        self._state = "colon"
+                i += 1
+                continue
+
+            if self._start is None:
+                if ch == '{':
+                    self._start = i
+                    self._depth = 1
+                    self._state = "key"
+                i += 1
+                continue
+
+            if self._depth == 1 and self._state == "value_start" and not ch.isspace():
+                self._value_start = i
+                self._state = "value"
+                if ch == '[' and self._key in self.item_sections:
+                    self._items_mode = True
+                    self._item_start = None
+                    self._item_index = 0
+
+            if self._items_mode and self._depth == 2 and self._item_start is None and not ch.isspace() and ch not in ',]':
+                self._item_start = i
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._state == "key":
+                    self._key_start = i
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                if self._items_mode and self._depth == 2 and ch == ']':
+                    self._emit_item(events, i)
+                self._depth -= 1
+                if self._depth == 0:
+                    if self._state == "value":
+                        self._emit_section(events, i)
+                    self.done = True
+            elif ch == ',':
+                if self._depth == 1 and self._state == "value":
+                    self._emit_section(events, i)
+                    self._state = "key"
+                elif self._depth == 2 and self._items_mode:
+                    self._emit_item(events, i)
+            elif ch == ':' and self._depth == 1 and self._state == "colon":
+                self._state = "value_start"
+            i += 1
+
+        self._pos = i
+        return events
+
+    def _emit_item(self, events: list, end: int):
+        if self._item_start is None:
+            return
+        raw = self.text[self._item_start:end].strip()
+        self._item_start = None
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+        events.append({"type": "item", "section": self._key, "index": self._item_index, "value": value})
+        self._item_index += 1
+
+    def _emit_section(self, events: list, end: int):
+        raw = self.text[self._value_start:end].strip()
+        self._items_mode = False
+        self._value_start = None
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+        self.sections[self._key] = value
+        events.append({"type": "section", "section": self._key, "value": value})
+
+    def result(self) -> dict:
+        """
+        The complete object if it closed cleanly; otherwise the stream is
+        repaired (trailing commas, truncated tail) and merged over the
+        sections already parsed.
+        """
+        if self._start is None:
+            return dict(self.sections)
+        end = self._pos if self.done else len(self.text)
+        repaired = json_extract.extract_json(self.text[self._start:end])
+        if repaired is None:
+            return dict(self.sections)
+        return {**repaired, **self.sections} if not self.done else repaired
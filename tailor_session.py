@@ -0,0 +1,319 @@
+"""
+AI Resume Generator - Tailoring Sessions
+Incremental re-tailoring for the editor. A session keeps the last tailored
+resume, the inputs it was made from and, for every profile item, where the
+item ended up and every bullet the model has written for it. When only the
+bullet counts or the section order change, run() works out what changed:
+fewer bullets and reorders are applied locally, and only items that need
+more bullets than were ever written for them go to one small model call.
+A new profile, JD analysis or strategy re-tailors from scratch (every bullet
+is worded for the strategy). The state is plain JSON (to_dict / from_dict)
+so it can be kept between requests.
+"""
+
+import copy
+from typing import Callable, Dict, List, Optional
+
+import item_matcher
+import jd_dedup
+import json_extract
+import main
+import profile_model
+import prompt_compiler
+import relevance_ranker
+import schemas
+
+# Sections whose items take bullet counts
+COUNT_SECTIONS = profile_model.COUNT_SECTIONS
+# Sections a tailored item may have been placed in
+PLACED_SECTIONS = ["experience", "projects", "leadership", "research", "volunteering"]
+
+
+def counts_by_id(profile: profile_model.Profile, bullet_counts: Optional[dict]) -> Dict[str, int]:
+    """bullet_counts ({"experience": [3, 2]}) keyed by profile item id ({"experience.0": 3, ...})."""
+    counts = {}
+    for section in COUNT_SECTIONS:
+        for item, count in zip(profile.items_of(section), (bullet_counts or {}).get(section) or []):
+            if isinstance(item, profile_model.Item) and isinstance(count, int) and count >= 0:
+                counts[item.id] = count
+    return counts
+
+
+def locate_items(profile: profile_model.Profile, tailored: dict) -> Dict[str, dict]:
+    """
+    Provenance of a tailored resume: profile item id -> {"section", "index",
+    "bullets"} where the item was placed (section None when it was left out)
+    and the bullets written for it. Each profile item is claimed at most once.
+    """
+    items = {
+        item.id: {"section": None, "index": None, "bullets": []}
+        for section in COUNT_SECTIONS
+        for item in profile.items_of(section)
+        if isinstance(item, profile_model.Item)
+    }
+    placed = [
+        (section, index, generated)
+        for section in PLACED_SECTIONS
+        for index, generated in enumerate(tailored.get(section) or [])
+        if isinstance(generated, dict)
+    ]
+    matches = item_matcher.get_index(profile).assign([generated for _, _, generated in placed])
+    for (section, index, generated), match in zip(placed, matches):
+        if match and match.item.id in items:
+            bullets = generated.get("bullets")
+            items[match.item.id] = {
+                "section": section,
+                "index": index,
+                "bullets": list(bullets) if isinstance(bullets, list) else [],
+            }
+    return items
+
+
+def build_bullets_prompt(requests: List[dict], jd_analysis: dict, strategy_note: str) -> str:
+    """Prompt for extra bullets: each request is {"id", "label", "source", "existing", "count"}."""
+    blocks = []
+    for request in requests:
+        lines = [f"[{request['id']}] {request['label']} - write {request['count']} more bullet(s)"]
+        lines.extend(f"  source: {b}" for b in request["source"])
+        lines.extend(f"  already written: {b}" for b in request["existing"])
+        blocks.append("\n".join(lines))
+    items = "\n".join(blocks)
+
+    def render(jd_analysis):
+        return f"""
+You are a Strategic Resume Architect adding bullets to items of an already tailored resume.
+JOB ANALYSIS:
+{jd_analysis}
+
+{strategy_note}
+
+ITEMS (source = the candidate's original bullets; already written = bullets on the resume now):
+{items}
+
+RULES:
+- Write exactly the requested number of NEW bullets per item, grounded in its source bullets.
+- Do not repeat or paraphrase bullets that are already written; never invent facts or metrics.
+- Use <b>tags</b> for bolding key achievements.
+- Return ONLY valid JSON: {{"items": [{{"id": "experience.0", "bullets": ["..."]}}]}}
+"""
+    return prompt_compiler.compile_prompt("tailor_bullets", render, jd_analysis=jd_analysis)
+
+
+def parse_bullets(response_text: str) -> Dict[str, List[str]]:
+    """New bullets per item id from a tailor_bullets response (empty when unusable)."""
+    data = schemas.validate("tailor_bullets", json_extract.extract_json(response_text))
+    bullets = {}
+    if isinstance(data, dict):
+        for entry in data.get("items") or []:
+            if isinstance(entry, dict) and isinstance(entry.get("id"), str) and isinstance(entry.get("bullets"), list):
+                bullets[entry["id"]] = [
+                    main.convert_markdown_to_html(b.strip()) for b in entry["bullets"] if isinstance(b, str) and b.strip()
+                ]
+    return bullets
+
+
+class TailorSession:
+    """
+    Re-tailorable result of one profile/JD pair.
+
+    Args:
+        base_resume: The base resume data (loaded into a profile_model.Profile once per change)
+        jd_analysis: Analysis from parse_job_description
+        provider: One of 'gemini', 'groq'
+        api_key: API key for the provider (never serialized)
+        tailoring_strategy: 'profile_focus', 'balanced', or 'jd_focus'
+        tailor: Full tailoring function with main.tailor_resume's signature
+                (e.g. a batch.TAILOR_MODES entry); default main.tailor_resume
+    """
+
+    def __init__(
+        self,
+        base_resume: dict,
+        jd_analysis: dict,
+        provider: str = "gemini",
+        api_key: str = None,
+        tailoring_strategy: str = "balanced",
+        tailor: Callable[..., dict] = None
+    ):
+        self.base_resume = base_resume
+        self.profile = profile_model.load_profile(base_resume)
+        self.jd_analysis = jd_analysis
+        self.provider = provider
+        self.api_key = api_key
+        self.tailoring_strategy = tailoring_strategy
+        self.tailor = tailor or main.tailor_resume
+
+        self.bullet_counts: Optional[dict] = None
+        self.section_order: Optional[List[str]] = None
+        self.resume: Optional[dict] = None     # Last tailored resume (None until a successful full run)
+        self.items: Dict[str, dict] = {}       # Provenance per profile item (see locate_items)
+        self.targets: Dict[str, int] = {}      # Bullet count each item was last satisfied for
+        self.inputs_key: Optional[str] = None  # Profile/JD/strategy the stored resume was tailored from
+        self._current_key: Optional[str] = None  # Key of the current inputs (hashed once per change)
+        self.last_run: dict = {}
+
+    def _inputs_key(self) -> str:
+        if self._current_key is None:
+            self._current_key = jd_dedup.content_key([self.base_resume, self.jd_analysis, self.tailoring_strategy])
+        return self._current_key
+
+    def run(
+        self,
+        bullet_counts: dict = None,
+        section_order: List[str] = None,
+        tailoring_strategy: str = None,
+        base_resume: dict = None,
+        jd_analysis: dict = None
+    ) -> dict:
+        """
+        Tailored resume for the given settings (same result as tailor_resume).
+        Arguments left as None keep their previous value (a profile or JD
+        analysis edited in place must be passed again); bullet_counts uses
+        the same shape as tailor_resume's.
+        """
+        if tailoring_strategy is not None or base_resume is not None or jd_analysis is not None:
+            self._current_key = None
+        if tailoring_strategy is not None:
+            self.tailoring_strategy = tailoring_strategy
+        if base_resume is not None:
+            self.base_resume = base_resume
+            self.profile = profile_model.load_profile(base_resume)
+        if jd_analysis is not None:
+            self.jd_analysis = jd_analysis
+        if bullet_counts is not None:
+            self.bullet_counts = bullet_counts
+        if section_order is not None:
+            self.section_order = list(section_order)
+
+        if self.resume is None or self.inputs_key != self._inputs_key():
+            return self._full_run()
+        return self._incremental_run()
+
+    def _full_run(self) -> dict:
+        tailored = self.tailor(
+            self.profile, self.jd_analysis, self.provider,
+            api_key=self.api_key, tailoring_strategy=self.tailoring_strategy, bullet_counts=self.bullet_counts
+        )
+        self.last_run = {"mode": "full", "llm_calls": 1, "expanded": [], "trimmed": 0}
+        if "warning" in tailored:
+            # Nothing to build on; the next run starts over
+            self.resume, self.items, self.targets, self.inputs_key = None, {}, {}, None
+            return tailored
+
+        self.resume = tailored
+        self.inputs_key = self._inputs_key()
+        self.items = locate_items(self.profile, tailored)
+        self.targets = counts_by_id(self.profile, self.bullet_counts)
+        print(f"   🧵 Tailoring session: full run ({sum(1 for e in self.items.values() if e['section'])} items placed)")
+        return self._render()
+
+    def _incremental_run(self) -> dict:
+        counts = counts_by_id(self.profile, self.bullet_counts)
+        wanted = []
+        for item_id, count in counts.items():
+            entry = self.items.get(item_id)
+            if entry is None or count == self.targets.get(item_id):
+                continue
+            if count > len(entry["bullets"]):
+                wanted.append(item_id)
+            else:
+                self.targets[item_id] = count
+        for item_id in set(self.targets) - set(counts):
+            del self.targets[item_id]
+
+        self.last_run = {"mode": "local", "llm_calls": 0, "expanded": [], "trimmed": 0}
+        if wanted:
+            self._expand(wanted, counts)
+
+        result = self._render()
+        run = self.last_run
+        print(f"   🧵 Tailoring session: {run['mode']} update ({run['llm_calls']} model calls, "
+              f"{len(run['expanded'])} items expanded, {run['trimmed']} bullets hidden)")
+        return result
+
+    def _expand(self, wanted: List[str], counts: Dict[str, int]):
+        """Ask the model for the missing bullets of `wanted` items (one call)."""
+        requests = []
+        for item_id in wanted:
+            source = self.profile.item(item_id)
+            requests.append({
+                "id": item_id,
+                "label": relevance_ranker.item_label(source.section, source),
+                "source": [str(b) for b in source.bullets or ()],
+                "existing": self.items[item_id]["bullets"],
+                "count": counts[item_id] - len(self.items[item_id]["bullets"]),
+            })
+
+        prompt = build_bullets_prompt(requests, self.jd_analysis, main.tailoring_strategy_note(self.tailoring_strategy))
+        self.last_run.update(mode="incremental", llm_calls=1)
+        try:
+            new_bullets = parse_bullets(main.query_provider(prompt, self.provider, api_key=self.api_key, task="tailor_bullets"))
+        except Exception as e:
+            print(f"   ⚠️ Bullet expansion failed ({e}); keeping the bullets already written.")
+            return
+
+        for request in requests:
+            entry = self.items[request["id"]]
+            known = set(entry["bullets"])
+            added = [b for b in new_bullets.get(request["id"], []) if b not in known][:request["count"]]
+            entry["bullets"].extend(added)
+            if len(added) == request["count"]:
+                self.targets[request["id"]] = counts[request["id"]]
+            else:
+                # Target stays unmet, so the next run asks again
+                print(f"   ⚠️ Got {len(added)}/{request['count']} new bullets for {request['label']}")
+            if added and entry["section"] is None:
+                self._place(request["id"])
+            if added:
+                self.last_run["expanded"].append(request["id"])
+
+    def _place(self, item_id: str):
+        """Bring back an item the full run left out, at the end of its own section."""
+        source = self.profile.item(item_id)
+        placed = self.resume.setdefault(source.section, [])
+        placed.append(dict(source.fields))
+        self.items[item_id].update(section=source.section, index=len(placed) - 1)
+
+    def _render(self) -> dict:
+        """The stored resume with each item's bullets cut to its current count."""
+        resume = copy.deepcopy(self.resume)
+        counts = counts_by_id(self.profile, self.bullet_counts)
+        for item_id, entry in self.items.items():
+            if entry["section"] is None:
+                continue
+            bullets = entry["bullets"]
+            count = counts.get(item_id, len(bullets))
+            resume[entry["section"]][entry["index"]]["bullets"] = bullets[:count]
+            self.last_run["trimmed"] += max(len(bullets) - count, 0)
+        if self.section_order is not None:
+            resume["section_order"] = list(self.section_order)
+        return resume
+
+    def to_dict(self) -> dict:
+        """JSON-serializable state (the API key is not included)."""
+        return {
+            "base_resume": self.base_resume,
+            "jd_analysis": self.jd_analysis,
+            "provider": self.provider,
+            "tailoring_strategy": self.tailoring_strategy,
+            "bullet_counts": self.bullet_counts,
+            "section_order": self.section_order,
+            "resume": self.resume,
+            "items": self.items,
+            "targets": self.targets,
+            "inputs_key": self.inputs_key,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict, api_key: str = None, tailor: Callable[..., dict] = None) -> "TailorSession":
+        session = cls(
+            state["base_resume"], state["jd_analysis"], state.get("provider", "gemini"),
+            api_key=api_key, tailoring_strategy=state.get("tailoring_strategy", "balanced"), tailor=tailor
+        )
+        session.bullet_counts = state.get("bullet_counts")
+        session.section_order = state.get("section_order")
+        session.resume = state.get("resume")
+        session.items = state.get("items") or {}
+        session.targets = state.get("targets") or {}
+        session.inputs_key = state.get("inputs_key")
+        return session
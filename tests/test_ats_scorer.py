@@ -0,0 +1,42 @@
+import ats_scorer
+
+JD = "Backend engineer building Python services on AWS with PostgreSQL and Docker."
+ANALYSIS = {"mandatory_keywords": ["Python", "AWS", "PostgreSQL"], "preferred_keywords": ["Docker", "Kafka"]}
+
+RESUME = {
+    "summary": "Backend engineer shipping Python services.",
+    "skills": {"Languages": "Python, SQL", "Cloud": "AWS"},
+    "experience": [{"role": "Engineer", "company": "Acme", "bullets": ["Ran PostgreSQL on AWS.", "Built Python APIs."]}],
+}
+
+
+def test_missing_keywords_and_score_range():
+    result = ats_scorer.score_resume(RESUME, JD, ANALYSIS)
+    assert 0 <= result["score"] <= 100
+    assert result["missing_keywords"] == ["Docker", "Kafka"]
+    assert set(result) >= {"score", "missing_keywords", "matching_areas", "recommendations", "summary_feedback"}
+
+
+def test_more_coverage_scores_higher():
+    weak = {"summary": "Frontend developer.", "skills": {"Languages": "JavaScript"}}
+    assert ats_scorer.score_resume(RESUME, JD, ANALYSIS)["score"] > ats_scorer.score_resume(weak, JD, ANALYSIS)["score"]
+
+
+def test_null_entry_fields_are_tolerated():
+    resume = {
+        "experience": [{"role": None, "company": None, "bullets": ["Python on AWS"]}],
+        "projects": [{"name": None, "bullets": None}],
+        "education": [{"degree": None, "institution": "MIT"}],
+        "certifications": [{"name": None}],
+        "skills": ["Python", None],
+    }
+    sections = ats_scorer.resume_sections(resume)
+    assert ("Experience", "  Python on AWS") in sections
+    assert ats_scorer.score_resume(resume, JD, ANALYSIS)["score"] >= 0
+
+
+def test_matrix_matches_single_scores():
+    weak = {"summary": "Frontend developer.", "skills": {"Languages": "JavaScript"}}
+    matrix = ats_scorer.score_matrix([RESUME, weak], [JD], [ANALYSIS])
+    assert matrix.shape == (2, 1)
+    assert matrix[0, 0] > matrix[1, 0]
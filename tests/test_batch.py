@@ -0,0 +1,44 @@
+import json
+
+import batch
+import main
+
+PROFILE = {
+    "name": "Ada",
+    "contact": {"email": "ada@example.com", "location": "Austin, TX"},
+    "summary": "Engineer.",
+    "experience": [{"role": "Engineer", "company": "Acme", "bullets": ["Built Python services."]}],
+}
+JOBS = [{"id": "job-1", "name": "one", "jd_text": "Backend engineer. Requirements: Python, AWS."}]
+
+
+def run(tmp_path, **kwargs):
+    return list(batch.run_batch(
+        JOBS, base_resume=PROFILE, output_dir=None,
+        checkpoint_path=str(tmp_path / "ck.jsonl"), max_workers=1, **kwargs
+    ))
+
+
+def test_fallback_jobs_are_retried_on_resume(tmp_path, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    calls = []
+
+    def down(prompt, provider="gemini", expect_json=False, api_key=None, task=None):
+        calls.append(task)
+        raise Exception("provider down")
+
+    monkeypatch.setattr(main, "fetch_provider_response", down)
+    result, = run(tmp_path)
+    assert result["status"] == "fallback"
+    assert "Base Resume" in result["error"]
+    assert "output" not in result
+    with open(tmp_path / "ck.jsonl", encoding="utf-8") as f:
+        assert [json.loads(line)["status"] for line in f] == ["fallback"]
+
+    calls.clear()
+    report = batch.BatchReport()
+    result, = run(tmp_path, report=report)
+    assert "tailor" in calls
+    assert report.summary()["skipped"] == 0 and result["status"] == "fallback"
+    assert not batch.Checkpoint(str(tmp_path / "ck.jsonl")).is_done("job-1")
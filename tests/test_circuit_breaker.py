@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+import async_provider
+import circuit_breaker
+import rate_limiter
+
+
+@pytest.fixture(autouse=True)
+def isolated():
+    enabled = rate_limiter.configure_rate_limits()["enabled"]
+    cooldown = circuit_breaker.configure_breakers()["cooldown"]
+    rate_limiter.configure_rate_limits(enabled=False)
+    circuit_breaker.configure_breakers(cooldown=0.0)
+    circuit_breaker.reset_breakers()
+    yield
+    rate_limiter.configure_rate_limits(enabled=enabled)
+    circuit_breaker.configure_breakers(cooldown=cooldown)
+    circuit_breaker.reset_breakers()
+
+
+def half_open(model):
+    """Trip the breaker; with no cooldown the next allow() is the half-open probe."""
+    for _ in range(3):
+        circuit_breaker.record_exception("gemini", model)
+    breaker = circuit_breaker.get_breaker("gemini", model)
+    assert breaker.state == circuit_breaker.OPEN
+    return breaker
+
+
+def test_consecutive_failures_open_and_a_good_probe_closes():
+    breaker = half_open("m")
+    assert breaker.allow() and breaker.state == circuit_breaker.HALF_OPEN
+    assert not breaker.allow()  # One probe at a time
+    circuit_breaker.record_response("gemini", "m", 200, 0.1)
+    assert breaker.state == circuit_breaker.CLOSED
+
+
+def test_rate_limit_frees_the_probe_without_counting():
+    breaker = half_open("m")
+    assert breaker.allow()
+    circuit_breaker.record_response("gemini", "m", 429, 0.1)
+    assert breaker.state == circuit_breaker.HALF_OPEN
+    assert breaker.allow()
+
+
+def test_probe_is_released_when_the_call_is_cancelled(monkeypatch):
+    model = "gemini-2.5-flash"
+    breaker = half_open(model)
+
+    async def hang(url, json=None, headers=None, timeout=None):
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(async_provider, "_post", hang)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(async_provider.async_call_gemini_api("p", "k", model=model), 0.05)
+
+    asyncio.run(run())
+    # Cancelled, not failed: still half-open and the probe slot is free again
+    assert breaker.state == circuit_breaker.HALF_OPEN
+    assert breaker.allow()
+
+
+def test_sync_probe_is_released_on_interrupt():
+    breaker = half_open("m")
+    assert breaker.allow()
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        circuit_breaker.track("gemini", "m", interrupted)()
+    assert breaker.allow()
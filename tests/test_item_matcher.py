@@ -0,0 +1,83 @@
+import item_matcher
+import main
+import profile_model
+
+PROFILE = {
+    "experience": [
+        {"role": "Software Engineer", "company": "Acme Corp", "dates": "2021-2023"},
+        {"title": "Data Engineer", "company": "Globex", "dates": "2019-2021"},
+    ],
+    "projects": [{"name": "Resume Builder", "dates": "2022"}],
+    "leadership": [{"role": "President", "organization": "Coding Club"}],
+}
+
+
+def test_reordered_items_match_their_source():
+    index = item_matcher.get_index(PROFILE)
+    matches = index.assign([
+        {"role": "Data Engineer", "company": "Globex"},
+        {"role": "Software Engineer", "company": "Acme Corp"},
+    ])
+    assert [m.item.id for m in matches] == ["experience.1", "experience.0"]
+    assert matches[0].confidence == 1.0
+
+
+def test_partial_keys_match_with_lower_confidence():
+    match, = item_matcher.get_index(PROFILE).assign([{"role": "Senior Software Engineer", "company": "Acme"}])
+    assert match.item.id == "experience.0"
+    assert match.confidence < 1.0
+
+
+def test_assignment_is_one_to_one():
+    matches = item_matcher.get_index(PROFILE).assign([
+        {"role": "Software Engineer", "company": "Acme Corp"},
+        {"role": "Software Engineer", "company": "Acme Corp"},
+    ])
+    assert matches[0].item.id == "experience.0"
+    assert matches[1] is None
+
+
+def test_unrelated_items_are_unmatched():
+    assert item_matcher.get_index(PROFILE).assign([{"role": "Chef", "company": "Diner"}, "not an item"]) == [None, None]
+
+
+def test_moved_item_matches_across_sections():
+    match, = item_matcher.get_index(PROFILE).assign([{"role": "President", "company": "Coding Club"}])
+    assert (match.section, match.index) == ("leadership", 0)
+
+
+def test_index_is_reused_for_the_same_profile():
+    assert item_matcher.get_index(PROFILE) is item_matcher.get_index(profile_model.load_profile(PROFILE))
+
+
+def test_restore_immutable_fields_uses_matched_originals():
+    generated = {
+        "experience": [
+            {"role": "Data Engineer II", "company": "Globex", "dates": "2018-2024", "bullets": ["x"]},
+            {"role": "Software Engineer", "company": "ACME Corp", "dates": "now"},
+        ],
+        "projects": [{"name": "Resume Builder", "dates": "2020"}],
+    }
+    restored = main.restore_immutable_fields(PROFILE, generated)
+    assert restored["experience"][0]["dates"] == "2019-2021"
+    assert restored["experience"][0]["bullets"] == ["x"]
+    assert restored["experience"][1]["company"] == "Acme Corp"
+    assert restored["projects"][0]["dates"] == "2022"
+
+
+def test_loaded_profile_is_hashed_once(monkeypatch):
+    import gc
+    import jd_dedup
+
+    calls = []
+    content_key = jd_dedup.content_key
+    monkeypatch.setattr(jd_dedup, "content_key", lambda value: calls.append(1) or content_key(value))
+    profile = profile_model.load_profile(PROFILE)
+    first = item_matcher.get_index(profile)
+    assert all(item_matcher.get_index(profile) is first for _ in range(5))
+    assert len(calls) == 1
+
+    profile_id = id(profile)
+    del profile
+    gc.collect()
+    assert profile_id not in item_matcher._by_profile
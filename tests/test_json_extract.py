@@ -0,0 +1,87 @@
+import time
+
+from json_extract import JSONExtractor, extract_json, strip_trailing_commas
+
+
+def test_plain_object():
+    assert extract_json('{"score": 8}') == {"score": 8}
+
+
+def test_fenced_object_with_prose():
+    text = 'Here is the result:\n```json\n{"name": "Ada", "skills": ["Python"]}\n```\nLet me know!'
+    assert extract_json(text) == {"name": "Ada", "skills": ["Python"]}
+
+
+def test_trailing_commas():
+    assert extract_json('{"a": [1, 2,], "b": {"c": 3,},}') == {"a": [1, 2], "b": {"c": 3}}
+
+
+def test_trailing_comma_inside_string_is_kept():
+    assert strip_trailing_commas('{"a": "x,]"}') == '{"a": "x,]"}'
+
+
+def test_truncated_mid_string():
+    value = extract_json('{"name": "Ada", "summary": "Builds data pipel')
+    assert value == {"name": "Ada"}
+
+
+def test_truncated_mid_array():
+    value = extract_json('{"skills": ["Python", "SQL", "Kaf')
+    assert value == {"skills": ["Python", "SQL"]}
+
+
+def test_truncation_not_repaired_when_disabled():
+    assert extract_json('{"name": "Ada", "summary": "Bui', repair=False) is None
+
+
+def test_braces_in_strings_are_ignored():
+    assert extract_json('{"text": "use {name} and }"}') == {"text": "use {name} and }"}
+
+
+def test_invalid_object_in_prose_is_skipped():
+    assert extract_json('Fill in {name} then: {"score": 7}') == {"score": 7}
+
+
+def test_nested_object_inside_invalid_object_is_rejected():
+    assert extract_json('Here: {"name": "A", "experience": [{"role": "X"}], oops}') is None
+
+
+def test_scan_resumes_after_invalid_top_level_object():
+    text = '{a {b {c}} {"ok": {"inner": [1]}}} {"later": 1}'
+    assert extract_json(text) == {"later": 1}
+
+
+def test_invalid_objects_then_valid_one():
+    assert extract_json('{x} {y {z}} {"score": 5}') == {"score": 5}
+
+
+def test_incremental_feed_matches_whole_text():
+    text = 'Sure! ```json\n{"a": {"b": [1, 2, {"c": "d}"}]}, "e": true}\n```'
+    extractor = JSONExtractor()
+    value = None
+    for i in range(0, len(text), 3):
+        value = extractor.feed(text[i:i + 3]) or value
+    assert value == extract_json(text) == {"a": {"b": [1, 2, {"c": "d}"}]}, "e": True}
+
+
+def test_truncated_after_complete_scalar():
+    assert extract_json('{"score": 8') == {"score": 8}
+    assert extract_json('{"name": "Ada", "ok": true') == {"name": "Ada", "ok": True}
+
+
+def test_nothing_recovered_from_truncation():
+    assert extract_json('{"a": tru') is None
+    assert extract_json('{"a": {') is None
+
+
+def test_rejected_spans_are_not_rescanned():
+    texts = [
+        "{x} " * 20000 + '{"score": 1}',
+        "{" * 500 + "x" + "}" * 500 + '{"score": 1}',
+        # Every level is a valid prefix up to the same error deep inside
+        ('{"pad": "' + "p" * 2000 + '", "a": ') * 500 + "x" + "}" * 500 + '{"score": 1}',
+    ]
+    for text in texts:
+        start = time.monotonic()
+        assert extract_json(text) == {"score": 1}
+        assert time.monotonic() - start < 2
@@ -0,0 +1,59 @@
+import json
+
+import ats_scorer
+from live_scorer import LiveScorer, resume_fields
+
+JD = "Backend engineer building Python services on AWS with PostgreSQL and Docker."
+ANALYSIS = {"mandatory_keywords": ["Python", "AWS", "PostgreSQL"], "preferred_keywords": ["Docker"]}
+
+RESUME = {
+    "summary": "Backend engineer. Ships Python services.",
+    "skills": {"Languages": "Python, SQL"},
+    "experience": [{"role": "Engineer", "company": "Acme", "bullets": ["Ran PostgreSQL.", "Built APIs."]}],
+}
+
+
+def test_fields_are_keyed_by_path():
+    fields = resume_fields(RESUME)
+    assert fields["summary.1"] == "Ships Python services."
+    assert fields["experience.0.title"] == "Engineer Acme"
+    assert fields["experience.0.bullets.1"] == "Built APIs."
+
+
+def test_null_entry_fields_are_tolerated():
+    fields = resume_fields({"experience": [{"role": None, "company": "Acme", "bullets": []}], "skills": ["Go", None]})
+    assert fields["experience.0.title"] == "Acme"
+    assert fields["skills"] == "Go"
+
+
+def test_update_matches_full_rescore():
+    scorer = LiveScorer(RESUME, JD, ANALYSIS)
+    assert "AWS" in scorer.missing_keywords()
+    result = scorer.update("experience.0.bullets.1", "Built APIs on AWS with Docker.")
+    assert result["missing_keywords"] == []
+    assert result["field"]["unique_keywords"] == ["AWS", "Docker"]
+
+    edited = json.loads(json.dumps(RESUME))
+    edited["experience"][0]["bullets"][1] = "Built APIs on AWS with Docker."
+    assert result["score"] == LiveScorer(edited, JD, ANALYSIS).score()
+    assert result["delta"] > 0
+
+
+def test_removing_a_field_undoes_its_contribution():
+    scorer = LiveScorer(RESUME, JD, ANALYSIS)
+    before = scorer.score()
+    scorer.update("summary.2", "Deploys on AWS.")
+    scorer.update("summary.2", None)
+    assert scorer.score() == before
+    assert "summary.2" not in scorer.fields
+
+
+def test_state_round_trips_through_json():
+    scorer = LiveScorer(RESUME, JD, ANALYSIS)
+    restored = LiveScorer.from_dict(json.loads(json.dumps(scorer.to_dict())))
+    assert restored.result() == scorer.result()
+    assert abs(restored.cosine() - scorer.cosine()) < 1e-9
+
+
+def test_score_matches_batch_scorer():
+    assert LiveScorer(RESUME, JD, ANALYSIS).score() == ats_scorer.score_resume(RESUME, JD, ANALYSIS)["score"]
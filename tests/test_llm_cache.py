@@ -0,0 +1,56 @@
+import pytest
+
+import llm_cache
+import main
+import provider_failover
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    """Enabled in-memory cache and fake providers; gemini fails unless told otherwise."""
+    llm_cache.configure_cache(enabled=True)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.setenv("GROQ_API_KEY", "groq-key")
+    behavior = {"gemini": Exception("gemini 503"), "groq": "from groq"}
+    calls = []
+
+    def fetch(prompt, provider="gemini", expect_json=False, api_key=None, task=None):
+        calls.append((provider, task))
+        outcome = behavior[provider]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(main, "fetch_provider_response", fetch)
+    yield behavior, calls
+    llm_cache.configure_cache(enabled=False)
+
+
+def test_failover_response_is_cached_for_the_serving_provider(providers):
+    behavior, calls = providers
+    assert main.query_provider("p", "gemini", task="qa") == "from groq"
+    assert provider_failover.get_last_served()["provider"] == "groq"
+
+    # Asking for gemini again must not get groq's answer back from the cache
+    behavior["gemini"] = "from gemini"
+    assert main.query_provider("p", "gemini", task="qa") == "from gemini"
+    assert calls == [("gemini", "qa"), ("groq", "qa"), ("gemini", "qa")]
+
+    assert main.query_provider("p", "groq", task="qa") == "from groq"
+    assert main.query_provider("p", "gemini", task="qa") == "from gemini"
+    assert len(calls) == 3
+
+
+def test_cache_is_scoped_to_the_task(providers):
+    behavior, calls = providers
+    behavior["groq"] = "some text"
+    assert main.query_provider("p", "groq", task="qa") == "some text"
+    # Same prompt and candidate models, different task
+    behavior["groq"] = "other text"
+    assert main.query_provider("p", "groq", task="summary") == "other text"
+    assert main.query_provider("p", "groq", task="qa") == "some text"
+    assert calls == [("groq", "qa"), ("groq", "summary")]
+
+
+def test_task_is_part_of_the_key():
+    assert llm_cache.make_key("groq", "m", "p", task="qa") != llm_cache.make_key("groq", "m", "p", task="jd_parse")
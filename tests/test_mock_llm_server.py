@@ -0,0 +1,46 @@
+import os
+
+import pytest
+import requests
+
+import mock_llm_server
+import provider_transport
+
+GROQ = "/openai/v1/chat/completions"
+BODY = {"model": "llama-3.1-8b-instant", "messages": [{"role": "user", "content": "hi"}]}
+
+
+@pytest.fixture
+def recorder(tmp_path, monkeypatch):
+    """A record-mode server whose "real provider" is a replay server (made by the test)."""
+    servers = []
+
+    def start(**upstream_config):
+        upstream = mock_llm_server.start_server(port=0, fixtures=str(tmp_path / "upstream"), **upstream_config)
+        monkeypatch.setattr(provider_transport, "GROQ_BASE_URL", mock_llm_server.server_url(upstream))
+        server = mock_llm_server.start_server(port=0, mode="record", fixtures=str(tmp_path / "recorded"))
+        servers.extend([upstream, server])
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_upstream_rate_limit_is_passed_through_not_recorded(recorder, tmp_path):
+    server = recorder(error_429=1.0, retry_after=7)
+    response = requests.post(mock_llm_server.server_url(server) + GROQ, json=BODY, timeout=5)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
+    assert response.json()["error"]["code"] == "rate_limit_exceeded"
+    assert os.listdir(tmp_path / "recorded") == []
+    assert server.mock_config.stats["upstream_errors"] == 1
+
+
+def test_successful_reply_is_recorded(recorder, tmp_path):
+    server = recorder()
+    response = requests.post(mock_llm_server.server_url(server) + GROQ, json=BODY, timeout=5)
+    assert response.status_code == 200
+    assert response.json()["choices"][0]["message"]["content"] == mock_llm_server.DEFAULT_RESPONSE
+    assert len(os.listdir(tmp_path / "recorded")) == 1
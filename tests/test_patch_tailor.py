@@ -0,0 +1,78 @@
+import profile_model
+from patch_tailor import apply_patch
+
+
+def profile(**sections):
+    return profile_model.load_profile({"name": "Ada", "summary": "Engineer.", **sections})
+
+
+def job(role, bullets):
+    return {"role": role, "company": "Acme", "bullets": list(bullets)}
+
+
+def test_replace_and_drop_bullet():
+    resume, report = apply_patch(profile(experience=[job("SWE", ["zero", "one", "two"])]), [
+        {"op": "replace_bullet", "id": "experience.0.b1", "text": "ONE"},
+        {"op": "drop", "id": "experience.0.b2"},
+    ])
+    assert resume["experience"][0]["bullets"] == ["zero", "ONE"]
+    assert report == {"applied": 2, "skipped": []}
+
+
+def test_bullet_ids_survive_reorder():
+    resume, report = apply_patch(profile(experience=[job("SWE", ["zero", "one", "two"])]), [
+        {"op": "reorder", "id": "experience.0", "ids": ["experience.0.b2", "experience.0.b0", "experience.0.b1"]},
+        {"op": "replace_bullet", "id": "experience.0.b0", "text": "ZERO rewritten"},
+        {"op": "drop", "id": "experience.0.b1"},
+    ])
+    assert resume["experience"][0]["bullets"] == ["two", "ZERO rewritten"]
+    assert report["applied"] == 3
+
+
+def test_reorder_items_and_drop_item():
+    resume, _ = apply_patch(profile(experience=[job("A", []), job("B", []), job("C", [])]), [
+        {"op": "reorder", "section": "experience", "ids": ["experience.2", "experience.0"]},
+        {"op": "drop", "id": "experience.1"},
+    ])
+    assert [e["role"] for e in resume["experience"]] == ["C", "A"]
+
+
+def test_move_renames_fields():
+    resume, _ = apply_patch(profile(experience=[job("Lead", ["x"])]), [
+        {"op": "move", "id": "experience.0", "to": "projects"},
+    ])
+    assert resume["experience"] == []
+    assert len(resume["projects"]) == 1 and resume["projects"][0]["bullets"] == ["x"]
+
+
+def test_target_bullets_truncates():
+    base = profile(experience=[job("SWE", ["a", "b", "c"])]).with_targets({"experience": [2]})
+    resume, _ = apply_patch(base, [])
+    assert resume["experience"][0]["bullets"] == ["a", "b"]
+    assert "target_bullets" not in resume["experience"][0]
+
+
+def test_add_skills_deduplicates():
+    resume, _ = apply_patch(profile(skills={"Cloud": "AWS"}), [
+        {"op": "add_skills", "category": "Cloud", "skills": ["aws", "BigQuery"]},
+    ])
+    assert resume["skills"]["Cloud"] == "AWS, BigQuery"
+
+
+def test_invalid_ops_are_skipped():
+    base = profile(experience=[job("SWE", ["a"])])
+    resume, report = apply_patch(base, [
+        {"op": "explode"},
+        {"op": "replace_bullet", "id": "experience.0.b7", "text": "x"},
+        {"op": "set_summary", "text": " "},
+        "not an op",
+    ])
+    assert report["applied"] == 0 and len(report["skipped"]) == 4
+    assert resume["experience"][0]["bullets"] == ["a"]
+    assert resume["summary"] == "Engineer."
+
+
+def test_profile_is_not_modified():
+    base = profile(experience=[job("SWE", ["a", "b"])])
+    apply_patch(base, [{"op": "replace_bullet", "id": "experience.0.b0", "text": "new"}])
+    assert base["experience"][0]["bullets"] == ("a", "b")
@@ -0,0 +1,119 @@
+import asyncio
+import copy
+
+import pytest
+
+import async_provider
+import circuit_breaker
+import main
+import provider_transport
+import rate_limiter
+
+
+class Response:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self._data = data or {}
+        self.text = str(self._data)
+        self.headers = {}
+
+    def json(self):
+        return self._data
+
+
+def groq_ok(text):
+    return Response(200, {"choices": [{"message": {"content": text}}]})
+
+
+def gemini_ok(text):
+    return Response(200, {"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    enabled = rate_limiter.configure_rate_limits()["enabled"]
+    rate_limiter.configure_rate_limits(enabled=False)
+    circuit_breaker.reset_breakers()
+    yield
+    rate_limiter.configure_rate_limits(enabled=enabled)
+    circuit_breaker.reset_breakers()
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    """Scripted replies for both clients; records the payload of every request."""
+    sent, replies = [], []
+
+    def post(url, json=None, **kwargs):
+        sent.append(copy.deepcopy(json))
+        return replies.pop(0)
+
+    async def post_async(url, json=None, **kwargs):
+        return post(url, json=json)
+
+    monkeypatch.setattr(provider_transport, "post", post)
+    monkeypatch.setattr(async_provider, "_post", post_async)
+    return sent, replies
+
+
+def run_both(sync_call, async_call, transport, script):
+    """Run the same script through the sync and the async client."""
+    sent, replies = transport
+    results = []
+    for call in (sync_call, lambda: asyncio.run(async_call())):
+        sent.clear()
+        replies[:] = list(script)
+        results.append((call(), list(sent)))
+    return results
+
+
+def test_groq_json_mode_400_retries_without_response_format(transport):
+    results = run_both(
+        lambda: main.query_groq("p", expect_json=True, api_key="k", models=["m1"], hedge=False),
+        lambda: async_provider.async_query_groq("p", expect_json=True, api_key="k", models=["m1"]),
+        transport, [Response(400), groq_ok("done")]
+    )
+    for text, sent in results:
+        assert text == "done"
+        assert "response_format" in sent[0] and "response_format" not in sent[1]
+
+
+def test_groq_falls_back_on_rate_limit(transport):
+    results = run_both(
+        lambda: main.query_groq("p", api_key="k", models=["m1", "m2"], hedge=False),
+        lambda: async_provider.async_query_groq("p", api_key="k", models=["m1", "m2"]),
+        transport, [Response(429), groq_ok("second")]
+    )
+    assert [text for text, _ in results] == ["second", "second"]
+    assert [s["model"] for s in results[0][1]] == ["m1", "m2"]
+
+
+def test_groq_skips_open_circuit(transport):
+    for _ in range(20):
+        circuit_breaker.record_exception("groq", "m1")
+    results = run_both(
+        lambda: main.query_groq("p", api_key="k", models=["m1", "m2"], hedge=False),
+        lambda: async_provider.async_query_groq("p", api_key="k", models=["m1", "m2"]),
+        transport, [groq_ok("second")]
+    )
+    for text, sent in results:
+        assert text == "second" and [s["model"] for s in sent] == ["m2"]
+
+
+def test_gemini_schema_400_retries_in_json_mode(transport):
+    results = run_both(
+        lambda: main.call_gemini_api("p", "k", task="jd_parse"),
+        lambda: async_provider.async_call_gemini_api("p", "k", task="jd_parse"),
+        transport, [Response(400), gemini_ok("{}")]
+    )
+    for text, sent in results:
+        assert text == "{}"
+        assert "responseSchema" in sent[0]["generationConfig"]
+        assert "responseSchema" not in sent[1]["generationConfig"]
+
+
+def test_gemini_other_errors_raise(transport):
+    sent, replies = transport
+    replies[:] = [Response(500)]
+    with pytest.raises(Exception, match="Gemini API Error 500"):
+        main.call_gemini_api("p", "k", task="jd_parse")
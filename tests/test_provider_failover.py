@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+import main
+import provider_failover
+import provider_transport
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    """Fake gemini/groq behind main.fetch_provider_response; groq is configured for failover."""
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.setenv("GROQ_API_KEY", "groq-key")
+    behavior = {}
+    calls = []
+
+    def fetch(prompt, provider="gemini", expect_json=False, api_key=None, task=None):
+        calls.append((provider, api_key, provider_transport.remaining_time()))
+        outcome = behavior.get(provider, "")
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(main, "fetch_provider_response", fetch)
+    return behavior, calls
+
+
+@pytest.fixture
+def attempt_timeout():
+    saved = dict(provider_failover.configure_failover()["attempt_timeout"])
+    yield lambda **caps: provider_failover.configure_failover(attempt_timeout=caps)
+    provider_failover.configure_failover(attempt_timeout=saved)
+
+
+def test_failover_records_the_provider_that_served(providers):
+    behavior, calls = providers
+    behavior.update(gemini=Exception("gemini 503"), groq="from groq")
+    assert main.query_provider("p", "gemini", api_key="gemini-key", task="qa") == "from groq"
+
+    served = provider_failover.get_last_served()
+    assert served["requested"] == "gemini" and served["provider"] == "groq"
+    assert [a["provider"] for a in served["attempts"]] == ["gemini", "groq"]
+    assert "gemini 503" in served["attempts"][0]["error"] and served["attempts"][1]["error"] is None
+    # The caller's key belongs to the provider it asked for
+    assert [(p, key) for p, key, _ in calls] == [("gemini", "gemini-key"), ("groq", None)]
+
+
+def test_empty_response_fails_over(providers):
+    behavior, _ = providers
+    behavior.update(gemini="", groq="from groq")
+    assert main.query_provider("p", "gemini", task="qa") == "from groq"
+    assert provider_failover.get_last_served()["provider"] == "groq"
+
+
+def test_attempts_run_under_their_share_of_the_deadline(providers, attempt_timeout):
+    behavior, calls = providers
+    behavior.update(gemini=Exception("timeout"), groq="ok")
+    attempt_timeout(gemini=0.5)
+    main.query_provider("p", "gemini", task="qa", deadline=2.0)
+    (_, _, gemini_budget), (_, _, groq_budget) = calls
+    assert 0 < gemini_budget <= 0.5
+    assert 0.5 < groq_budget <= 2.0
+
+
+def test_all_providers_failing_raises(providers):
+    behavior, _ = providers
+    behavior.update(gemini=Exception("down"), groq=Exception("also down"))
+    with pytest.raises(Exception, match="also down"):
+        main.query_provider("p", "gemini", task="qa")
+    assert provider_failover.get_last_served()["provider"] is None
+
+
+def test_async_timed_out_attempt_fails_over(attempt_timeout):
+    attempt_timeout(gemini=0.1)
+
+    async def attempt(provider):
+        if provider == "gemini":
+            await asyncio.sleep(60)
+        return f"from {provider}"
+
+    async def run():
+        text = await provider_failover.run_with_failover_async(["gemini", "groq"], attempt, deadline=2.0)
+        return text, provider_failover.get_last_served()
+
+    text, served = asyncio.run(run())
+    assert text == "from groq" and served["provider"] == "groq"
+    assert "no response within" in served["attempts"][0]["error"]
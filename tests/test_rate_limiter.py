@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+import provider_transport
+import rate_limiter
+from rate_limiter import RateLimitScheduler, RateLimitWaitTooLong
+
+
+class Response:
+    status_code = 200
+    headers = {}
+    text = ""
+
+
+def test_queue_wait_beyond_max_wait_raises_and_keeps_capacity():
+    scheduler = RateLimitScheduler({("p", "m"): (1, None)})
+    assert scheduler.reserve("p", "m", max_wait=5) == 0.0
+    with pytest.raises(RateLimitWaitTooLong):
+        scheduler.reserve("p", "m", max_wait=5)
+    # The refused reservation was given back: the next caller queues behind one request, not two
+    assert 55 < scheduler.reserve("p", "m", max_wait=None) <= 60
+
+
+def test_async_send_is_capped_by_transport_deadline():
+    scheduler = RateLimitScheduler({("p", "m"): (1, None)})
+    scheduler.reserve("p", "m")
+
+    async def request():
+        return Response()
+
+    async def run():
+        with provider_transport.deadline_scope(1.0):
+            return await scheduler.send_async("p", "m", request, max_wait=30)
+
+    with pytest.raises(RateLimitWaitTooLong):
+        asyncio.run(run())
+
+
+def test_module_async_send_passes_through_when_disabled():
+    enabled = rate_limiter.configure_rate_limits()["enabled"]
+    rate_limiter.configure_rate_limits(enabled=False)
+    try:
+        async def request():
+            return Response()
+        assert asyncio.run(rate_limiter.send_async("p", "m", request)).status_code == 200
+    finally:
+        rate_limiter.configure_rate_limits(enabled=enabled)
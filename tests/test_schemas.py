@@ -0,0 +1,18 @@
+import json
+
+import pytest
+
+import main
+import schemas
+
+
+@pytest.mark.parametrize("score", ["null", "[1]", "{}", "true", "1e999"])
+def test_non_numeric_score_fails_validation(score):
+    text = '{"score": %s}' % score
+    assert not schemas.conforms("ats_analysis", json.loads(text))
+    assert "error" in main.parse_ats_analysis_response(text)
+
+
+@pytest.mark.parametrize("score, expected", [("85%", 85), (72.6, 73), (140, 100)])
+def test_score_is_coerced(score, expected):
+    assert schemas.validate("ats_analysis", {"score": score})["score"] == expected
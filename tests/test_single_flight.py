@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+import main
+import single_flight
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """A fake provider that blocks until released, so callers pile up behind one request."""
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    state = {"calls": 0, "entered": threading.Event(), "release": threading.Event(), "outcome": "text"}
+
+    def fetch(prompt, provider="gemini", expect_json=False, api_key=None, task=None):
+        state["calls"] += 1
+        state["entered"].set()
+        state["release"].wait(5)
+        if isinstance(state["outcome"], Exception):
+            raise state["outcome"]
+        return state["outcome"]
+
+    monkeypatch.setattr(main, "fetch_provider_response", fetch)
+    return state
+
+
+def run_concurrently(state, followers=3, prompt="same prompt"):
+    """Start a leader and `followers` identical requests; returns each caller's result or exception."""
+    results = [None] * (followers + 1)
+    merged_before = single_flight.single_flight_stats()["merged"]
+
+    def call(i):
+        try:
+            results[i] = main.query_provider(prompt, "gemini", api_key="k", task="qa")
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(0,))]
+    threads[0].start()
+    assert state["entered"].wait(5)
+    threads += [threading.Thread(target=call, args=(i,)) for i in range(1, followers + 1)]
+    for thread in threads[1:]:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while single_flight.single_flight_stats()["merged"] - merged_before < followers and time.monotonic() < deadline:
+        time.sleep(0.01)
+    state["release"].set()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+def test_followers_share_the_leaders_result(provider):
+    provider["outcome"] = "answer"
+    assert run_concurrently(provider) == ["answer"] * 4
+    assert provider["calls"] == 1
+
+
+def test_followers_share_the_leaders_exception(provider):
+    provider["outcome"] = Exception("upstream 500")
+    results = run_concurrently(provider)
+    assert provider["calls"] == 1
+    assert all(isinstance(r, Exception) for r in results)
+    assert all(r is results[0] for r in results)
+    assert "upstream 500" in str(results[0])
+
+
+def test_different_api_keys_are_not_merged():
+    assert single_flight.request_fingerprint("k", "a") != single_flight.request_fingerprint("k", "b")
+
+
+def test_later_identical_request_runs_again(provider):
+    provider["release"].set()
+    main.query_provider("p", "gemini", api_key="k", task="qa")
+    main.query_provider("p", "gemini", api_key="k", task="qa")
+    assert provider["calls"] == 2
@@ -0,0 +1,20 @@
+from skill_extractor import extract_keywords
+
+
+def test_headings_split_mandatory_and_preferred():
+    result = extract_keywords("Requirements:\n- Python and k8s\nNice to have: Kafka\n")
+    assert result["mandatory_keywords"] == ["Python", "Kubernetes"]
+    assert result["preferred_keywords"] == ["Kafka"]
+
+
+def test_offer_sections_are_not_requirements():
+    jd = (
+        "Nice to have: Kafka\n"
+        "Benefits: C++, C and Go learning budget, health insurance\n"
+        "Perks:\n- Rust workshops\n"
+        "Qualifications: Docker\n"
+    )
+    result = extract_keywords(jd)
+    assert result["mandatory_keywords"] == ["Docker"]
+    assert result["preferred_keywords"] == ["Kafka"]
+    assert result["domain_context"] == ""
@@ -0,0 +1,48 @@
+import json
+
+import streaming
+
+PROFILE = {
+    "name": "Ada",
+    "contact": {"email": "ada@example.com"},
+    "summary": "Engineer.",
+    "experience": [{"role": "Engineer", "company": "Acme", "bullets": ["Built things."]}],
+}
+JD = {"mandatory_keywords": ["Python"], "preferred_keywords": [], "location": "Remote"}
+TAILORED = dict(PROFILE, summary="Python engineer.")
+
+
+def fake_stream(text, error=None):
+    def stream_provider(prompt, provider="gemini", api_key=None, expect_json=False, task=None):
+        for i in range(0, len(text), 7):
+            yield text[i:i + 7]
+        if error is not None:
+            raise error
+    return stream_provider
+
+
+def run(monkeypatch, text, error=None):
+    monkeypatch.setattr(streaming, "stream_provider", fake_stream(text, error))
+    events = list(streaming.tailor_resume_stream(PROFILE, JD))
+    assert events[-1]["type"] == "done"
+    return events
+
+
+def test_streamed_resume_is_finalized(monkeypatch):
+    events = run(monkeypatch, json.dumps(TAILORED))
+    assert events[-1]["resume"]["summary"] == "Python engineer."
+    assert any(e["type"] == "section" and e["section"] == "summary" for e in events)
+
+
+def test_error_after_the_object_closed_keeps_the_resume(monkeypatch):
+    events = run(monkeypatch, json.dumps(TAILORED) + "\n", ConnectionError("reset"))
+    resume = events[-1]["resume"]
+    assert "warning" not in resume
+    assert resume["summary"] == "Python engineer."
+
+
+def test_error_mid_object_falls_back_to_base(monkeypatch):
+    events = run(monkeypatch, json.dumps(TAILORED)[:40], ConnectionError("reset"))
+    resume = events[-1]["resume"]
+    assert "warning" in resume
+    assert resume["summary"] == "Engineer."
@@ -0,0 +1,137 @@
+import json
+
+import pytest
+
+import main
+import profile_model
+from tailor_session import TailorSession, locate_items
+
+PROFILE = {
+    "name": "Ada",
+    "experience": [
+        {"role": "Engineer", "company": "Acme", "bullets": ["a0", "a1", "a2", "a3"]},
+        {"role": "Analyst", "company": "Globex", "bullets": ["g0", "g1", "g2", "g3"]},
+    ],
+}
+JD = {"mandatory_keywords": ["Python"], "preferred_keywords": []}
+
+
+class FakeTailor:
+    """Full tailoring stand-in: writes the requested bullets and lists items in reverse order."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, profile, jd_analysis, provider, api_key=None, tailoring_strategy="balanced", bullet_counts=None):
+        self.calls += 1
+        experience = []
+        for i, item in enumerate(profile.items_of("experience")):
+            count = (bullet_counts or {}).get("experience", [4, 4])[i]
+            bullets = [f"{tailoring_strategy} {item['company']} {j}" for j in range(count)]
+            experience.append({"role": item["role"], "company": item["company"], "bullets": bullets})
+        return {"name": profile["name"], "experience": experience[::-1]}
+
+
+@pytest.fixture
+def provider_calls(monkeypatch):
+    calls = []
+
+    def query_provider(prompt, provider, api_key=None, task=None):
+        calls.append(task)
+        return json.dumps({"items": [{"id": "experience.0", "bullets": ["new Acme bullet"]}]})
+
+    monkeypatch.setattr(main, "query_provider", query_provider)
+    return calls
+
+
+def bullets_of(resume, company):
+    return next(e["bullets"] for e in resume["experience"] if e["company"] == company)
+
+
+def test_locate_items_follows_reordered_output():
+    tailored = FakeTailor()(profile_model.load_profile(PROFILE), JD, "gemini")
+    items = locate_items(profile_model.load_profile(PROFILE), tailored)
+    assert (items["experience.0"]["section"], items["experience.0"]["index"]) == ("experience", 1)
+    assert items["experience.1"]["index"] == 0
+
+
+def test_fewer_bullets_are_trimmed_locally(provider_calls):
+    tailor = FakeTailor()
+    session = TailorSession(PROFILE, JD, tailor=tailor)
+    session.run(bullet_counts={"experience": [3, 3]})
+    resume = session.run(bullet_counts={"experience": [1, 2]})
+    assert tailor.calls == 1 and provider_calls == []
+    assert session.last_run["mode"] == "local"
+    assert bullets_of(resume, "Acme") == ["balanced Acme 0"]
+    assert bullets_of(resume, "Globex") == ["balanced Globex 0", "balanced Globex 1"]
+
+    # Bullets written before come back without a model call
+    resume = session.run(bullet_counts={"experience": [3, 3]})
+    assert len(bullets_of(resume, "Acme")) == 3 and provider_calls == []
+
+
+def test_more_bullets_than_written_expand_in_one_call(provider_calls):
+    tailor = FakeTailor()
+    session = TailorSession(PROFILE, JD, tailor=tailor)
+    session.run(bullet_counts={"experience": [2, 2]})
+    resume = session.run(bullet_counts={"experience": [3, 2]})
+    assert tailor.calls == 1 and provider_calls == ["tailor_bullets"]
+    assert session.last_run["mode"] == "incremental"
+    assert session.last_run["expanded"] == ["experience.0"]
+    assert bullets_of(resume, "Acme")[-1] == "new Acme bullet"
+
+    session.run(bullet_counts={"experience": [3, 2]})
+    assert provider_calls == ["tailor_bullets"]
+
+
+def test_section_order_is_applied_locally(provider_calls):
+    tailor = FakeTailor()
+    session = TailorSession(PROFILE, JD, tailor=tailor)
+    session.run()
+    resume = session.run(section_order=["experience", "skills"])
+    assert tailor.calls == 1
+    assert resume["section_order"] == ["experience", "skills"]
+
+
+def test_strategy_change_retailors(provider_calls):
+    tailor = FakeTailor()
+    session = TailorSession(PROFILE, JD, tailor=tailor)
+    session.run(bullet_counts={"experience": [2, 2]})
+    resume = session.run(tailoring_strategy="jd_focus")
+    assert tailor.calls == 2 and session.last_run["mode"] == "full"
+    assert bullets_of(resume, "Acme")[0] == "jd_focus Acme 0"
+
+
+def test_failed_full_run_is_not_kept(provider_calls):
+    tailor = FakeTailor()
+    session = TailorSession(PROFILE, JD, tailor=lambda *a, **k: {"warning": "failed"})
+    assert "warning" in session.run()
+    session.tailor = tailor
+    session.run()
+    assert tailor.calls == 1 and session.last_run["mode"] == "full"
+
+
+def test_state_round_trips_through_json(provider_calls):
+    tailor = FakeTailor()
+    session = TailorSession(PROFILE, JD, tailor=tailor)
+    session.run(bullet_counts={"experience": [3, 3]})
+    restored = TailorSession.from_dict(json.loads(json.dumps(session.to_dict())), tailor=tailor)
+    resume = restored.run(bullet_counts={"experience": [1, 1]})
+    assert tailor.calls == 1 and restored.last_run["mode"] == "local"
+    assert bullets_of(resume, "Globex") == ["balanced Globex 0"]
+    assert bullets_of(session.resume, "Globex") == ["balanced Globex 0", "balanced Globex 1", "balanced Globex 2"]
+
+
+def test_inputs_are_hashed_once_per_change(provider_calls, monkeypatch):
+    import jd_dedup
+
+    calls = []
+    content_key = jd_dedup.content_key
+    # Session inputs only (the matcher index hashes the profile's sections once, separately)
+    monkeypatch.setattr(jd_dedup, "content_key", lambda value: calls.append(value[0] is PROFILE) or content_key(value))
+    session = TailorSession(PROFILE, JD, tailor=FakeTailor())
+    for counts in ([3, 3], [2, 2], [1, 3]):
+        session.run(bullet_counts={"experience": counts})
+    assert calls.count(True) == 1
+    session.run(tailoring_strategy="jd_focus")
+    assert calls.count(True) == 2